@@ -1,19 +1,44 @@
 import os
 
 from InquirerPy import inquirer
+from rich import box
 from rich.console import Console
+from rich.markup import escape
 from rich.panel import Panel
+from rich.table import Table
 from rich.text import Text
 
-from .load_jmdict import update_jmdict
+from config import JMDICT_EXAMPLE_PAGE_SIZE, JMDICT_WORD_BLOBS
+from screen import Screen
+
 from .sqlite_manager import JMdictSQLiteManager
 
 console = Console()
+# 例句分页等反复刷新的画面逐行差分重绘
+screen = Screen(console)
+
+# 查询诊断中显示的方法名称
+DIAGNOSTIC_LABELS = {
+    "find_words_with_kana": "按假名",
+    "search_by_kanji": "按汉字",
+    "search_by_meaning": "按英文含义",
+    "search_by_romaji": "按罗马音",
+    "search_examples": "搜索例句",
+    "get_common_words": "常用词汇",
+    "get_random_word_with_kana": "随机例词",
+    "get_example_word": "练习例词",
+    "get_kana_stats": "假名统计",
+    "get_database_stats": "数据库统计",
+    "_get_word_details": "读取词条",
+    "_load_senses": "加载义项",
+    "_load_examples": "加载例句",
+}
 
 
 def clear_screen():
-    """清屏函数"""
-    os.system("cls" if os.name == "nt" else "clear")
+    """清屏函数（输出控制序列，不启动子进程）"""
+    console.clear()
+    screen.invalidate()
 
 
 def show_jmdict_header():
@@ -25,13 +50,17 @@ def show_jmdict_header():
     console.print()
 
 
+def search_header():
+    """查词功能头部"""
+    title_text = Text("📖 查词功能", style="bold green")
+    return Panel(title_text, border_style="green", padding=(0, 2))
+
+
 def show_search_header():
     """显示查词功能头部"""
-    clear_screen()
-    title_text = Text("📖 查词功能", style="bold green")
-    title_panel = Panel(title_text, border_style="green", padding=(0, 2))
-    console.print(title_panel)
-    console.print()
+    screen.show(search_header(), Text(""))
+    # 之后的查询结果直接打印，画面内容不再由 screen 跟踪
+    screen.invalidate()
 
 
 def update_jmdict_command():
@@ -40,8 +69,18 @@ def update_jmdict_command():
     console.print("[yellow]正在检查并更新JMdict词典...[/yellow]")
     console.print()
 
-    # 更新词典
-    update_jmdict()
+    # 更新词典（requests/pydantic 只在这里才需要，延迟导入以加快启动）
+    from .load_jmdict import UPDATE_FAILED, needs_migration, update_jmdict
+
+    status = update_jmdict()
+    if status == UPDATE_FAILED:
+        return
+
+    db_path = os.path.join(os.path.dirname(__file__), "jmdict.db")
+    if not needs_migration(db_path):
+        console.print("\n[green]数据库已与当前词典一致，跳过迁移[/green]")
+        console.print("\n[green]词典更新操作完成！[/green]")
+        return
 
     # 询问是否要迁移到数据库
     console.print("\n[cyan]是否要将词典数据迁移到SQLite数据库？[/cyan]")
@@ -56,8 +95,8 @@ def update_jmdict_command():
     console.print("\n[green]词典更新操作完成！[/green]")
 
 
-def search_word_command():
-    """查词功能命令"""
+def search_word_command(profile=None):
+    """查词功能命令，传入当前用户（LearnerProfile）时可以把查到的词加入词汇卡片"""
     show_search_header()
 
     # 检查数据库文件是否存在
@@ -83,7 +122,9 @@ def search_word_command():
                     {"name": "🈯 按汉字查询", "value": "kanji"},
                     {"name": "🇺🇸 按英文含义查询", "value": "meaning"},
                     {"name": "🔤 按罗马音查询", "value": "romaji"},
+                    {"name": "📝 搜索例句", "value": "examples"},
                     {"name": "⭐ 查看常用词汇", "value": "common"},
+                    {"name": "📊 查询诊断", "value": "diagnostics"},
                     {"name": "🔙 返回主菜单", "value": "back"},
                 ],
                 pointer=">",
@@ -93,21 +134,25 @@ def search_word_command():
             if choice == "back":
                 break
             elif choice == "kana":
-                search_by_kana(manager)
+                search_by_kana(manager, profile)
             elif choice == "kanji":
-                search_by_kanji(manager)
+                search_by_kanji(manager, profile)
             elif choice == "meaning":
-                search_by_meaning(manager)
+                search_by_meaning(manager, profile)
             elif choice == "romaji":
-                search_by_romaji(manager)
+                search_by_romaji(manager, profile)
+            elif choice == "examples":
+                search_examples(manager)
             elif choice == "common":
-                show_common_words(manager)
+                show_common_words(manager, profile)
+            elif choice == "diagnostics":
+                show_diagnostics(manager)
 
     finally:
         manager.disconnect()
 
 
-def search_by_kana(manager: JMdictSQLiteManager):
+def search_by_kana(manager: JMdictSQLiteManager, profile=None):
     """按假名查询"""
     console.print("\n[bold cyan]🔤 按假名查询[/bold cyan]")
     kana = input("请输入假名: ").strip()
@@ -116,14 +161,17 @@ def search_by_kana(manager: JMdictSQLiteManager):
         console.print("[red]请输入有效的假名[/red]")
         return
 
+    cross_script = inquirer.confirm(message="同时匹配平假名和片假名？", default=True).execute()
+
     console.print(f"\n[green]正在查询包含假名 '{kana}' 的词汇...[/green]")
-    words = manager.find_words_with_kana(kana, max_results=10)
+    words = manager.find_words_with_kana(kana, max_results=10, cross_script=cross_script)
 
     if words:
         console.print(f"\n[bold]找到 {len(words)} 个相关词汇:[/bold]")
         for i, word in enumerate(words, 1):
             console.print(f"\n[bold cyan]词汇 {i}:[/bold cyan]")
             console.print(manager.format_word_display(word))
+        offer_vocab_cards(words, profile)
     else:
         console.print("[yellow]未找到相关词汇[/yellow]")
 
@@ -132,7 +180,7 @@ def search_by_kana(manager: JMdictSQLiteManager):
     show_search_header()
 
 
-def search_by_kanji(manager: JMdictSQLiteManager):
+def search_by_kanji(manager: JMdictSQLiteManager, profile=None):
     """按汉字查询"""
     console.print("\n[bold cyan]🈯 按汉字查询[/bold cyan]")
     kanji = input("请输入汉字: ").strip()
@@ -149,6 +197,7 @@ def search_by_kanji(manager: JMdictSQLiteManager):
         for i, word in enumerate(words, 1):
             console.print(f"\n[bold cyan]词汇 {i}:[/bold cyan]")
             console.print(manager.format_word_display(word))
+        offer_vocab_cards(words, profile)
     else:
         console.print("[yellow]未找到相关词汇[/yellow]")
 
@@ -157,7 +206,7 @@ def search_by_kanji(manager: JMdictSQLiteManager):
     show_search_header()
 
 
-def search_by_meaning(manager: JMdictSQLiteManager):
+def search_by_meaning(manager: JMdictSQLiteManager, profile=None):
     """按英文含义查询"""
     console.print("\n[bold cyan]🇺🇸 按英文含义查询[/bold cyan]")
     meaning = input("请输入英文含义: ").strip()
@@ -174,6 +223,7 @@ def search_by_meaning(manager: JMdictSQLiteManager):
         for i, word in enumerate(words, 1):
             console.print(f"\n[bold cyan]词汇 {i}:[/bold cyan]")
             console.print(manager.format_word_display(word))
+        offer_vocab_cards(words, profile)
     else:
         console.print("[yellow]未找到相关词汇[/yellow]")
 
@@ -182,7 +232,7 @@ def search_by_meaning(manager: JMdictSQLiteManager):
     show_search_header()
 
 
-def search_by_romaji(manager: JMdictSQLiteManager):
+def search_by_romaji(manager: JMdictSQLiteManager, profile=None):
     """按罗马音查询"""
     console.print("\n[bold cyan]🔤 按罗马音查询[/bold cyan]")
     romaji = input("请输入罗马音: ").strip()
@@ -199,6 +249,7 @@ def search_by_romaji(manager: JMdictSQLiteManager):
         for i, word in enumerate(words, 1):
             console.print(f"\n[bold cyan]词汇 {i}:[/bold cyan]")
             console.print(manager.format_word_display(word))
+        offer_vocab_cards(words, profile)
     else:
         console.print("[yellow]未找到相关词汇[/yellow]")
 
@@ -207,7 +258,86 @@ def search_by_romaji(manager: JMdictSQLiteManager):
     show_search_header()
 
 
-def show_common_words(manager: JMdictSQLiteManager):
+def offer_vocab_cards(words, profile):
+    """让用户勾选要加入词汇卡片的词"""
+    if profile is None:
+        return
+    choices = [
+        {"name": f"{'、'.join(word.kanji or word.kana)}（{word.kana[0]}）", "value": word}
+        for word in words
+        if word.kana
+    ]
+    if not choices:
+        return
+    selected = inquirer.checkbox(
+        message="加入词汇卡片:",
+        choices=choices,
+        pointer=">",
+        instruction="(空格勾选，Enter确认，不勾选则跳过)",
+    ).execute()
+    if selected:
+        added = profile.add_vocab_words(selected)
+        console.print(f"[green]已加入 {added} 张词汇卡片（{len(selected) - added} 张已存在）[/green]")
+
+
+def search_examples(manager: JMdictSQLiteManager):
+    """搜索例句（按相关度排序，分页显示）"""
+    console.print("\n[bold cyan]📝 搜索例句[/bold cyan]")
+    text = input("请输入要查找的假名或汉字: ").strip()
+
+    if not text:
+        console.print("[red]请输入有效的假名或汉字[/red]")
+        return
+
+    page = 0
+    while True:
+        # 多取一条用于判断是否还有下一页
+        results = manager.search_examples(text, JMDICT_EXAMPLE_PAGE_SIZE + 1, page * JMDICT_EXAMPLE_PAGE_SIZE)
+        has_next = len(results) > JMDICT_EXAMPLE_PAGE_SIZE
+        results = results[:JMDICT_EXAMPLE_PAGE_SIZE]
+
+        if not results:
+            body = Text("未找到包含该内容的例句" if page == 0 else "没有更多例句了", style="yellow")
+        else:
+            table = Table(title=f"包含 '{escape(text)}' 的例句（第 {page + 1} 页）", box=box.MINIMAL_DOUBLE_HEAD)
+            table.add_column("#", justify="right")
+            table.add_column("例句", justify="left")
+            table.add_column("词条", justify="left")
+            table.add_column("含义", justify="left")
+            for i, item in enumerate(results, page * JMDICT_EXAMPLE_PAGE_SIZE + 1):
+                sentence = escape(item["text"]).replace(escape(text), f"[bold yellow]{escape(text)}[/bold yellow]")
+                word = item["word"]
+                if word:
+                    headword = "、".join(word.kanji or word.kana)
+                    reading = f"（{'、'.join(word.kana)}）" if word.kanji else ""
+                    _, meanings = word.head_senses(1)
+                    table.add_row(str(i), sentence, escape(headword + reading), escape(", ".join(meanings)))
+                else:
+                    table.add_row(str(i), sentence, "-", "-")
+            body = table
+        # 翻页时标题不变，只重写表格中变化的行
+        screen.show(search_header(), Text(""), body)
+
+        choices = []
+        if has_next:
+            choices.append({"name": "➡️  下一页", "value": "next"})
+        if page > 0:
+            choices.append({"name": "⬅️  上一页", "value": "prev"})
+        choices.append({"name": "🔙 返回", "value": "back"})
+        action = inquirer.select(message="请选择:", choices=choices, pointer=">").execute()
+
+        if action == "next":
+            page += 1
+        elif action == "prev":
+            page -= 1
+        else:
+            break
+
+    clear_screen()
+    show_search_header()
+
+
+def show_common_words(manager: JMdictSQLiteManager, profile=None):
     """显示常用词汇"""
     console.print("\n[bold cyan]⭐ 常用词汇列表[/bold cyan]")
 
@@ -225,6 +355,7 @@ def show_common_words(manager: JMdictSQLiteManager):
         for i, word in enumerate(words, 1):
             console.print(f"\n[bold cyan]词汇 {i}:[/bold cyan]")
             console.print(manager.format_word_display(word))
+        offer_vocab_cards(words, profile)
     else:
         console.print("[yellow]未找到常用词汇[/yellow]")
 
@@ -233,6 +364,61 @@ def show_common_words(manager: JMdictSQLiteManager):
     show_search_header()
 
 
+def show_diagnostics(manager: JMdictSQLiteManager):
+    """显示本次查词的查询耗时统计和最近的慢查询"""
+    console.print("\n[bold cyan]📊 查询诊断[/bold cyan]")
+    instrumentation = manager.instrumentation
+    summary = instrumentation.summary()
+
+    if not summary:
+        console.print("[yellow]还没有执行过查询[/yellow]")
+    else:
+        table = Table(title="查询耗时（毫秒）", box=box.MINIMAL_DOUBLE_HEAD)
+        table.add_column("查询方式", justify="left")
+        table.add_column("次数", justify="right")
+        table.add_column("平均行数", justify="right")
+        table.add_column("p50", justify="right")
+        table.add_column("p95", justify="right")
+        table.add_column("p99", justify="right")
+        table.add_column("最大", justify="right")
+        table.add_column("错误", justify="right")
+        for item in summary:
+            table.add_row(
+                DIAGNOSTIC_LABELS.get(item["method"], item["method"]),
+                str(item["calls"]),
+                f"{item['rows'] / item['calls']:.1f}" if item["calls"] else "-",
+                f"{item['p50_ms']:.2f}",
+                f"{item['p95_ms']:.2f}",
+                f"{item['p99_ms']:.2f}",
+                f"{item['max_ms']:.2f}",
+                f"[red]{item['errors']}[/red]" if item["errors"] else "0",
+            )
+        console.print(table)
+        console.print(
+            f"SQL语句: {instrumentation.statements} 条，共 {instrumentation.statement_ms:.1f} ms；"
+            f"慢查询（≥ {instrumentation.slow_ms} ms）: {instrumentation.slow_count} 条"
+        )
+        for item in summary:
+            if item["last_error"]:
+                console.print(
+                    f"[red]{DIAGNOSTIC_LABELS.get(item['method'], item['method'])} 最近的错误: {item['last_error']}[/red]"
+                )
+
+    for entry in list(instrumentation.recent_slow)[-3:]:
+        console.print(
+            f"\n[yellow]慢查询 {entry['elapsed_ms']:.1f} ms（{entry['method']}，{entry['rows']} 行）[/yellow]"
+        )
+        console.print(entry["sql"], markup=False)
+        for line in entry["plan"]:
+            console.print(f"  → {line}", markup=False)
+    if instrumentation.log_path:
+        console.print(f"\n[dim]慢查询日志: {instrumentation.log_path}[/dim]")
+
+    input("\n按 Enter 键继续...")
+    clear_screen()
+    show_search_header()
+
+
 def migrate_to_database():
     """将词典数据迁移到SQLite数据库"""
     console.print("\n[cyan]开始数据迁移...[/cyan]")
@@ -240,31 +426,45 @@ def migrate_to_database():
     try:
         from .migrate_to_sqlite import JMdictMigrator
 
-        # 创建迁移器实例
+        # 创建迁移器实例：优先直接读取下载的zip压缩包，其次是手动放置的JSON文件
+        zip_file_path = os.path.join(os.path.dirname(__file__), "JMdict.json.zip")
         json_file_path = os.path.join(os.path.dirname(__file__), "JMdict.json")
         db_path = os.path.join(os.path.dirname(__file__), "jmdict.db")
 
-        if not os.path.exists(json_file_path):
-            console.print("[red]错误: 找不到JMdict.json文件，请先更新词典[/red]")
+        source_path = zip_file_path if os.path.exists(zip_file_path) else json_file_path
+        if not os.path.exists(source_path):
+            console.print("[red]错误: 找不到词典文件（JMdict.json.zip 或 JMdict.json），请先更新词典[/red]")
             return
 
-        migrator = JMdictMigrator(json_file_path, db_path)
-
-        # 创建数据库
-        migrator.create_database()
-
-        # 加载JSON数据
-        data = migrator.load_json_data()
-
-        if not data:
-            console.print("[red]错误: 无法加载JSON数据[/red]")
+        # 数据来源（发布资源名和摘要）记录在数据库的 db_meta 表中
+        from .load_jmdict import load_release_cache
+
+        cache = load_release_cache()
+        migrator = JMdictMigrator(
+            source_path,
+            db_path,
+            word_blobs=JMDICT_WORD_BLOBS,
+            source_asset=(cache.get("asset") or {}).get("name"),
+            source_digest=cache.get("installed_digest"),
+        )
+
+        try:
+            # 创建数据库
+            migrator.create_database()
+
+            # 流式读取并迁移数据
+            count = migrator.migrate_from_source()
+        finally:
+            # 关闭连接；迁移失败时同时删除未完成的临时数据库
+            migrator.close()
+        if count == 0:
+            console.print("[red]错误: 数据文件中没有词条[/red]")
             return
 
-        # 迁移数据
-        migrator.migrate_data(data)
+        # 记录数据库对应的词典版本，下次更新时若词典未变化则跳过迁移
+        from .load_jmdict import mark_migrated
 
-        # 关闭连接
-        migrator.close()
+        mark_migrated()
 
         console.print(f"[bold green]✓ 数据迁移完成！数据库文件: {db_path}[/bold green]")
         console.print("[cyan]现在你可以使用SQLite数据库进行快速查询了！[/cyan]")
@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+词典资源下载
+流式下载、断点续传、SHA-256 校验，以及多台机器共享的按内容寻址的资源缓存
+"""
+
+import hashlib
+import os
+import shutil
+from typing import Optional
+
+import requests
+from rich.console import Console
+from rich.progress import (
+    BarColumn,
+    DownloadColumn,
+    Progress,
+    TextColumn,
+    TimeRemainingColumn,
+    TransferSpeedColumn,
+)
+
+from config import DOWNLOAD_CHUNK_SIZE, DOWNLOAD_RETRIES, DOWNLOAD_TIMEOUT
+
+console = Console()
+
+
+class DownloadError(Exception):
+    """下载失败或校验不通过"""
+
+
+def parse_digest(digest: Optional[str]) -> Optional[str]:
+    """解析GitHub资源摘要（格式为 "sha256:<hex>"），返回十六进制SHA-256"""
+    if not digest:
+        return None
+    algorithm, _, value = digest.partition(":")
+    if algorithm.lower() != "sha256" or not value:
+        return None
+    return value.lower()
+
+
+def file_sha256(path: str) -> str:
+    """计算文件的SHA-256"""
+    sha256 = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(DOWNLOAD_CHUNK_SIZE), b""):
+            sha256.update(chunk)
+    return sha256.hexdigest()
+
+
+def download_asset(
+    url: str,
+    dest_path: str,
+    expected_size: Optional[int] = None,
+    expected_digest: Optional[str] = None,
+    proxies: Optional[dict] = None,
+) -> str:
+    """流式下载文件到 dest_path，支持断点续传和SHA-256校验
+
+    未完成的数据保存在 dest_path + ".part"，连接中断后（包括下次运行时）
+    会用 HTTP Range 请求从已下载的位置继续。返回文件的SHA-256。
+    """
+    part_path = dest_path + ".part"
+    sha256_hex = parse_digest(expected_digest)
+
+    with Progress(
+        TextColumn("[progress.description]{task.description}"),
+        BarColumn(),
+        DownloadColumn(),
+        TransferSpeedColumn(),
+        TimeRemainingColumn(),
+        console=console,
+    ) as progress:
+        task = progress.add_task("正在下载词典文件...", total=expected_size)
+
+        for attempt in range(1, DOWNLOAD_RETRIES + 1):
+            offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+            if expected_size is not None and offset > expected_size:
+                # 残留文件比目标还大，只能重新下载
+                os.remove(part_path)
+                offset = 0
+
+            headers = {"Range": f"bytes={offset}-"} if offset else {}
+            try:
+                with requests.get(
+                    url, headers=headers, proxies=proxies, stream=True, timeout=DOWNLOAD_TIMEOUT
+                ) as response:
+                    if response.status_code == 416:
+                        # 请求范围超出文件末尾：.part 已经是完整文件
+                        break
+                    if response.status_code == 200:
+                        # 服务器不支持断点续传，从头开始
+                        offset = 0
+                    elif response.status_code != 206:
+                        raise DownloadError(f"HTTP {response.status_code}")
+
+                    if expected_size is None:
+                        length = response.headers.get("Content-Length")
+                        if length is not None:
+                            progress.update(task, total=offset + int(length))
+                    progress.update(task, completed=offset)
+
+                    with open(part_path, "ab" if offset else "wb") as f:
+                        for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                            f.write(chunk)
+                            progress.update(task, advance=len(chunk))
+                break
+            except (requests.RequestException, OSError) as e:
+                if attempt == DOWNLOAD_RETRIES:
+                    raise DownloadError(f"下载中断（已重试 {DOWNLOAD_RETRIES} 次）: {e}")
+                progress.update(task, description=f"连接中断，正在续传（第 {attempt} 次重试）...")
+
+        progress.update(task, description="正在校验文件...")
+        actual_size = os.path.getsize(part_path)
+        if expected_size is not None and actual_size != expected_size:
+            raise DownloadError(f"文件大小不符: 期望 {expected_size} 字节，实际 {actual_size} 字节")
+
+        digest = file_sha256(part_path)
+        if sha256_hex and digest != sha256_hex:
+            os.remove(part_path)
+            raise DownloadError(f"SHA-256 校验失败: 期望 {sha256_hex}，实际 {digest}")
+
+        os.replace(part_path, dest_path)
+        progress.update(task, description="✓ 下载完成" + ("（SHA-256 校验通过）" if sha256_hex else ""))
+
+    if not sha256_hex:
+        console.print("[yellow]⚠ 发布信息中没有SHA-256摘要，跳过校验[/yellow]")
+    return digest
+
+
+def copy_asset(
+    src_path: str, dest_path: str, expected_size: Optional[int] = None, expected_digest: Optional[str] = None
+) -> str:
+    """从本地镜像复制文件到 dest_path 并校验大小和SHA-256，返回文件的SHA-256"""
+    if not os.path.exists(src_path):
+        raise DownloadError(f"镜像中不存在文件: {src_path}")
+    part_path = dest_path + ".part"
+    sha256_hex = parse_digest(expected_digest)
+    sha256 = hashlib.sha256()
+
+    with Progress(
+        TextColumn("[progress.description]{task.description}"),
+        BarColumn(),
+        DownloadColumn(),
+        TransferSpeedColumn(),
+        console=console,
+    ) as progress:
+        task = progress.add_task("正在从本地镜像复制词典文件...", total=os.path.getsize(src_path))
+        with open(src_path, "rb") as src, open(part_path, "wb") as dest:
+            for chunk in iter(lambda: src.read(DOWNLOAD_CHUNK_SIZE), b""):
+                dest.write(chunk)
+                sha256.update(chunk)
+                progress.update(task, advance=len(chunk))
+
+        actual_size = os.path.getsize(part_path)
+        digest = sha256.hexdigest()
+        if expected_size is not None and actual_size != expected_size:
+            os.remove(part_path)
+            raise DownloadError(f"文件大小不符: 期望 {expected_size} 字节，实际 {actual_size} 字节")
+        if sha256_hex and digest != sha256_hex:
+            os.remove(part_path)
+            raise DownloadError(f"SHA-256 校验失败: 期望 {sha256_hex}，实际 {digest}")
+
+        os.replace(part_path, dest_path)
+        progress.update(task, description="✓ 复制完成" + ("（SHA-256 校验通过）" if sha256_hex else ""))
+    return digest
+
+
+class AssetCache:
+    """按内容寻址的资源缓存
+
+    文件保存在 root/sha256/<前两位>/<完整摘要>，可以放在多台机器共享的目录（如NFS）上，
+    同一份词典只需下载一次。写入时先复制到临时文件再原子重命名，并发写入也不会留下半个文件。
+    """
+
+    def __init__(self, root: str):
+        """初始化缓存目录"""
+        self.root = root
+
+    def path_for(self, digest: str) -> str:
+        """摘要对应的缓存文件路径"""
+        return os.path.join(self.root, "sha256", digest[:2], digest)
+
+    def get(self, digest: Optional[str]) -> Optional[str]:
+        """查找缓存的文件，digest 为 "sha256:<hex>" 或十六进制字符串，不存在时返回None"""
+        sha256_hex = parse_digest(digest) or digest
+        if not sha256_hex:
+            return None
+        path = self.path_for(sha256_hex)
+        return path if os.path.exists(path) else None
+
+    def fetch(self, digest: Optional[str], dest_path: str) -> bool:
+        """把缓存的文件复制到 dest_path 并校验，返回是否命中；复制失败时抛出 OSError"""
+        path = self.get(digest)
+        if path is None:
+            return False
+        # 不能用 .part：那是 download_asset 断点续传的文件，失败时删掉会丢失已下载的部分
+        tmp_path = dest_path + ".cache-tmp"
+        try:
+            shutil.copyfile(path, tmp_path)
+        except OSError:
+            # 不留下复制了一半的文件，调用方可以改为下载
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        if file_sha256(tmp_path) != os.path.basename(path):
+            # 缓存文件已损坏，删除后当作未命中
+            os.remove(tmp_path)
+            self.discard(os.path.basename(path))
+            return False
+        os.replace(tmp_path, dest_path)
+        return True
+
+    def put(self, path: str, digest: str):
+        """把已校验的文件放入缓存"""
+        target = self.path_for(digest)
+        if os.path.exists(target):
+            return
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        tmp_path = f"{target}.{os.getpid()}.tmp"
+        shutil.copyfile(path, tmp_path)
+        os.replace(tmp_path, target)
+
+    def discard(self, digest: str):
+        """删除缓存的文件"""
+        try:
+            os.remove(self.path_for(digest))
+        except OSError:
+            pass
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+词典查询的性能统计
+按方法记录调用次数、返回行数、错误数和延迟直方图；单条 SQL 超过阈值时
+连同 EXPLAIN QUERY PLAN 的结果写入慢查询日志（每行一个 JSON 对象）
+"""
+
+import functools
+import json
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import tracing
+from config import JMDICT_SLOW_QUERY_LOG, JMDICT_SLOW_QUERY_MS
+from tracing import BUCKET_BOUNDS_MS, LatencyHistogram  # noqa: F401  直方图与追踪模块共用
+
+RECENT_SLOW_QUERIES = 20
+
+
+class MethodStats:
+    """单个查询方法的统计"""
+
+    def __init__(self):
+        self.latency = LatencyHistogram()
+        self.rows = 0
+        self.errors = 0
+        self.last_error: Optional[str] = None
+
+
+class QueryInstrumentation:
+    """查询统计与慢查询日志，可以由多个连接（例如连接池）共享"""
+
+    def __init__(self, slow_ms: float = JMDICT_SLOW_QUERY_MS, log_path: Optional[str] = JMDICT_SLOW_QUERY_LOG):
+        """slow_ms 为慢查询阈值（毫秒），log_path 为慢查询日志文件，为None时只保留在内存中"""
+        self.slow_ms = slow_ms
+        self.log_path = log_path
+        self.methods: Dict[str, MethodStats] = {}
+        self.statements = 0
+        self.statement_ms = 0.0
+        self.slow_count = 0
+        self.recent_slow = deque(maxlen=RECENT_SLOW_QUERIES)
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def _stack(self) -> List[str]:
+        """当前线程正在执行的方法栈"""
+        if not hasattr(self._local, "stack"):
+            self._local.stack = []
+        return self._local.stack
+
+    @property
+    def current_method(self) -> Optional[str]:
+        """当前线程最内层的查询方法"""
+        stack = self._stack()
+        return stack[-1] if stack else None
+
+    def _method_stats(self, method: str) -> MethodStats:
+        if method not in self.methods:
+            self.methods[method] = MethodStats()
+        return self.methods[method]
+
+    def record_call(self, method: str, elapsed_ms: float, rows: int):
+        """记录一次方法调用"""
+        with self._lock:
+            stats = self._method_stats(method)
+            stats.latency.add(elapsed_ms)
+            stats.rows += rows
+
+    def record_error(self, error: Exception):
+        """记录当前方法中被捕获的错误"""
+        method = self.current_method or "unknown"
+        with self._lock:
+            stats = self._method_stats(method)
+            stats.errors += 1
+            stats.last_error = str(error)
+        self._write_log({"event": "error", "method": method, "error": str(error)})
+
+    def is_slow(self, elapsed_ms: float) -> bool:
+        """单条SQL是否超过慢查询阈值"""
+        return elapsed_ms >= self.slow_ms
+
+    def record_statement(self, elapsed_ms: float):
+        """记录一条SQL的执行"""
+        with self._lock:
+            self.statements += 1
+            self.statement_ms += elapsed_ms
+
+    def record_slow(self, sql: str, params, elapsed_ms: float, rows: int, plan: List[str]):
+        """记录一条慢查询"""
+        entry = {
+            "event": "slow_query",
+            "method": self.current_method,
+            "elapsed_ms": round(elapsed_ms, 3),
+            "rows": rows,
+            "sql": " ".join(sql.split()),
+            "params": [str(param) for param in params],
+            "plan": plan,
+        }
+        with self._lock:
+            self.slow_count += 1
+            self.recent_slow.append(entry)
+        self._write_log(entry)
+
+    def _write_log(self, entry: Dict):
+        """追加写入慢查询日志"""
+        if not self.log_path:
+            return
+        entry = {"time": datetime.now().isoformat(timespec="seconds"), **entry}
+        try:
+            with self._lock, open(self.log_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        except OSError:
+            # 日志不可写（例如只读目录）时不影响查询
+            pass
+
+    def summary(self) -> List[Dict]:
+        """各方法的统计摘要"""
+        with self._lock:
+            return [
+                {
+                    "method": method,
+                    "calls": stats.latency.count,
+                    "rows": stats.rows,
+                    "errors": stats.errors,
+                    "last_error": stats.last_error,
+                    "mean_ms": round(stats.latency.mean_ms, 3),
+                    "p50_ms": round(stats.latency.percentile(50), 3),
+                    "p95_ms": round(stats.latency.percentile(95), 3),
+                    "p99_ms": round(stats.latency.percentile(99), 3),
+                    "max_ms": round(stats.latency.max_ms, 3),
+                }
+                for method, stats in sorted(self.methods.items())
+            ]
+
+
+def instrumented(func):
+    """记录查询方法耗时和返回行数的装饰器（用于 JMdictSQLiteManager 的方法）"""
+
+    @functools.wraps(func)
+    def wrapper(self, *args, **kwargs):
+        instrumentation = self.instrumentation
+        stack = instrumentation._stack()
+        stack.append(func.__name__)
+        with tracing.span(f"jmdict.{func.__name__}") as trace_span:
+            start = time.perf_counter()
+            try:
+                result = func(self, *args, **kwargs)
+            finally:
+                stack.pop()
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            rows = len(result) if isinstance(result, list) else int(result is not None)
+            trace_span.set(rows=rows)
+        instrumentation.record_call(func.__name__, elapsed_ms, rows)
+        return result
+
+    return wrapper
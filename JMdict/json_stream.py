@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+JMdict JSON 流式解析
+逐个读取顶层对象中 "words" 数组的元素，而不是用 json.load 把整个文件读入内存，
+可以直接作用于 zip 压缩包中成员文件的数据流
+"""
+
+import codecs
+import json
+from typing import Any, BinaryIO, Dict, Iterator, Optional
+
+CHUNK_SIZE = 1024 * 1024
+WHITESPACE = " \t\n\r"
+
+
+class JSONStreamReader:
+    """在二进制流上按需读取并解码JSON值"""
+
+    def __init__(self, stream: BinaryIO, chunk_size: int = CHUNK_SIZE):
+        """初始化读取器"""
+        self.stream = stream
+        self.chunk_size = chunk_size
+        self.decoder = json.JSONDecoder()
+        self.text_decoder = codecs.getincrementaldecoder("utf-8")()
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+        self.bytes_read = 0
+
+    def _fill(self) -> bool:
+        """从流中读取下一块数据，到达末尾时返回False"""
+        if self.eof:
+            return False
+        chunk = self.stream.read(self.chunk_size)
+        self.bytes_read += len(chunk)
+        if not chunk:
+            self.eof = True
+            self.buf = self.buf[self.pos :] + self.text_decoder.decode(b"", final=True)
+        else:
+            self.buf = self.buf[self.pos :] + self.text_decoder.decode(chunk)
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        """跳过空白并返回下一个字符，到达末尾时返回空字符串"""
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buf) or not self._fill():
+                break
+        return self.buf[self.pos] if self.pos < len(self.buf) else ""
+
+    def expect(self, char: str):
+        """读取一个指定的结构字符"""
+        actual = self.peek()
+        if actual != char:
+            raise ValueError(f"JSON格式错误: 期望 {char!r}，实际 {actual!r}（第 {self.bytes_read} 字节附近）")
+        self.pos += 1
+
+    def read_value(self) -> Any:
+        """读取一个完整的JSON值"""
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buf, self.pos)
+                # 数值等没有结束符的值可能被截断在块边界上，需要确认后面还有数据
+                if end < len(self.buf) or self.eof:
+                    self.pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            self._fill()
+
+
+def iter_words(stream: BinaryIO, header: Optional[Dict] = None, reader: Optional[JSONStreamReader] = None) -> Iterator:
+    """逐个产出 JMdict 顶层对象中 "words" 数组的元素
+
+    header: 如果提供，其余的顶层字段（version、tags 等）会写入其中
+    reader: 可以传入自己创建的读取器，以便获取已读取的字节数用于显示进度
+    """
+    reader = reader or JSONStreamReader(stream)
+    if header is None:
+        header = {}
+
+    reader.expect("{")
+    if reader.peek() == "}":
+        return
+
+    while True:
+        key = reader.read_value()
+        reader.expect(":")
+
+        if key == "words":
+            reader.expect("[")
+            if reader.peek() == "]":
+                reader.pos += 1
+            else:
+                while True:
+                    yield reader.read_value()
+                    if reader.peek() == "]":
+                        reader.pos += 1
+                        break
+                    reader.expect(",")
+        else:
+            header[key] = reader.read_value()
+
+        if reader.peek() == "}":
+            return
+        reader.expect(",")
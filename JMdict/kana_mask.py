@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+词条的假名位掩码
+迁移时把每个词条主读音用到的假名单位（kana_romaji 中的单个假名和拗音）编码成定长位掩码，
+“只由已掌握假名组成的词”就变成一次按位测试：掩码 & ~已掌握掩码 == 0。
+安装了 NumPy 时对全部词条向量化计算，否则逐个用 Python 整数计算。
+"""
+
+import importlib.util
+import random
+from typing import Dict, Iterable, List, Optional
+
+from kana_data import kana_romaji
+
+from .kana_script import SMALL_KANA
+
+# 检查NumPy是否可用（只在加载掩码时才导入，避免拖慢启动）
+NUMPY_AVAILABLE = importlib.util.find_spec("numpy") is not None
+
+MASK_BYTES = 32  # 256 位，足够容纳 kana_romaji 中的全部单个假名和拗音
+LONG_VOWEL = "ー"  # 长音符不占位，读作前一个元音
+SOKUON = "っッ"
+
+
+def mask_units() -> List[str]:
+    """参与编码的假名单位（顺序即位序）：kana_romaji 中的单个假名和拗音，不包括 "にほん" 之类的整词"""
+    units = [kana for kana in kana_romaji if len(kana) == 1 or (len(kana) == 2 and kana[1] in SMALL_KANA)]
+    if len(units) > MASK_BYTES * 8:
+        raise ValueError(f"假名单位数 {len(units)} 超出掩码长度 {MASK_BYTES * 8} 位")
+    return units
+
+
+def split_units(text: str, unit_index: Dict[str, int]) -> Optional[List[str]]:
+    """把读音切分为假名单位（优先匹配拗音），含有无法编码的字符时返回None"""
+    units = []
+    index = 0
+    while index < len(text):
+        pair = text[index : index + 2]
+        if len(pair) == 2 and pair in unit_index:
+            units.append(pair)
+            index += 2
+        elif text[index] in unit_index or text[index] == LONG_VOWEL:
+            units.append(text[index])
+            index += 1
+        else:
+            return None
+    return units
+
+
+def encode_mask(text: str, unit_index: Dict[str, int]) -> Optional[bytes]:
+    """读音的位掩码（小端序，MASK_BYTES 字节），无法编码时返回None"""
+    units = split_units(text, unit_index)
+    if not units:
+        return None
+    mask = 0
+    for unit in units:
+        if unit != LONG_VOWEL:
+            mask |= 1 << unit_index[unit]
+    return mask.to_bytes(MASK_BYTES, "little")
+
+
+def reading_romaji(text: str) -> str:
+    """按假名单位把读音转换为罗马音：促音重复下一个辅音，长音符重复前一个元音"""
+    units = split_units(text, {unit: 0 for unit in mask_units()}) or []
+    result = ""
+    double_next = False
+    for unit in units:
+        if unit in SOKUON:
+            double_next = True
+            continue
+        if unit == LONG_VOWEL:
+            result += next((char for char in reversed(result) if char in "aiueo"), "")
+            continue
+        romaji = kana_romaji[unit]
+        if double_next and romaji[0] not in "aiueon":
+            romaji = romaji[0] + romaji
+        double_next = False
+        result += romaji
+    return result
+
+
+class ReadableWordIndex:
+    """全部词条的假名掩码，用于按已掌握的假名筛选可读的词"""
+
+    def __init__(self, word_ids: List, masks: List[bytes], common: List[bool], units: List[str]):
+        """word_ids/masks/common 一一对应，units 为数据库中掩码使用的位序"""
+        self.units = units
+        self.unit_index = {unit: bit for bit, unit in enumerate(units)}
+        self.word_ids = word_ids
+        self.common = common
+        if NUMPY_AVAILABLE:
+            import numpy as np
+
+            # 每个掩码看作 4 个 64 位整数
+            self.masks = np.frombuffer(b"".join(masks), dtype="<u8").reshape(-1, MASK_BYTES // 8)
+            self.word_ids = np.array(word_ids, dtype=np.int64)
+            self.common = np.array(common, dtype=bool)
+        else:
+            self.masks = [int.from_bytes(mask, "little") for mask in masks]
+        self._cache_key = None
+        self._cache = None
+
+    @classmethod
+    def load(cls, manager) -> Optional["ReadableWordIndex"]:
+        """从词典数据库加载，数据库中没有掩码（旧版本）时返回None"""
+        rows = manager.load_kana_masks()
+        if rows is None:
+            return None
+        units, entries = rows
+        return cls(
+            [word_id for word_id, _, _ in entries],
+            [mask for _, mask, _ in entries],
+            [bool(common) for _, _, common in entries],
+            units,
+        )
+
+    def __len__(self) -> int:
+        return len(self.word_ids)
+
+    def mastered_mask(self, mastered: Iterable[str]) -> int:
+        """已掌握的假名集合对应的掩码"""
+        mask = 0
+        for kana in mastered:
+            bit = self.unit_index.get(kana)
+            if bit is not None:
+                mask |= 1 << bit
+        return mask
+
+    def eligible(self, mastered_mask: int):
+        """只由已掌握假名组成的词条下标，以及其中常用词的下标；掩码不变时直接返回上次的结果"""
+        if mastered_mask == self._cache_key:
+            return self._cache
+
+        if NUMPY_AVAILABLE:
+            import numpy as np
+
+            missing = np.frombuffer(
+                (~mastered_mask & ((1 << MASK_BYTES * 8) - 1)).to_bytes(MASK_BYTES, "little"), dtype="<u8"
+            )
+            indexes = np.flatnonzero(~(self.masks & missing).any(axis=1))
+            common = indexes[self.common[indexes]]
+        else:
+            indexes = [index for index, mask in enumerate(self.masks) if mask & ~mastered_mask == 0]
+            common = [index for index in indexes if self.common[index]]
+
+        self._cache_key, self._cache = mastered_mask, (indexes, common)
+        return self._cache
+
+    def count(self, mastered_mask: int) -> int:
+        """可读词条数"""
+        return len(self.eligible(mastered_mask)[0])
+
+    def pick(self, mastered_mask: int, rng=random, common_first: bool = True) -> Optional[int]:
+        """随机选出一个可读词条的id，common_first 时有常用词则只从常用词中选"""
+        indexes, common = self.eligible(mastered_mask)
+        candidates = common if common_first and len(common) else indexes
+        if len(candidates) == 0:
+            return None
+        return int(self.word_ids[candidates[rng.randrange(len(candidates))]])
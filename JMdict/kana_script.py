@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+假名书写体系的折叠
+把片假名统一折叠为平假名，迁移时为每个读音保存折叠后的形式，
+查询时只需比较一列就可以同时匹配平假名和片假名；迁移时还按假名单位统计词条数
+"""
+
+from typing import Dict
+
+# ァ(U+30A1)..ヶ(U+30F6) 与 ぁ(U+3041)..ゖ(U+3096) 一一对应，另加叠字符号 ヽヾ → ゝゞ
+KATAKANA_TO_HIRAGANA = {code: code - 0x60 for code in range(0x30A1, 0x30F7)}
+KATAKANA_TO_HIRAGANA.update({0x30FD: 0x309D, 0x30FE: 0x309E})
+HIRAGANA_TO_KATAKANA = {hiragana: katakana for katakana, hiragana in KATAKANA_TO_HIRAGANA.items()}
+
+
+def fold_kana(text: str) -> str:
+    """把片假名折叠为平假名，其他字符（长音符、汉字等）保持不变"""
+    return text.translate(KATAKANA_TO_HIRAGANA)
+
+
+def to_katakana(text: str) -> str:
+    """把平假名转换为片假名"""
+    return text.translate(HIRAGANA_TO_KATAKANA)
+
+
+# 与前一个假名组成拗音等双字母音节的小写假名
+SMALL_KANA = "ゃゅょぁぃぅぇぉゎャュョァィゥェォヮ"
+KANA_INITIAL = 1
+KANA_FINAL = 2
+
+
+def is_kana(char: str) -> bool:
+    """是否为平假名或片假名（包括长音符）"""
+    return "ぁ" <= char <= "ヿ"
+
+
+def kana_positions(text: str) -> Dict[str, int]:
+    """读音中出现的假名单位及其位置标记（KANA_INITIAL / KANA_FINAL）
+
+    单个假名和拗音（例如 "きゃ"）都作为单位；拗音中的 "き" 也计入，与按假名 LIKE 查询的结果一致
+    """
+    units: Dict[str, int] = {}
+    last = len(text) - 1
+    for index, char in enumerate(text):
+        if not is_kana(char):
+            continue
+        flags = (KANA_INITIAL if index == 0 else 0) | (KANA_FINAL if index == last else 0)
+        units[char] = units.get(char, 0) | flags
+        if index < last and text[index + 1] in SMALL_KANA and char not in SMALL_KANA:
+            pair = text[index : index + 2]
+            flags = (KANA_INITIAL if index == 0 else 0) | (KANA_FINAL if index + 1 == last else 0)
+            units[pair] = units.get(pair, 0) | flags
+    return units
@@ -1,138 +1,234 @@
+import json
 import os
 import zipfile
+from typing import Optional
 
-import requests
 from rich.console import Console
 from rich.panel import Panel
 from rich.progress import Progress, SpinnerColumn, TextColumn
 from rich.text import Text
 
-from config import (
-    JMDICT_ASSET_PREFIX,
-    JMDICT_ASSET_SUFFIX,
-    JMDICT_LOCAL_PATH,
-    JMDICT_URL,
-    JMDICT_ZIP_PATH,
-    PROXY,
-    TEMP_DIR,
-)
+from config import ASSET_CACHE_DIR, JMDICT_LOCAL_PATH, JMDICT_RELEASE_CACHE, JMDICT_SOURCE, JMDICT_ZIP_PATH
 
-from .schema import GithubRelease
+from .download import AssetCache, DownloadError, parse_digest
+from .migrate_to_sqlite import SCHEMA_VERSION, get_db_meta, get_schema_version
+from .release_source import ReleaseSource, ReleaseSourceError, find_target_asset, make_release_source
+from .schema import ReleaseInfo
 
 console = Console()
 
+# update_jmdict 的返回状态
+UPDATE_FAILED = "failed"
+UPDATE_UP_TO_DATE = "up_to_date"
+UPDATE_DONE = "updated"
+
+
+def load_release_cache() -> dict:
+    """读取本地缓存的发布信息（ETag/Last-Modified、资源摘要、已安装/已迁移的摘要）"""
+    if not os.path.exists(JMDICT_RELEASE_CACHE):
+        return {}
+    try:
+        with open(JMDICT_RELEASE_CACHE, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except Exception:
+        return {}
+
+
+def save_release_cache(cache: dict):
+    """保存发布信息缓存"""
+    with open(JMDICT_RELEASE_CACHE, "w", encoding="utf-8") as f:
+        json.dump(cache, f, ensure_ascii=False, indent=2)
+
+
+def needs_migration(db_path: str) -> bool:
+    """数据库是否需要根据已安装的词典重新迁移"""
+    if get_schema_version(db_path) != SCHEMA_VERSION:
+        return True
+    cache = load_release_cache()
+    installed = cache.get("installed_digest")
+    if not installed:
+        return True
+    # 数据库的 db_meta 记录了迁移时使用的词典摘要；旧数据库退回到发布信息缓存中的记录
+    meta = get_db_meta(db_path)
+    if meta.get("source_digest"):
+        return meta["source_digest"] != installed
+    return cache.get("migrated_digest") != installed
+
+
+def mark_migrated():
+    """记录数据库已经由当前安装的词典迁移而来"""
+    cache = load_release_cache()
+    if cache.get("installed_digest"):
+        cache["migrated_digest"] = cache["installed_digest"]
+        save_release_cache(cache)
+
+
+def get_latest_release(source: ReleaseSource, cache: Optional[dict] = None) -> tuple[ReleaseInfo | None, bool]:
+    """从发布源获取最新发布版本，返回 (release, not_modified)
+
+    传入缓存时发送条件请求（If-None-Match / If-Modified-Since），
+    发布信息未变化时不下载也不解析，返回 (None, True)。
+    """
+    if cache is None:
+        cache = {}
 
-def get_latest_release() -> GithubRelease | None:
     with Progress(
         SpinnerColumn(),
         TextColumn("[progress.description]{task.description}"),
         console=console,
     ) as progress:
-        task = progress.add_task("正在获取最新发布版本...", total=None)
+        task = progress.add_task(f"正在从 {source.describe()} 获取最新发布版本...", total=None)
 
         try:
-            response = requests.get(JMDICT_URL, proxies={"http": PROXY, "https": PROXY})
-            if response.status_code == 200:
-                release = GithubRelease.model_validate_json(response.text)
-                progress.update(task, description="✓ 获取发布版本成功")
-                return release
-            else:
-                progress.update(task, description=f"✗ 获取发布版本失败: HTTP {response.status_code}")
-                console.print(f"[red]错误信息: {response.text}[/red]")
-                return None
-        except Exception as e:
-            progress.update(task, description=f"✗ 获取发布版本出错: {e}")
-            return None
-
-
-def update_jmdict():
-    console.print(f"[yellow]正在更新 {JMDICT_LOCAL_PATH}...[/yellow]")
-
-    release = get_latest_release()
+            release, not_modified = source.fetch_release(cache)
+        except (ReleaseSourceError, ValueError) as e:
+            progress.update(task, description=f"✗ 获取发布版本失败: {e}")
+            return None, False
+
+        if not_modified:
+            progress.update(task, description="✓ 发布版本未变化")
+            return None, True
+
+        cache["release_tag"] = release.tag_name
+        target_asset = find_target_asset(release)
+        cache["asset"] = (
+            {"name": target_asset.name, "digest": target_asset.digest, "size": target_asset.size}
+            if target_asset
+            else None
+        )
+        cache["release_info"] = release.model_dump(mode="json")
+        progress.update(task, description="✓ 获取发布版本成功")
+        return release, False
+
+
+def is_installed(cache: dict) -> bool:
+    """缓存中记录的资源是否已经安装到本地"""
+    asset = cache.get("asset") or {}
+    return bool(
+        asset.get("digest") and cache.get("installed_digest") == asset["digest"] and os.path.exists(JMDICT_ZIP_PATH)
+    )
+
+
+def show_up_to_date(cache: dict):
+    """显示词典已是最新"""
+    info_text = Text(f"✓ 词典已是最新版本（{cache.get('release_tag', '未知版本')}），无需下载", style="bold green")
+    info_panel = Panel(info_text, border_style="green", padding=(1, 2))
+    console.print(info_panel)
+
+
+def update_jmdict() -> str:
+    """更新本地词典，返回 UPDATE_DONE / UPDATE_UP_TO_DATE / UPDATE_FAILED"""
+    console.print(f"[yellow]正在更新 {JMDICT_ZIP_PATH}...[/yellow]")
+
+    try:
+        source = make_release_source(JMDICT_SOURCE)
+    except ValueError as e:
+        console.print(Panel(Text(str(e), style="red"), border_style="red", padding=(1, 2)))
+        return UPDATE_FAILED
+
+    cache = load_release_cache()
+    if cache.get("source") != source.spec:
+        # 切换了发布源，之前的 ETag 和发布信息不再适用（已安装的摘要仍然有效）
+        for key in ("etag", "last_modified", "release_tag", "asset", "release_info"):
+            cache.pop(key, None)
+        cache["source"] = source.spec
+    release, not_modified = get_latest_release(source, cache)
+
+    if not_modified:
+        if is_installed(cache):
+            show_up_to_date(cache)
+            return UPDATE_UP_TO_DATE
+        # 发布信息没变但本地文件缺失或未安装完成，使用缓存的发布信息继续
+        release = ReleaseInfo.model_validate(cache["release_info"]) if cache.get("release_info") else None
+
     if not release:
         error_text = Text("未找到可用的发布版本", style="red")
         error_panel = Panel(error_text, border_style="red", padding=(1, 2))
         console.print(error_panel)
-        return
+        return UPDATE_FAILED
+
+    # 保存新的 ETag 和资源信息
+    save_release_cache(cache)
 
     # 查找合适的资源文件
-    target_asset = None
-    for asset in release.assets:
-        if asset.name.startswith(JMDICT_ASSET_PREFIX) and asset.name.endswith(JMDICT_ASSET_SUFFIX):
-            target_asset = asset
-            break
+    target_asset = find_target_asset(release)
 
     if not target_asset:
         error_text = Text("未找到合适的词典文件", style="red")
         error_panel = Panel(error_text, border_style="red", padding=(1, 2))
         console.print(error_panel)
-        return
+        return UPDATE_FAILED
+
+    # 新发布版本中的资源与已安装的相同时跳过下载
+    if is_installed(cache):
+        show_up_to_date(cache)
+        return UPDATE_UP_TO_DATE
 
     # 显示资源信息
-    asset_info = Text(
-        f"找到资源: {target_asset.name}\n"
-        f"创建时间: {target_asset.created_at}\n"
-        f"上传者: {target_asset.uploader.login}\n"
-        f"文件大小: {target_asset.size / 1024 / 1024:.1f} MB",
-        style="cyan",
-    )
-    asset_panel = Panel(asset_info, border_style="cyan", padding=(1, 2))
+    asset_lines = [f"找到资源: {target_asset.name}"]
+    if target_asset.created_at:
+        asset_lines.append(f"创建时间: {target_asset.created_at}")
+    if target_asset.uploader:
+        asset_lines.append(f"上传者: {target_asset.uploader}")
+    if target_asset.size is not None:
+        asset_lines.append(f"文件大小: {target_asset.size / 1024 / 1024:.1f} MB")
+    asset_lines.append(f"发布源: {source.describe()}")
+    asset_panel = Panel(Text("\n".join(asset_lines), style="cyan"), border_style="cyan", padding=(1, 2))
     console.print(asset_panel)
 
-    # 下载文件
-    with Progress(
-        SpinnerColumn(),
-        TextColumn("[progress.description]{task.description}"),
-        console=console,
-    ) as progress:
-        download_task = progress.add_task("正在下载词典文件...", total=None)
-
+    # 优先使用共享资源缓存，未命中时从发布源获取（下载支持断点续传并校验SHA-256）
+    # 压缩包直接保留在本地，迁移时从中流式读取JSON，不再解压到磁盘
+    asset_cache = AssetCache(ASSET_CACHE_DIR) if ASSET_CACHE_DIR else None
+    cache_hit = False
+    if asset_cache:
         try:
-            response = requests.get(target_asset.browser_download_url, proxies={"http": PROXY, "https": PROXY})
-            with open(os.path.join(TEMP_DIR, JMDICT_ZIP_PATH), "wb") as f:
-                f.write(response.content)
-            progress.update(download_task, description="✓ 下载完成")
-        except Exception as e:
-            progress.update(download_task, description=f"✗ 下载失败: {e}")
-            return
-
-    # 解压文件
-    with Progress(
-        SpinnerColumn(),
-        TextColumn("[progress.description]{task.description}"),
-        console=console,
-    ) as progress:
-        extract_task = progress.add_task("正在解压词典文件...", total=None)
-
+            cache_hit = asset_cache.fetch(target_asset.digest, JMDICT_ZIP_PATH)
+        except OSError as e:
+            # 共享目录不可读、磁盘已满等，改为正常下载
+            console.print(f"[yellow]⚠ 无法从共享缓存 {ASSET_CACHE_DIR} 复制词典文件，改为下载: {e}[/yellow]")
+    if cache_hit:
+        digest = parse_digest(target_asset.digest)
+        console.print(f"[green]✓ 使用共享缓存中的词典文件: {asset_cache.get(digest)}[/green]")
+    else:
         try:
-            with zipfile.ZipFile(os.path.join(TEMP_DIR, JMDICT_ZIP_PATH), "r") as zip_ref:
-                # 获取zip文件中的文件列表
-                file_list = zip_ref.namelist()
-                if len(file_list) == 1:
-                    # 如果zip中只有一个文件，直接解压并移动
-                    zip_ref.extract(file_list[0], TEMP_DIR)
-                    temp_file = os.path.join(TEMP_DIR, file_list[0])
-                    if os.path.exists(JMDICT_LOCAL_PATH):
-                        os.remove(JMDICT_LOCAL_PATH)
-                    os.replace(temp_file, JMDICT_LOCAL_PATH)
-                    progress.update(extract_task, description="✓ 解压完成")
-                else:
-                    progress.update(extract_task, description="✗ zip文件包含多个文件")
-                    error_text = Text(f"zip文件中包含多个文件，请手动解压到 {JMDICT_LOCAL_PATH} 目录下", style="red")
-                    error_panel = Panel(error_text, border_style="red", padding=(1, 2))
-                    console.print(error_panel)
-                    return
-        except Exception as e:
-            progress.update(extract_task, description=f"✗ 解压失败: {e}")
-            return
-
-    # 清理临时文件
+            digest = source.fetch_asset(target_asset, JMDICT_ZIP_PATH)
+        except DownloadError as e:
+            error_text = Text(f"✗ 下载失败: {e}", style="red")
+            error_panel = Panel(error_text, border_style="red", padding=(1, 2))
+            console.print(error_panel)
+            return UPDATE_FAILED
+        if asset_cache:
+            try:
+                asset_cache.put(JMDICT_ZIP_PATH, digest)
+            except OSError as e:
+                console.print(f"[yellow]⚠ 无法写入共享缓存 {ASSET_CACHE_DIR}: {e}[/yellow]")
+
+    # 检查压缩包内容
     try:
-        os.remove(os.path.join(TEMP_DIR, JMDICT_ZIP_PATH))
-    except:
-        pass
+        with zipfile.ZipFile(JMDICT_ZIP_PATH, "r") as zip_ref:
+            json_members = [name for name in zip_ref.namelist() if name.endswith(".json")]
+    except zipfile.BadZipFile as e:
+        error_text = Text(f"✗ 词典压缩包损坏: {e}", style="red")
+        error_panel = Panel(error_text, border_style="red", padding=(1, 2))
+        console.print(error_panel)
+        return UPDATE_FAILED
+
+    if len(json_members) != 1:
+        error_text = Text(
+            f"zip文件中应当只包含一个JSON文件，实际: {json_members}，请手动解压到 {JMDICT_LOCAL_PATH}", style="red"
+        )
+        error_panel = Panel(error_text, border_style="red", padding=(1, 2))
+        console.print(error_panel)
+        return UPDATE_FAILED
+
+    # 记录已安装的资源摘要（发布源没有提供摘要时以实际文件为准）
+    cache["installed_digest"] = f"sha256:{digest}"
+    if cache.get("asset") and not cache["asset"].get("digest"):
+        cache["asset"]["digest"] = cache["installed_digest"]
+    save_release_cache(cache)
 
     # 显示成功信息
-    success_text = Text(f"✓ 词典更新完成！\n文件路径: {JMDICT_LOCAL_PATH}", style="bold green")
+    success_text = Text(f"✓ 词典更新完成！\n文件路径: {JMDICT_ZIP_PATH}", style="bold green")
     success_panel = Panel(success_text, border_style="green", padding=(1, 2))
     console.print(success_panel)
+    return UPDATE_DONE
@@ -6,49 +6,180 @@ JMdict数据迁移脚本
 将JSON数据迁移到SQLite数据库中
 """
 
+import argparse
 import json
 import os
 import sqlite3
-from typing import Any, Dict, List
+import uuid
+import zipfile
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
 
 from rich.console import Console
 from rich.progress import Progress, SpinnerColumn, TextColumn
 
+import tracing
+
+from .json_stream import JSONStreamReader, iter_words
+from .kana_mask import encode_mask, mask_units
+from .kana_script import KANA_FINAL, KANA_INITIAL, fold_kana, kana_positions
+from .word_blob import build_entry, encode_entry
+
 console = Console()
 
+# 流式迁移时每处理多少个词条刷新一次进度
+PROGRESS_INTERVAL = 1000
+
+# 数据库结构版本，保存在 PRAGMA user_version 中；结构变化后旧数据库需要重新迁移
+# 2: 读音和写法拆分到 kana_readings / kanji_writings 表
+# 3: kana_readings 增加折叠为平假名的 folded 列（跨平假名/片假名查询）
+# 4: 增加 db_meta（统计数、构建信息）和 kana_stats（每个假名的词条数）表
+# 5: 增加例句的 trigram 全文索引 examples_fts
+# 6: 增加 word_kana_masks（每个词条主读音的假名位掩码）
+SCHEMA_VERSION = 6
+
+# 迁移先写入该后缀的临时文件，全部完成后再原子替换正式的数据库文件
+BUILD_SUFFIX = ".building"
+
+# 迁移完成时写入 db_meta 的统计数（键: SQL）
+META_COUNTS = {
+    "total_words": "SELECT COUNT(*) FROM words",
+    "common_words": "SELECT COUNT(*) FROM words WHERE common = 1",
+    "total_kana_readings": "SELECT COUNT(*) FROM kana_readings",
+    "total_kanji_writings": "SELECT COUNT(*) FROM kanji_writings",
+    "total_senses": "SELECT COUNT(*) FROM senses",
+    "total_examples": "SELECT COUNT(*) FROM examples",
+}
+
+INDEXES = (
+    # 按读音/写法精确或前缀查找
+    "CREATE INDEX IF NOT EXISTS idx_kana_readings_text ON kana_readings (text, word_id)",
+    "CREATE INDEX IF NOT EXISTS idx_kana_readings_folded ON kana_readings (folded, word_id)",
+    "CREATE INDEX IF NOT EXISTS idx_kanji_writings_text ON kanji_writings (text, word_id)",
+    # 按常用词优先的顺序扫描词条，配合 LIMIT 可以提前结束
+    "CREATE INDEX IF NOT EXISTS idx_words_common ON words (common DESC, id)",
+    "CREATE INDEX IF NOT EXISTS idx_senses_word_id ON senses (word_id, sense_index)",
+    "CREATE INDEX IF NOT EXISTS idx_examples_word_id ON examples (word_id, sense_index)",
+)
+
+
+def get_schema_version(db_path: str) -> int:
+    """读取数据库的结构版本，数据库不存在或无法打开时返回0"""
+    if not os.path.exists(db_path):
+        return 0
+    try:
+        conn = sqlite3.connect(f"file:{os.path.abspath(db_path)}?mode=ro", uri=True)
+        try:
+            return conn.execute("PRAGMA user_version").fetchone()[0]
+        finally:
+            conn.close()
+    except sqlite3.Error:
+        return 0
+
+
+def get_db_meta(db_path: str) -> Dict[str, Any]:
+    """读取数据库的 db_meta 表，数据库不存在或没有该表时返回空字典"""
+    if not os.path.exists(db_path):
+        return {}
+    try:
+        conn = sqlite3.connect(f"file:{os.path.abspath(db_path)}?mode=ro", uri=True)
+        try:
+            return dict(conn.execute("SELECT key, value FROM db_meta").fetchall())
+        finally:
+            conn.close()
+    except sqlite3.Error:
+        return {}
+
 
 class JMdictMigrator:
     """JMdict数据迁移器"""
 
-    def __init__(self, json_file_path: str, db_path: str):
-        """初始化迁移器"""
+    def __init__(
+        self,
+        json_file_path: str,
+        db_path: str,
+        word_blobs: bool = True,
+        source_asset: Optional[str] = None,
+        source_digest: Optional[str] = None,
+    ):
+        """初始化迁移器
+
+        json_file_path: JMdict JSON 文件，或包含它的 zip 压缩包（直接流式读取，不解压到磁盘）
+        word_blobs: 是否额外写入预序列化的 word_blobs 表（查询时一次读取即可得到完整词条）
+        source_asset / source_digest: 数据来源的发布资源名和摘要，记录在 db_meta 中（默认为文件名）
+        """
         self.json_file_path = json_file_path
         self.db_path = db_path
+        self.word_blobs = word_blobs
+        self.source_asset = source_asset or os.path.basename(json_file_path)
+        self.source_digest = source_digest
+        self.build_path = db_path + BUILD_SUFFIX
         self.conn = None
         self.cursor = None
+        # 假名 -> [词条数, 常用词条数, 位于读音开头的词条数, 位于读音结尾的词条数]
+        self.kana_counts: Dict[str, List[int]] = {}
+        # 假名位掩码的位序，写入 db_meta 供读取时使用
+        self.mask_units = mask_units()
+        self.mask_index = {unit: bit for bit, unit in enumerate(self.mask_units)}
 
+    @tracing.traced("migrate.create_database")
     def create_database(self):
-        """创建数据库和表结构"""
+        """创建数据库和表结构
+
+        迁移总是完整重建：在临时文件（db_path + BUILD_SUFFIX）中建表和写入，
+        全部完成后由 install 替换正式的数据库文件；中途失败时原来的数据库保持不变。
+        索引在数据写入完成后由 create_indexes 创建。
+        """
         try:
-            # 连接数据库（如果不存在则创建）
-            self.conn = sqlite3.connect(self.db_path)
+            # 删除上次失败留下的临时文件后重新创建
+            self.remove_build()
+            self.conn = sqlite3.connect(self.build_path)
             self.cursor = self.conn.cursor()
+            self.kana_counts = {}
 
-            # 创建words表
+            # 创建words表（词条本身，读音和写法见下面两张表）
             self.cursor.execute("""
-                CREATE TABLE IF NOT EXISTS words (
+                CREATE TABLE words (
                     id INTEGER PRIMARY KEY,
-                    kanji TEXT,
-                    kana TEXT,
-                    common BOOLEAN
+                    common INTEGER NOT NULL DEFAULT 0
                 )
             """)
 
+            # 创建kana_readings表（每个假名读音一行，folded 为折叠成平假名的读音）
+            self.cursor.execute("""
+                CREATE TABLE kana_readings (
+                    word_id INTEGER NOT NULL,
+                    position INTEGER NOT NULL,
+                    text TEXT NOT NULL,
+                    folded TEXT NOT NULL,
+                    common INTEGER NOT NULL DEFAULT 0,
+                    tags TEXT,
+                    applies_to_kanji TEXT,
+                    PRIMARY KEY (word_id, position),
+                    FOREIGN KEY (word_id) REFERENCES words (id)
+                ) WITHOUT ROWID
+            """)
+
+            # 创建kanji_writings表（每个汉字写法一行）
+            self.cursor.execute("""
+                CREATE TABLE kanji_writings (
+                    word_id INTEGER NOT NULL,
+                    position INTEGER NOT NULL,
+                    text TEXT NOT NULL,
+                    common INTEGER NOT NULL DEFAULT 0,
+                    tags TEXT,
+                    PRIMARY KEY (word_id, position),
+                    FOREIGN KEY (word_id) REFERENCES words (id)
+                ) WITHOUT ROWID
+            """)
+
             # 创建senses表
             self.cursor.execute("""
-                CREATE TABLE IF NOT EXISTS senses (
+                CREATE TABLE senses (
                     id INTEGER PRIMARY KEY AUTOINCREMENT,
                     word_id INTEGER,
+                    sense_index INTEGER,
                     part_of_speech TEXT,
                     related TEXT,
                     antonym TEXT,
@@ -64,7 +195,7 @@ class JMdictMigrator:
 
             # 创建examples表
             self.cursor.execute("""
-                CREATE TABLE IF NOT EXISTS examples (
+                CREATE TABLE examples (
                     id INTEGER PRIMARY KEY AUTOINCREMENT,
                     word_id INTEGER,
                     sense_index INTEGER,
@@ -73,10 +204,41 @@ class JMdictMigrator:
                 )
             """)
 
-            # 创建索引以提高查询性能
-            self.cursor.execute("CREATE INDEX IF NOT EXISTS idx_words_id ON words (id)")
-            self.cursor.execute("CREATE INDEX IF NOT EXISTS idx_senses_word_id ON senses (word_id)")
-            self.cursor.execute("CREATE INDEX IF NOT EXISTS idx_examples_word_id ON examples (word_id)")
+            # 创建db_meta表（统计数和构建信息，迁移完成时写入）
+            self.cursor.execute("""
+                CREATE TABLE db_meta (
+                    key TEXT PRIMARY KEY,
+                    value
+                ) WITHOUT ROWID
+            """)
+
+            # 创建kana_stats表（每个假名单位出现在多少个词条的读音中）
+            self.cursor.execute("""
+                CREATE TABLE kana_stats (
+                    kana TEXT PRIMARY KEY,
+                    word_count INTEGER NOT NULL,
+                    common_count INTEGER NOT NULL,
+                    initial_count INTEGER NOT NULL,
+                    final_count INTEGER NOT NULL
+                ) WITHOUT ROWID
+            """)
+
+            # 创建word_kana_masks表（主读音只由 kana_romaji 中的假名组成的词条才有）
+            self.cursor.execute("""
+                CREATE TABLE word_kana_masks (
+                    word_id INTEGER PRIMARY KEY,
+                    mask BLOB NOT NULL
+                )
+            """)
+
+            # 创建word_blobs表（可选，每个词条一个预序列化的数据块）
+            if self.word_blobs:
+                self.cursor.execute("""
+                    CREATE TABLE word_blobs (
+                        word_id INTEGER PRIMARY KEY,
+                        data BLOB NOT NULL
+                    )
+                """)
 
             self.conn.commit()
             console.print("[green]✓ 数据库和表结构创建成功[/green]")
@@ -85,6 +247,56 @@ class JMdictMigrator:
             console.print(f"[red]✗ 创建数据库失败: {e}[/red]")
             raise
 
+    @tracing.traced("migrate.write_metadata")
+    def write_metadata(self):
+        """写入 kana_stats 和 db_meta（统计数、构建id、数据来源、构建时间）"""
+        self.cursor.executemany(
+            "INSERT OR REPLACE INTO kana_stats VALUES (?, ?, ?, ?, ?)",
+            [(kana, *counts) for kana, counts in sorted(self.kana_counts.items())],
+        )
+
+        meta = {key: self.cursor.execute(sql).fetchone()[0] for key, sql in META_COUNTS.items()}
+        meta.update(
+            {
+                "schema_version": SCHEMA_VERSION,
+                # 每次迁移生成新的构建id，查询结果缓存可以据此判断数据库是否已被重建
+                "build_id": uuid.uuid4().hex,
+                "built_at": datetime.now().isoformat(timespec="seconds"),
+                "source_asset": self.source_asset,
+                "source_digest": self.source_digest,
+                "word_blobs": int(self.word_blobs),
+                "kana_mask_units": json.dumps(self.mask_units, ensure_ascii=False),
+            }
+        )
+        self.cursor.executemany("INSERT OR REPLACE INTO db_meta (key, value) VALUES (?, ?)", meta.items())
+        self.conn.commit()
+
+    @tracing.traced("migrate.create_example_index")
+    def create_example_index(self) -> bool:
+        """为例句创建 trigram 全文索引（外部内容表，不重复保存例句），SQLite 不支持时跳过"""
+        try:
+            self.cursor.execute("""
+                CREATE VIRTUAL TABLE examples_fts USING fts5(
+                    example_text, content='examples', content_rowid='id', tokenize='trigram'
+                )
+            """)
+        except sqlite3.OperationalError as e:
+            # 需要 SQLite 3.34+ 并启用 FTS5；没有索引时例句搜索退回 LIKE 扫描
+            console.print(f"[yellow]警告: 无法创建例句全文索引（{e}），例句搜索将使用较慢的扫描[/yellow]")
+            return False
+        self.cursor.execute("INSERT INTO examples_fts (examples_fts) VALUES ('rebuild')")
+        return True
+
+    @tracing.traced("migrate.create_indexes")
+    def create_indexes(self):
+        """创建索引以提高查询性能（在批量写入之后创建更快）"""
+        for statement in INDEXES:
+            self.cursor.execute(statement)
+        self.create_example_index()
+        self.cursor.execute("ANALYZE")
+        self.cursor.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        self.conn.commit()
+
     def load_json_data(self) -> Dict[str, Any]:
         """加载JSON数据"""
         try:
@@ -96,66 +308,161 @@ class JMdictMigrator:
             console.print(f"[red]✗ 加载JSON数据失败: {e}[/red]")
             raise
 
+    @contextmanager
+    def open_source(self):
+        """打开数据源，产出 (二进制流, 未压缩字节数)；zip 压缩包直接读取其中的 JSON 成员"""
+        if zipfile.is_zipfile(self.json_file_path):
+            with zipfile.ZipFile(self.json_file_path) as archive:
+                members = [info for info in archive.infolist() if info.filename.endswith(".json")]
+                if len(members) != 1:
+                    raise ValueError(f"zip文件中应当只包含一个JSON文件，实际: {archive.namelist()}")
+                with archive.open(members[0]) as stream:
+                    yield stream, members[0].file_size
+        else:
+            with open(self.json_file_path, "rb") as stream:
+                yield stream, os.path.getsize(self.json_file_path)
+
+    def migrate_from_source(self) -> int:
+        """流式读取数据源并迁移到数据库，返回迁移的词条数"""
+        with self.open_source() as (stream, total_bytes):
+            reader = JSONStreamReader(stream)
+            return self.migrate_words(iter_words(stream, reader=reader), reader=reader, total_bytes=total_bytes)
+
     def migrate_data(self, data: Dict[str, Any]):
-        """迁移数据到数据库"""
+        """迁移已加载的JSON数据到数据库"""
         words = data.get("words", [])
+        self.migrate_words(words, total_words=len(words))
+
+    def migrate_words(
+        self,
+        words: Iterable[Dict],
+        total_words: Optional[int] = None,
+        reader: Optional[JSONStreamReader] = None,
+        total_bytes: Optional[int] = None,
+    ) -> int:
+        """迁移词条序列到数据库，返回迁移的词条数
+
+        对列表按词条数显示进度；对流式数据按已读取的字节数显示进度
+        """
+        count = 0
 
         with Progress(
             SpinnerColumn(), TextColumn("[progress.description]{task.description}"), console=console
         ) as progress:
-            task = progress.add_task("正在迁移数据...", total=len(words))
-
-            for word in words:
-                try:
-                    # 插入words表
-                    word_id = word.get("id")
-                    kanji_text = self._extract_kanji_text(word.get("kanji", []))
-                    kana_text = self._extract_kana_text(word.get("kana", []))
-                    is_common = self._is_common_word(word.get("kana", []))
-
-                    self.cursor.execute(
-                        """
-                        INSERT OR REPLACE INTO words (id, kanji, kana, common)
-                        VALUES (?, ?, ?, ?)
-                    """,
-                        (word_id, kanji_text, kana_text, is_common),
-                    )
-
-                    # 插入senses表
-                    for sense_index, sense in enumerate(word.get("sense", [])):
-                        self._insert_sense(word_id, sense)
-
-                        # 插入examples表
-                        self._insert_examples(word_id, sense_index, sense.get("examples", []))
-
-                    progress.update(task, advance=1)
-
-                except Exception as e:
-                    console.print(f"[yellow]警告: 迁移词条 {word.get('id', 'unknown')} 时出错: {e}[/yellow]")
-                    continue
-
-            self.conn.commit()
-            progress.update(task, description="✓ 数据迁移完成")
+            task = progress.add_task("正在迁移数据...", total=total_bytes if reader else total_words)
+
+            with tracing.span("migrate.words") as trace_span:
+                for word in words:
+                    try:
+                        self._migrate_word(word)
+                    except Exception as e:
+                        console.print(f"[yellow]警告: 迁移词条 {word.get('id', 'unknown')} 时出错: {e}[/yellow]")
+                        tracing.count("migrate.word_errors")
+                        continue
+
+                    count += 1
+                    if reader is None:
+                        progress.update(task, advance=1)
+                    elif count % PROGRESS_INTERVAL == 0:
+                        percent = f"{reader.bytes_read / total_bytes * 100:.0f}%" if total_bytes else ""
+                        progress.update(
+                            task, completed=reader.bytes_read, description=f"正在迁移数据... {count} 个词条 {percent}"
+                        )
 
-    def _extract_kanji_text(self, kanji_list: List[Dict]) -> str:
-        """提取汉字文本"""
-        if not kanji_list:
-            return ""
-        texts = [kanji.get("text", "") for kanji in kanji_list if kanji.get("text")]
-        return ", ".join(texts)
+                self.conn.commit()
+                trace_span.set(words=count)
+            tracing.count("migrate.words", count)
+            progress.update(task, description="正在写入统计信息...")
+            self.write_metadata()
+            progress.update(task, description="正在创建索引...")
+            self.create_indexes()
+            # 没有迁移任何词条时保留原来的数据库
+            if count:
+                self.install()
+            progress.update(task, description=f"✓ 数据迁移完成，共 {count} 个词条")
+
+        return count
+
+    def _migrate_word(self, word: Dict):
+        """迁移单个词条"""
+        # 插入words表
+        word_id = word.get("id")
+        kana_list = word.get("kana", [])
+        kanji_list = word.get("kanji", [])
+        is_common = self._is_common_word(kana_list)
+
+        self.cursor.execute("INSERT OR REPLACE INTO words (id, common) VALUES (?, ?)", (word_id, is_common))
+
+        # 插入读音和写法，保留每一项自己的常用标记和标签
+        self.cursor.executemany(
+            """
+            INSERT OR REPLACE INTO kana_readings (word_id, position, text, folded, common, tags, applies_to_kanji)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        """,
+            [
+                (
+                    word_id,
+                    position,
+                    kana["text"],
+                    fold_kana(kana["text"]),
+                    bool(kana.get("common")),
+                    ", ".join(kana.get("tags", [])),
+                    ", ".join(kana.get("appliesToKanji", [])),
+                )
+                for position, kana in enumerate(item for item in kana_list if item.get("text"))
+            ],
+        )
+        self.cursor.executemany(
+            """
+            INSERT OR REPLACE INTO kanji_writings (word_id, position, text, common, tags)
+            VALUES (?, ?, ?, ?, ?)
+        """,
+            [
+                (word_id, position, kanji["text"], bool(kanji.get("common")), ", ".join(kanji.get("tags", [])))
+                for position, kanji in enumerate(item for item in kanji_list if item.get("text"))
+            ],
+        )
 
-    def _extract_kana_text(self, kana_list: List[Dict]) -> str:
-        """提取假名文本"""
-        if not kana_list:
-            return ""
-        texts = [kana.get("text", "") for kana in kana_list if kana.get("text")]
-        return ", ".join(texts)
+        self._count_kana(kana_list, is_common)
+
+        readings = [kana["text"] for kana in kana_list if kana.get("text")]
+        mask = encode_mask(readings[0], self.mask_index) if readings else None
+        if mask is not None:
+            self.cursor.execute("INSERT OR REPLACE INTO word_kana_masks (word_id, mask) VALUES (?, ?)", (word_id, mask))
+
+        if self.word_blobs:
+            self.cursor.execute(
+                "INSERT OR REPLACE INTO word_blobs (word_id, data) VALUES (?, ?)",
+                (word_id, encode_entry(build_entry(word))),
+            )
+
+        # 插入senses表
+        for sense_index, sense in enumerate(word.get("sense", [])):
+            self._insert_sense(word_id, sense_index, sense)
+
+            # 插入examples表
+            self._insert_examples(word_id, sense_index, sense.get("examples", []))
+
+    def _count_kana(self, kana_list: List[Dict], is_common: bool):
+        """累计词条读音中出现的假名（每个词条只计一次）"""
+        units: Dict[str, int] = {}
+        for kana in kana_list:
+            for unit, flags in kana_positions(kana.get("text") or "").items():
+                units[unit] = units.get(unit, 0) | flags
+        for unit, flags in units.items():
+            counts = self.kana_counts.get(unit)
+            if counts is None:
+                counts = self.kana_counts[unit] = [0, 0, 0, 0]
+            counts[0] += 1
+            counts[1] += is_common
+            counts[2] += bool(flags & KANA_INITIAL)
+            counts[3] += bool(flags & KANA_FINAL)
 
     def _is_common_word(self, kana_list: List[Dict]) -> bool:
         """判断是否为常用词"""
         return any(kana.get("common", False) for kana in kana_list)
 
-    def _insert_sense(self, word_id: str, sense: Dict) -> int:
+    def _insert_sense(self, word_id: str, sense_index: int, sense: Dict) -> int:
         """插入sense数据并返回sense_id"""
         part_of_speech = ", ".join([str(item) for item in sense.get("partOfSpeech", [])])
         related = ", ".join([", ".join([str(item) for item in rel]) for rel in sense.get("related", [])])
@@ -169,11 +476,23 @@ class JMdictMigrator:
 
         self.cursor.execute(
             """
-            INSERT INTO senses (word_id, part_of_speech, related, antonym, field, 
+            INSERT INTO senses (word_id, sense_index, part_of_speech, related, antonym, field,
                               dialect, misc, info, language_source, gloss)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
         """,
-            (word_id, part_of_speech, related, antonym, field, dialect, misc, info, language_source, gloss),
+            (
+                word_id,
+                sense_index,
+                part_of_speech,
+                related,
+                antonym,
+                field,
+                dialect,
+                misc,
+                info,
+                language_source,
+                gloss,
+            ),
         )
 
         return self.cursor.lastrowid
@@ -195,7 +514,8 @@ class JMdictMigrator:
         for example in examples:
             if "sentences" in example:
                 for sentence in example["sentences"]:
-                    if sentence.get("land") == "jpn" and sentence.get("text"):
+                    # jmdict-simplified 的字段名是 "lang"，兼容旧数据中的 "land"
+                    if sentence.get("lang", sentence.get("land")) == "jpn" and sentence.get("text"):
                         self.cursor.execute(
                             """
                             INSERT INTO examples (word_id, sense_index, example_text)
@@ -204,35 +524,62 @@ class JMdictMigrator:
                             (word_id, sense_index, sentence["text"]),
                         )
 
+    def install(self):
+        """关闭临时数据库并原子替换正式的数据库文件（已打开旧文件的读取方不受影响）"""
+        self.conn.commit()
+        self.conn.close()
+        self.conn = None
+        self.cursor = None
+        os.replace(self.build_path, self.db_path)
+
+    def remove_build(self):
+        """删除未完成的临时数据库文件"""
+        for path in (self.build_path, self.build_path + "-journal"):
+            if os.path.exists(path):
+                os.remove(path)
+
     def close(self):
-        """关闭数据库连接"""
+        """关闭数据库连接，迁移未完成时删除临时文件"""
         if self.conn:
             self.conn.close()
+            self.conn = None
+            self.cursor = None
             console.print("[green]✓ 数据库连接已关闭[/green]")
+        self.remove_build()
 
 
 def main():
     """主函数"""
-    json_file_path = "JMdict.json"
-    db_path = "jmdict.db"
-
-    if not os.path.exists(json_file_path):
-        console.print(f"[red]错误: 找不到JSON文件 {json_file_path}[/red]")
+    parser = argparse.ArgumentParser(description="将 JMdict JSON（或其 zip 压缩包）迁移到 SQLite 数据库")
+    parser.add_argument("source", nargs="?", default="JMdict.json.zip", help="JSON 文件或 zip 压缩包")
+    parser.add_argument("--db", default="jmdict.db", help="数据库文件")
+    parser.add_argument("--no-blobs", action="store_true", help="不写入预序列化的 word_blobs 表")
+    parser.add_argument("--trace", action="store_true", help="记录各迁移阶段的耗时（见 tracing.py）")
+    parser.add_argument(
+        "--profile", action="store_true", help="剖析迁移过程，写出 .pstats 和火焰图折叠栈（见 profiling.py）"
+    )
+    args = parser.parse_args()
+    if args.trace:
+        tracing.enable()
+    if args.profile:
+        import profiling
+
+        profiling.enable("migrate")
+
+    if not os.path.exists(args.source):
+        console.print(f"[red]错误: 找不到数据文件 {args.source}[/red]")
         return
 
-    migrator = JMdictMigrator(json_file_path, db_path)
+    migrator = JMdictMigrator(args.source, args.db, word_blobs=not args.no_blobs)
 
     try:
         # 创建数据库
         migrator.create_database()
 
-        # 加载JSON数据
-        data = migrator.load_json_data()
-
-        # 迁移数据
-        migrator.migrate_data(data)
+        # 流式读取并迁移数据
+        migrator.migrate_from_source()
 
-        console.print(f"[bold green]✓ 数据迁移完成！数据库文件: {db_path}[/bold green]")
+        console.print(f"[bold green]✓ 数据迁移完成！数据库文件: {args.db}[/bold green]")
 
     except Exception as e:
         console.print(f"[red]✗ 迁移失败: {e}[/red]")
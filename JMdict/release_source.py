@@ -0,0 +1,299 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+词典发布源
+统一 GitHub API、HTTP 镜像和本地目录镜像三种获取词典发布信息与资源文件的方式，
+离线构建机可以只配置一个本地或内网镜像
+
+发布源由一个字符串指定（config.JMDICT_SOURCE 或环境变量 KANA_JMDICT_SOURCE）：
+    github                      GitHub API（默认）
+    https://mirror.example/jmdict/   HTTP 镜像，目录下需要有 release.json
+    /srv/mirror/jmdict 或 file:///srv/mirror/jmdict   本地目录镜像
+
+用法（在能联网的机器上生成本地镜像）：
+    python -m JMdict.release_source mirror /srv/mirror/jmdict
+"""
+
+import argparse
+import os
+from typing import Optional
+from urllib.parse import urljoin, urlsplit
+from urllib.request import url2pathname
+
+import requests
+
+from config import DOWNLOAD_TIMEOUT, JMDICT_ASSET_PREFIX, JMDICT_ASSET_SUFFIX, JMDICT_URL, PROXY
+
+from .download import copy_asset, download_asset
+from .schema import GithubRelease, ReleaseAsset, ReleaseInfo
+
+MANIFEST_NAME = "release.json"
+
+
+class ReleaseSourceError(Exception):
+    """获取发布信息失败"""
+
+
+def get_proxies() -> Optional[dict]:
+    """代理配置，未配置时返回None（requests 仍会读取 HTTP(S)_PROXY 等标准环境变量）"""
+    if not PROXY:
+        return None
+    return {"http": PROXY, "https": PROXY}
+
+
+def find_target_asset(release: ReleaseInfo) -> Optional[ReleaseAsset]:
+    """从发布版本中查找合适的词典资源文件"""
+    for asset in release.assets:
+        if asset.name.startswith(JMDICT_ASSET_PREFIX) and asset.name.endswith(JMDICT_ASSET_SUFFIX):
+            return asset
+    return None
+
+
+def parse_release_manifest(text: str, base_url: str) -> ReleaseInfo:
+    """解析镜像中的 release.json
+
+    既支持 ReleaseInfo 格式，也支持直接保存的 GitHub API 响应；
+    资源的相对路径按 base_url 解析。
+    """
+    try:
+        release = ReleaseInfo.model_validate_json(text)
+    except ValueError:
+        try:
+            release = ReleaseInfo.from_github(GithubRelease.model_validate_json(text))
+        except ValueError as e:
+            raise ReleaseSourceError(f"无法解析 {MANIFEST_NAME}: {e}")
+    for asset in release.assets:
+        asset.download_url = urljoin(base_url, asset.download_url)
+    return release
+
+
+class ReleaseSource:
+    """发布源基类"""
+
+    def __init__(self, spec: str):
+        """spec 为指定该发布源的字符串，用于判断缓存是否属于当前发布源"""
+        self.spec = spec
+
+    def describe(self) -> str:
+        """用于显示的发布源说明"""
+        return self.spec
+
+    def fetch_release(self, cache: dict) -> tuple[Optional[ReleaseInfo], bool]:
+        """获取发布信息，返回 (release, not_modified)
+
+        实现应当利用 cache 中的 etag / last_modified 避免重复获取，
+        并在获取成功后更新它们。发布信息未变化时返回 (None, True)。
+        """
+        raise NotImplementedError
+
+    def fetch_asset(self, asset: ReleaseAsset, dest_path: str) -> str:
+        """获取资源文件到 dest_path 并校验，返回文件的SHA-256"""
+        raise NotImplementedError
+
+
+class HttpReleaseSource(ReleaseSource):
+    """通过 HTTP 条件请求获取发布信息的发布源"""
+
+    def __init__(self, spec: str, url: str):
+        """url 为发布信息地址"""
+        super().__init__(spec)
+        self.url = url
+        self.proxies = get_proxies()
+
+    def parse_release(self, text: str) -> ReleaseInfo:
+        """解析发布信息"""
+        raise NotImplementedError
+
+    def fetch_release(self, cache: dict) -> tuple[Optional[ReleaseInfo], bool]:
+        """发送条件请求（If-None-Match / If-Modified-Since）获取发布信息"""
+        headers = {}
+        if cache.get("etag"):
+            headers["If-None-Match"] = cache["etag"]
+        if cache.get("last_modified"):
+            headers["If-Modified-Since"] = cache["last_modified"]
+
+        try:
+            response = requests.get(self.url, headers=headers, proxies=self.proxies, timeout=DOWNLOAD_TIMEOUT)
+        except requests.RequestException as e:
+            raise ReleaseSourceError(str(e))
+
+        if response.status_code == 304:
+            return None, True
+        if response.status_code != 200:
+            raise ReleaseSourceError(f"HTTP {response.status_code}: {response.text[:200]}")
+
+        release = self.parse_release(response.text)
+        cache["etag"] = response.headers.get("ETag")
+        cache["last_modified"] = response.headers.get("Last-Modified")
+        return release, False
+
+    def fetch_asset(self, asset: ReleaseAsset, dest_path: str) -> str:
+        """流式下载资源文件"""
+        return download_asset(
+            asset.download_url,
+            dest_path,
+            expected_size=asset.size,
+            expected_digest=asset.digest,
+            proxies=self.proxies,
+        )
+
+
+class GithubReleaseSource(HttpReleaseSource):
+    """GitHub API 发布源"""
+
+    def __init__(self, spec: str = "github", url: str = JMDICT_URL):
+        super().__init__(spec, url)
+
+    def describe(self) -> str:
+        return f"GitHub ({self.url})"
+
+    def parse_release(self, text: str) -> ReleaseInfo:
+        return ReleaseInfo.from_github(GithubRelease.model_validate_json(text))
+
+
+class HttpMirrorSource(HttpReleaseSource):
+    """HTTP 镜像：目录下的 release.json 描述发布信息，资源文件与其放在一起"""
+
+    def __init__(self, spec: str):
+        base_url = spec if spec.endswith("/") else spec + "/"
+        super().__init__(spec, urljoin(base_url, MANIFEST_NAME))
+        self.base_url = base_url
+
+    def describe(self) -> str:
+        return f"HTTP 镜像 ({self.base_url})"
+
+    def parse_release(self, text: str) -> ReleaseInfo:
+        return parse_release_manifest(text, self.base_url)
+
+
+class LocalMirrorSource(ReleaseSource):
+    """本地目录镜像
+
+    目录下有 release.json 时按其内容获取；否则直接扫描目录中的词典压缩包，
+    取文件名排序最大的一个，SHA-256 摘要从同名的 .sha256 文件读取（没有时在复制时计算）。
+    """
+
+    def __init__(self, spec: str, directory: str):
+        super().__init__(spec)
+        self.directory = os.path.abspath(directory)
+
+    def describe(self) -> str:
+        return f"本地镜像 ({self.directory})"
+
+    def signature(self) -> Optional[str]:
+        """镜像内容的签名（发布信息文件或目录的修改时间），作为本地镜像的 ETag"""
+        manifest = os.path.join(self.directory, MANIFEST_NAME)
+        target = manifest if os.path.exists(manifest) else self.directory
+        try:
+            stat = os.stat(target)
+        except OSError:
+            return None
+        return f"local:{stat.st_mtime_ns}:{stat.st_size}"
+
+    def scan_release(self) -> ReleaseInfo:
+        """扫描目录生成发布信息"""
+        names = sorted(
+            name
+            for name in os.listdir(self.directory)
+            if name.startswith(JMDICT_ASSET_PREFIX) and name.endswith(JMDICT_ASSET_SUFFIX)
+        )
+        if not names:
+            raise ReleaseSourceError(f"本地镜像中没有词典文件: {self.directory}")
+
+        name = names[-1]
+        path = os.path.join(self.directory, name)
+        digest = None
+        sidecar = path + ".sha256"
+        if os.path.exists(sidecar):
+            with open(sidecar, "r", encoding="utf-8") as f:
+                content = f.read().split()
+            if content:
+                digest = f"sha256:{content[0].lower()}"
+
+        tag_name = name[len(JMDICT_ASSET_PREFIX) : -len(JMDICT_ASSET_SUFFIX)].strip("-") or name
+        return ReleaseInfo(
+            tag_name=tag_name,
+            assets=[ReleaseAsset(name=name, size=os.path.getsize(path), digest=digest, download_url=path)],
+        )
+
+    def fetch_release(self, cache: dict) -> tuple[Optional[ReleaseInfo], bool]:
+        if not os.path.isdir(self.directory):
+            raise ReleaseSourceError(f"本地镜像目录不存在: {self.directory}")
+
+        signature = self.signature()
+        if signature and cache.get("etag") == signature:
+            return None, True
+
+        manifest = os.path.join(self.directory, MANIFEST_NAME)
+        if os.path.exists(manifest):
+            with open(manifest, "r", encoding="utf-8") as f:
+                release = parse_release_manifest(f.read(), self.directory + os.sep)
+        else:
+            release = self.scan_release()
+
+        cache["etag"] = signature
+        cache["last_modified"] = None
+        return release, False
+
+    def fetch_asset(self, asset: ReleaseAsset, dest_path: str) -> str:
+        return copy_asset(asset.download_url, dest_path, expected_size=asset.size, expected_digest=asset.digest)
+
+
+def make_release_source(spec: str) -> ReleaseSource:
+    """根据字符串创建发布源"""
+    spec = spec.strip()
+    if not spec or spec.lower() == "github":
+        return GithubReleaseSource()
+    if spec.startswith("github:"):
+        # github:<owner>/<repo>，使用其他仓库的最新发布
+        return GithubReleaseSource(spec, f"https://api.github.com/repos/{spec[len('github:') :]}/releases/latest")
+
+    scheme = urlsplit(spec).scheme.lower()
+    if scheme in ("http", "https"):
+        return HttpMirrorSource(spec)
+    if scheme == "file":
+        return LocalMirrorSource(spec, url2pathname(urlsplit(spec).path))
+    if os.path.isdir(spec):
+        return LocalMirrorSource(spec, spec)
+    raise ValueError(f"无法识别的词典发布源: {spec}（可以是 github、HTTP 镜像地址或本地镜像目录）")
+
+
+def build_mirror(source: ReleaseSource, directory: str) -> ReleaseInfo:
+    """从发布源获取最新的词典文件，写入本地镜像目录并生成 release.json"""
+    release, _ = source.fetch_release({})
+    asset = find_target_asset(release) if release else None
+    if asset is None:
+        raise ReleaseSourceError("未找到合适的词典文件")
+
+    os.makedirs(directory, exist_ok=True)
+    digest = source.fetch_asset(asset, os.path.join(directory, asset.name))
+    with open(os.path.join(directory, asset.name + ".sha256"), "w", encoding="utf-8") as f:
+        f.write(f"{digest}  {asset.name}\n")
+
+    mirrored = ReleaseInfo(
+        tag_name=release.tag_name,
+        published_at=release.published_at,
+        assets=[asset.model_copy(update={"digest": f"sha256:{digest}", "download_url": asset.name})],
+    )
+    with open(os.path.join(directory, MANIFEST_NAME), "w", encoding="utf-8") as f:
+        f.write(mirrored.model_dump_json(indent=2))
+    return mirrored
+
+
+def main(argv=None):
+    """命令行入口"""
+    parser = argparse.ArgumentParser(description="JMdict 发布源工具")
+    subparsers = parser.add_subparsers(dest="action", required=True)
+    mirror_parser = subparsers.add_parser("mirror", help="下载最新词典并生成本地/HTTP镜像目录")
+    mirror_parser.add_argument("directory", help="镜像目录")
+    mirror_parser.add_argument("--from", dest="source", default="github", help="上游发布源（默认 github）")
+    args = parser.parse_args(argv)
+
+    release = build_mirror(make_release_source(args.source), args.directory)
+    asset = release.assets[0]
+    print(f"已生成镜像: {args.directory}（{release.tag_name}，{asset.name}，{asset.digest}）")
+
+
+if __name__ == "__main__":
+    main()
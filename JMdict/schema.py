@@ -36,7 +36,7 @@ class GithubAsset(BaseModel):
     content_type: str = Field(..., description="资源文件类型")
     state: str = Field(..., description="资源文件状态")
     size: int = Field(..., description="资源文件大小")
-    digest: str = Field(..., description="资源文件摘要")
+    digest: Optional[str] = Field(None, description="资源文件摘要（sha256:<hex>）")
     download_count: int = Field(..., description="下载次数")
     created_at: datetime = Field(..., description="创建时间")
     updated_at: datetime = Field(..., description="更新时间")
@@ -64,3 +64,41 @@ class GithubRelease(BaseModel):
     tarball_url: str = Field(..., description="tarball压缩包URL")
     zipball_url: str = Field(..., description="zip压缩包URL")
     body: str = Field(..., description="发布版本描述")
+
+
+class ReleaseAsset(BaseModel):
+    """与发布源无关的资源文件信息"""
+
+    name: str = Field(..., description="资源文件名称")
+    size: Optional[int] = Field(None, description="资源文件大小")
+    digest: Optional[str] = Field(None, description="资源文件摘要（sha256:<hex>）")
+    download_url: str = Field(..., description="下载URL或本地镜像中的文件路径")
+    created_at: Optional[datetime] = Field(None, description="创建时间")
+    uploader: Optional[str] = Field(None, description="上传者")
+
+
+class ReleaseInfo(BaseModel):
+    """与发布源无关的发布版本信息，也是镜像 release.json 的格式"""
+
+    tag_name: str = Field(..., description="标签名称")
+    published_at: Optional[datetime] = Field(None, description="发布时间")
+    assets: list[ReleaseAsset] = Field(default_factory=list, description="资源文件列表")
+
+    @classmethod
+    def from_github(cls, release: GithubRelease) -> "ReleaseInfo":
+        """从 GitHub API 返回的发布信息转换"""
+        return cls(
+            tag_name=release.tag_name,
+            published_at=release.published_at,
+            assets=[
+                ReleaseAsset(
+                    name=asset.name,
+                    size=asset.size,
+                    digest=asset.digest,
+                    download_url=asset.browser_download_url,
+                    created_at=asset.created_at,
+                    uploader=asset.uploader.login,
+                )
+                for asset in release.assets
+            ],
+        )
@@ -6,32 +6,124 @@ JMdict SQLite数据库管理器
 用于从SQLite数据库中查询JMdict数据
 """
 
+import json
+import os
 import random
 import sqlite3
-from typing import Dict, List, Optional
+import time
+from typing import Dict, List, Optional, Tuple
 
 from rich.console import Console
 
 from kana_data import kana_romaji, romaji_hiragana, romaji_katakana, special_romaji_mappings
 
+from .instrumentation import QueryInstrumentation, instrumented
+from .kana_script import fold_kana, to_katakana
+from .word_blob import decode_entry
+from .word_entry import WordEntry
+
 console = Console()
 
+# get_database_stats 返回的统计项（与迁移时写入 db_meta 的统计数同名）
+STATS_KEYS = (
+    "total_words",
+    "common_words",
+    "total_kana_readings",
+    "total_kanji_writings",
+    "total_senses",
+    "total_examples",
+)
+
+
+def like_escape(text: str) -> str:
+    """转义 LIKE 模式中的通配符（配合 ESCAPE '\\' 使用）"""
+    return text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def like_contains(text: str) -> str:
+    """构造"包含 text"的 LIKE 模式"""
+    return f"%{like_escape(text)}%"
+
+
+def like_prefix(text: str) -> str:
+    """构造"以 text 开头"的 LIKE 模式"""
+    return f"{like_escape(text)}%"
+
 
 class JMdictSQLiteManager:
     """JMdict SQLite数据库管理器"""
 
-    def __init__(self, db_path: str = "jmdict.db"):
-        """初始化SQLite管理器"""
+    def __init__(
+        self,
+        db_path: str = "jmdict.db",
+        read_only: bool = False,
+        verbose: bool = True,
+        instrumentation: Optional[QueryInstrumentation] = None,
+    ):
+        """初始化SQLite管理器
+
+        read_only: 以只读方式打开数据库，连接可以在线程之间传递（用于连接池）
+        verbose: 是否在连接/断开时输出提示信息
+        instrumentation: 查询统计，连接池中的多个连接可以共享同一个
+        """
+        self.instrumentation = instrumentation or QueryInstrumentation()
         self.db_path = db_path
+        self.read_only = read_only
+        self.verbose = verbose
         self.conn = None
         self.cursor = None
+        self.has_blobs = False
+        self.has_folded = False
+        self.has_meta = False
+        self.has_example_index = False
+        # 连接时数据库文件的 (inode, 修改时间)，迁移原子替换文件后会变化
+        self.file_id: Optional[Tuple[int, int]] = None
+
+    def _stat_file(self) -> Optional[Tuple[int, int]]:
+        """数据库文件当前的 (inode, 修改时间)，文件不存在时返回None"""
+        try:
+            stat = os.stat(self.db_path)
+        except OSError:
+            return None
+        return stat.st_ino, stat.st_mtime_ns
+
+    def file_replaced(self) -> bool:
+        """数据库文件是否在连接之后被替换（重新迁移会把新库原子替换到原路径）
+
+        已打开的连接仍指向旧文件，在旧连接上查询 build_id 看不到变化，只能比较文件本身
+        """
+        current = self._stat_file()
+        return current is not None and current != self.file_id
+
+    def reconnect(self) -> bool:
+        """断开后重新连接，用于数据库文件被替换之后"""
+        self.disconnect()
+        return self.connect()
 
     def connect(self) -> bool:
         """连接数据库"""
         try:
-            self.conn = sqlite3.connect(self.db_path)
+            self.file_id = self._stat_file()
+            if self.read_only:
+                uri = f"file:{os.path.abspath(self.db_path)}?mode=ro"
+                self.conn = sqlite3.connect(uri, uri=True, check_same_thread=False)
+            else:
+                self.conn = sqlite3.connect(self.db_path)
             self.cursor = self.conn.cursor()
-            console.print(f"[green]✓ 成功连接到数据库: {self.db_path}[/green]")
+            # 迁移时可以选择不写入预序列化的词条数据，没有时从各表组装
+            self.cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'word_blobs'")
+            self.has_blobs = self.cursor.fetchone() is not None
+            # 结构版本 3 起读音带有折叠为平假名的 folded 列
+            self.cursor.execute("SELECT 1 FROM pragma_table_info('kana_readings') WHERE name = 'folded'")
+            self.has_folded = self.cursor.fetchone() is not None
+            # 结构版本 4 起迁移时写入 db_meta 和 kana_stats
+            self.cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'db_meta'")
+            self.has_meta = self.cursor.fetchone() is not None
+            # 结构版本 5 起例句带有 trigram 全文索引（SQLite 不支持时迁移会跳过）
+            self.cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'examples_fts'")
+            self.has_example_index = self.cursor.fetchone() is not None
+            if self.verbose:
+                console.print(f"[green]✓ 成功连接到数据库: {self.db_path}[/green]")
             return True
         except Exception as e:
             console.print(f"[red]✗ 连接数据库失败: {e}[/red]")
@@ -43,113 +135,150 @@ class JMdictSQLiteManager:
             self.conn.close()
             self.conn = None
             self.cursor = None
-            console.print("[green]✓ 数据库连接已断开[/green]")
-
-    def find_words_with_kana(self, kana: str, max_results: int = 5) -> List[Dict]:
-        """查找包含指定假名的词汇，优先返回常用词"""
-        if not self.conn:
-            console.print("[red]请先连接数据库[/red]")
-            return []
+            if self.verbose:
+                console.print("[green]✓ 数据库连接已断开[/green]")
+
+    def _fetch(self, sql: str, params=(), one: bool = False):
+        """执行一条SQL并取回结果，记录耗时；超过慢查询阈值时连同查询计划写入慢查询日志"""
+        start = time.perf_counter()
+        self.cursor.execute(sql, params)
+        result = self.cursor.fetchone() if one else self.cursor.fetchall()
+        elapsed_ms = (time.perf_counter() - start) * 1000
+
+        self.instrumentation.record_statement(elapsed_ms)
+        if self.instrumentation.is_slow(elapsed_ms):
+            rows = int(result is not None) if one else len(result)
+            self.instrumentation.record_slow(sql, params, elapsed_ms, rows, self.explain(sql, params))
+        return result
 
+    def explain(self, sql: str, params=()) -> List[str]:
+        """获取查询计划（EXPLAIN QUERY PLAN 的 detail 列）"""
         try:
-            # 优先查找常用词，然后查找其他词汇
-            query = """
-                SELECT DISTINCT w.id, w.kanji, w.kana, w.common
-                FROM words w
-                WHERE w.kana LIKE ?
-                ORDER BY w.common DESC, w.id
-                LIMIT ?
-            """
-
-            self.cursor.execute(query, (f"%{kana}%", max_results))
-            words = self.cursor.fetchall()
-
-            results = []
-            for word in words:
-                word_id, kanji, kana_text, common = word
-                word_info = self._get_word_details(word_id)
-                results.append(word_info)
-
-            return results
-
+            return [row[3] for row in self.conn.execute(f"EXPLAIN QUERY PLAN {sql}", params).fetchall()]
         except Exception as e:
-            console.print(f"[red]查询失败: {e}[/red]")
-            return []
-
-    def get_random_word_with_kana(self, kana: str) -> Optional[Dict]:
+            return [f"无法获取查询计划: {e}"]
+
+    def _kana_condition(self, kana_list: List[str], cross_script: bool) -> Tuple[str, List[str]]:
+        """构造"任意一个读音包含任意一个假名串"的条件
+
+        cross_script 为 True 时平假名和片假名互相匹配：比较折叠后的 folded 列，
+        与只匹配一种书写体系的查询代价相同；旧数据库没有该列时退回为同时比较两种写法
+        """
+        column = "text"
+        if cross_script and self.has_folded:
+            column = "folded"
+            kana_list = [fold_kana(kana) for kana in kana_list]
+        elif cross_script:
+            kana_list = [variant for kana in kana_list for variant in (fold_kana(kana), to_katakana(kana))]
+        kana_list = list(dict.fromkeys(kana_list))
+
+        conditions = " OR ".join(f"r.{column} LIKE ? ESCAPE '\\'" for _ in kana_list)
+        condition = f"EXISTS (SELECT 1 FROM kana_readings r WHERE r.word_id = w.id AND ({conditions}))"
+        return condition, [like_contains(kana) for kana in kana_list]
+
+    @instrumented
+    def find_words_with_kana(self, kana: str, max_results: int = 5, cross_script: bool = False) -> List[WordEntry]:
+        """查找读音中包含指定假名的词汇，优先返回常用词
+
+        cross_script: 同时匹配平假名和片假名（例如 "あ" 也能找到含 "ア" 的外来语）
+        """
+        condition, params = self._kana_condition([kana], cross_script)
+        return self._search_words(condition, params, max_results)
+
+    @instrumented
+    def get_random_word_with_kana(self, kana: str, cross_script: bool = False) -> Optional[WordEntry]:
         """随机获取一个包含指定假名的词汇，优先选择常用词"""
-        words = self.find_words_with_kana(kana, max_results=10)
+        # kana_stats 表明没有任何词条包含该假名时，不必扫描整个词典
+        variants = {fold_kana(kana), to_katakana(kana)} if cross_script else {kana}
+        if self.has_meta and all(self.get_kana_stats(variant)["word_count"] == 0 for variant in variants):
+            return None
+
+        words = self.find_words_with_kana(kana, max_results=10, cross_script=cross_script)
         if not words:
             return None
 
         # 优先选择常用词
-        common_words = [word for word in words if word.get("common", False)]
+        common_words = [word for word in words if word.common]
         if common_words:
             return random.choice(common_words)
 
         # 如果没有常用词，则随机选择一个
         return random.choice(words)
 
-    def search_by_kanji(self, kanji: str, max_results: int = 5) -> List[Dict]:
-        """根据汉字搜索词汇"""
-        if not self.conn:
-            console.print("[red]请先连接数据库[/red]")
-            return []
-
-        try:
-            query = """
-                SELECT DISTINCT w.id, w.kanji, w.kana, w.common
-                FROM words w
-                WHERE w.kanji LIKE ?
-                ORDER BY w.common DESC, w.id
-                LIMIT ?
-            """
-
-            self.cursor.execute(query, (f"%{kanji}%", max_results))
-            words = self.cursor.fetchall()
-
-            results = []
-            for word in words:
-                word_id, kanji_text, kana_text, common = word
-                word_info = self._get_word_details(word_id)
-                results.append(word_info)
-
-            return results
-
-        except Exception as e:
-            console.print(f"[red]查询失败: {e}[/red]")
-            return []
+    @instrumented
+    def get_example_word(self, kana: str, easy: bool = False) -> Optional[WordEntry]:
+        """为练习挑选包含指定假名的例词
+
+        easy 为 True 时优先选择以该假名开头的常用词（kana_stats 表明不存在这样的读音时直接跳过），
+        找不到时与 get_random_word_with_kana 相同
+        """
+        stats = self.get_kana_stats(kana)
+        if easy and (stats is None or stats["initial_count"] > 0 and stats["common_count"] > 0):
+            words = self._search_words(
+                "w.common = 1 AND EXISTS "
+                "(SELECT 1 FROM kana_readings r WHERE r.word_id = w.id AND r.text LIKE ? ESCAPE '\\')",
+                [like_prefix(kana)],
+                10,
+            )
+            if words:
+                return random.choice(words)
+        return self.get_random_word_with_kana(kana)
+
+    @instrumented
+    def get_kana_stats(self, kana: str) -> Optional[Dict]:
+        """假名在词典读音中的出现情况（词条数、常用词条数、位于开头/结尾的词条数），旧数据库没有统计时返回None"""
+        if not self.has_meta:
+            return None
+        row = self._fetch(
+            "SELECT word_count, common_count, initial_count, final_count FROM kana_stats WHERE kana = ?",
+            (kana,),
+            one=True,
+        )
+        word_count, common_count, initial_count, final_count = row or (0, 0, 0, 0)
+        return {
+            "kana": kana,
+            "word_count": word_count,
+            "common_count": common_count,
+            "initial_count": initial_count,
+            "final_count": final_count,
+        }
+
+    def load_kana_masks(self) -> Optional[Tuple[List[str], List[Tuple]]]:
+        """读取全部词条的假名位掩码：(位序, [(word_id, mask, common), ...])，旧数据库返回None"""
+        if not self.has_meta:
+            return None
+        row = self._fetch("SELECT value FROM db_meta WHERE key = 'kana_mask_units'", one=True)
+        if row is None:
+            return None
+        rows = self._fetch(
+            "SELECT m.word_id, m.mask, w.common FROM word_kana_masks m JOIN words w ON w.id = m.word_id ORDER BY m.word_id"
+        )
+        return json.loads(row[0]), rows
+
+    def get_build_id(self) -> Optional[str]:
+        """数据库的构建id（每次迁移都会变化），旧数据库返回None"""
+        if not self.has_meta:
+            return None
+        row = self._fetch("SELECT value FROM db_meta WHERE key = 'build_id'", one=True)
+        return row[0] if row else None
 
-    def search_by_meaning(self, meaning: str, max_results: int = 5) -> List[Dict]:
+    @instrumented
+    def search_by_kanji(self, kanji: str, max_results: int = 5) -> List[WordEntry]:
+        """根据汉字搜索词汇"""
+        return self._search_words(
+            "EXISTS (SELECT 1 FROM kanji_writings k WHERE k.word_id = w.id AND k.text LIKE ? ESCAPE '\\')",
+            [like_contains(kanji)],
+            max_results,
+        )
+
+    @instrumented
+    def search_by_meaning(self, meaning: str, max_results: int = 5) -> List[WordEntry]:
         """根据英文含义搜索词汇"""
-        if not self.conn:
-            console.print("[red]请先连接数据库[/red]")
-            return []
-
-        try:
-            query = """
-                SELECT DISTINCT w.id, w.kanji, w.kana, w.common
-                FROM words w
-                JOIN senses s ON w.id = s.word_id
-                WHERE s.gloss LIKE ?
-                ORDER BY w.common DESC, w.id
-                LIMIT ?
-            """
-
-            self.cursor.execute(query, (f"%{meaning}%", max_results))
-            words = self.cursor.fetchall()
-
-            results = []
-            for word in words:
-                word_id, kanji_text, kana_text, common = word
-                word_info = self._get_word_details(word_id)
-                results.append(word_info)
-
-            return results
-
-        except Exception as e:
-            console.print(f"[red]查询失败: {e}[/red]")
-            return []
+        return self._search_words(
+            "EXISTS (SELECT 1 FROM senses s WHERE s.word_id = w.id AND s.gloss LIKE ? ESCAPE '\\')",
+            [like_contains(meaning)],
+            max_results,
+        )
 
     def _kana_to_romaji(self, kana: str) -> str:
         """使用kana_data中的映射进行假名到罗马音转换，处理特殊情况"""
@@ -272,198 +401,243 @@ class JMdictSQLiteManager:
 
         return list(possible_kanas)
 
-    def search_by_romaji(self, romaji: str, max_results: int = 5) -> List[Dict]:
+    @instrumented
+    def search_by_romaji(self, romaji: str, max_results: int = 5) -> List[WordEntry]:
         """根据罗马音搜索词汇（优化版本）"""
-        if not self.conn:
-            console.print("[red]请先连接数据库[/red]")
-            return []
-
-        try:
-            # 将罗马音转换为可能的假名组合
-            possible_kanas = self._romaji_to_kana(romaji.lower())
-
-            if not possible_kanas:
-                return []
+        # 将罗马音转换为可能的假名组合
+        possible_kanas = self._romaji_to_kana(romaji.lower())
 
-            # 构建SQL查询条件
-            conditions = []
-            params = []
+        if not possible_kanas:
+            return []
 
-            for kana in possible_kanas:
-                conditions.append("w.kana LIKE ?")
-                params.append(f"%{kana}%")
+        # 任意一个读音包含任意一种假名组合即匹配；罗马音不区分书写体系，
+        # 在折叠后的读音上比较时平假名和片假名的组合合并为一个条件
+        condition, params = self._kana_condition(sorted(possible_kanas), cross_script=self.has_folded)
+        return self._search_words(condition, params, max_results)
 
-            # 使用OR条件查询包含任何匹配假名的词汇
-            query = f"""
-                SELECT DISTINCT w.id, w.kanji, w.kana, w.common
-                FROM words w
-                WHERE {" OR ".join(conditions)}
-                ORDER BY w.common DESC, w.id
-                LIMIT ?
-            """
+    @instrumented
+    def get_common_words(self, max_results: int = 10) -> List[WordEntry]:
+        """获取常用词汇"""
+        return self._search_words("w.common = 1", [], max_results)
 
-            params.append(max_results)
-            self.cursor.execute(query, params)
-            words = self.cursor.fetchall()
+    @instrumented
+    def search_examples(self, text: str, max_results: int = 10, offset: int = 0) -> List[Dict]:
+        """搜索包含指定假名/汉字串的例句，返回 {id, word_id, text, word} 列表
 
-            results = []
-            for word in words:
-                word_id, kanji_text, kana_text, common = word
-                word_info = self._get_word_details(word_id)
-                results.append(word_info)
+        3 个字符及以上使用 trigram 全文索引并按 bm25 相关度排序；更短的查询（或没有索引的旧数据库）
+        退回 LIKE 扫描，较短的例句排在前面。offset 用于分页。
+        """
+        if not self.conn:
+            console.print("[red]请先连接数据库[/red]")
+            return []
 
-            return results
+        try:
+            if self.has_example_index and len(text) >= 3:
+                rows = self._fetch(
+                    """
+                    SELECT e.id, e.word_id, e.example_text
+                    FROM examples_fts f
+                    JOIN examples e ON e.id = f.rowid
+                    WHERE examples_fts MATCH ?
+                    ORDER BY f.rank, e.id
+                    LIMIT ? OFFSET ?
+                """,
+                    ('"' + text.replace('"', '""') + '"', max_results, offset),
+                )
+            else:
+                rows = self._fetch(
+                    """
+                    SELECT id, word_id, example_text
+                    FROM examples
+                    WHERE example_text LIKE ? ESCAPE '\\'
+                    ORDER BY length(example_text), id
+                    LIMIT ? OFFSET ?
+                """,
+                    (like_contains(text), max_results, offset),
+                )
+            return [
+                {"id": example_id, "word_id": word_id, "text": example_text, "word": self._get_word_details(word_id)}
+                for example_id, word_id, example_text in rows
+            ]
 
         except Exception as e:
+            self.instrumentation.record_error(e)
             console.print(f"[red]查询失败: {e}[/red]")
             return []
 
-    def get_common_words(self, max_results: int = 10) -> List[Dict]:
-        """获取常用词汇"""
+    def _search_words(self, condition: str, params: List, max_results: int) -> List[WordEntry]:
+        """按条件查找词条（常用词优先）
+
+        condition 是针对 words 表（别名 w）的 WHERE 条件；按 idx_words_common 的顺序扫描，
+        找到 max_results 个词条后即可结束。
+        """
         if not self.conn:
             console.print("[red]请先连接数据库[/red]")
             return []
 
         try:
-            query = """
-                SELECT w.id, w.kanji, w.kana, w.common
+            # 有预序列化数据时在同一个查询中取出，只对结果行执行子查询
+            blob_column = "(SELECT data FROM word_blobs b WHERE b.word_id = w.id)" if self.has_blobs else "NULL"
+            query = f"""
+                SELECT w.id, {blob_column}
                 FROM words w
-                WHERE w.common = 1
-                ORDER BY w.id
+                WHERE {condition}
+                ORDER BY w.common DESC, w.id
                 LIMIT ?
             """
 
-            self.cursor.execute(query, (max_results,))
-            words = self.cursor.fetchall()
-
-            results = []
-            for word in words:
-                word_id, kanji_text, kana_text, common = word
-                word_info = self._get_word_details(word_id)
-                results.append(word_info)
-
-            return results
+            rows = self._fetch(query, [*params, max_results])
+            entries = [self._decode_blob(word_id, data) or self._get_word_details(word_id) for word_id, data in rows]
+            return [entry for entry in entries if entry is not None]
 
         except Exception as e:
+            self.instrumentation.record_error(e)
             console.print(f"[red]查询失败: {e}[/red]")
             return []
 
-    def _get_word_details(self, word_id: str) -> Dict:
-        """获取词汇的详细信息"""
+    def _decode_blob(self, word_id: str, data: Optional[bytes]) -> Optional[WordEntry]:
+        """解码预序列化的词条数据，没有数据或无法解码时返回None"""
+        if data is None:
+            return None
         try:
-            # 获取基本信息
-            self.cursor.execute("SELECT kanji, kana, common FROM words WHERE id = ?", (word_id,))
-            kanji, kana, common = self.cursor.fetchone()
-
-            # 获取senses信息
-            self.cursor.execute(
-                """
-                SELECT part_of_speech, related, antonym, field, dialect, misc, info, language_source, gloss
-                FROM senses WHERE word_id = ?
-            """,
-                (word_id,),
-            )
-            senses = self.cursor.fetchall()
-
-            # 获取examples信息
-            self.cursor.execute("SELECT example_text FROM examples WHERE word_id = ? ORDER BY sense_index", (word_id,))
-            examples = [row[0] for row in self.cursor.fetchall()]
-
-            word_info = {
-                "id": word_id,
-                "kanji": kanji.split(", ") if kanji else [],
-                "kana": kana.split(", ") if kana else [],
-                "common": bool(common),
-                "meanings": [],
-                "part_of_speech": [],
-                "examples": examples,
-            }
-
-            # 处理senses信息
-            for sense in senses:
-                part_of_speech, related, antonym, field, dialect, misc, info, language_source, gloss = sense
+            return WordEntry.from_dict({"id": word_id, **decode_entry(data)})
+        except ValueError as e:
+            # 例如数据库由装有 msgpack 的环境生成：之后直接从各表组装
+            self.instrumentation.record_error(e)
+            console.print(f"[yellow]警告: {e}，改为从词典表中读取词条[/yellow]")
+            self.has_blobs = False
+            return None
 
-                if part_of_speech:
-                    word_info["part_of_speech"].extend(part_of_speech.split(", "))
+    @instrumented
+    def _get_word_details(self, word_id: str) -> Optional[WordEntry]:
+        """获取词条，词性、含义和例句在第一次访问时才加载"""
+        if self.has_blobs:
+            row = self._fetch("SELECT data FROM word_blobs WHERE word_id = ?", (word_id,), one=True)
+            word_entry = self._decode_blob(word_id, row[0] if row else None)
+            if word_entry:
+                return word_entry
 
-                if gloss:
-                    word_info["meanings"].extend(gloss.split(", "))
+        try:
+            # 获取基本信息
+            row = self._fetch("SELECT common FROM words WHERE id = ?", (word_id,), one=True)
+            if row is None:
+                raise ValueError("词条不存在")
+            common = row[0]
 
-            # 去重
-            word_info["kanji"] = list(set(word_info["kanji"]))
-            word_info["kana"] = list(set(word_info["kana"]))
-            word_info["meanings"] = list(set(word_info["meanings"]))
-            word_info["part_of_speech"] = list(set(word_info["part_of_speech"]))
-            word_info["examples"] = list(set(word_info["examples"]))
+            # 获取写法和读音（按词典中的顺序）
+            rows = self._fetch("SELECT text FROM kanji_writings WHERE word_id = ? ORDER BY position", (word_id,))
+            kanji = [text for (text,) in rows]
+            rows = self._fetch("SELECT text FROM kana_readings WHERE word_id = ? ORDER BY position", (word_id,))
+            kana = [text for (text,) in rows]
 
-            return word_info
+            return WordEntry(word_id, kanji, kana, bool(common), loader=self)
 
         except Exception as e:
+            self.instrumentation.record_error(e)
             console.print(f"[yellow]警告: 获取词汇 {word_id} 详细信息时出错: {e}[/yellow]")
-            return {"id": word_id, "error": str(e)}
+            return None
 
+    @instrumented
+    def _load_senses(self, word_id: str, limit: Optional[int] = None) -> Tuple[List[str], List[str]]:
+        """读取词条的词性和含义（去重并保持顺序），limit 限制读取的义项数"""
+        if not self.conn:
+            raise RuntimeError("数据库连接已关闭，无法加载词条内容")
+        rows = self._fetch(
+            "SELECT part_of_speech, gloss FROM senses WHERE word_id = ? ORDER BY sense_index LIMIT ?",
+            (word_id, -1 if limit is None else limit),
+        )
+        part_of_speech = []
+        meanings = []
+        for pos_text, gloss in rows:
+            if pos_text:
+                part_of_speech.extend(pos_text.split(", "))
+            if gloss:
+                meanings.extend(gloss.split(", "))
+        return list(dict.fromkeys(part_of_speech)), list(dict.fromkeys(meanings))
+
+    @instrumented
+    def _load_examples(self, word_id: str, limit: Optional[int] = None) -> List[str]:
+        """读取词条的例句（去重并保持顺序），limit 限制读取的行数"""
+        if not self.conn:
+            raise RuntimeError("数据库连接已关闭，无法加载词条内容")
+        rows = self._fetch(
+            "SELECT example_text FROM examples WHERE word_id = ? ORDER BY sense_index, id LIMIT ?",
+            (word_id, -1 if limit is None else limit),
+        )
+        return list(dict.fromkeys(text for (text,) in rows))
+
+    @instrumented
     def get_database_stats(self) -> Dict:
         """获取数据库统计信息"""
         if not self.conn:
             return {}
 
         try:
+            # 迁移时已写入统计数，只需读取一张小表（构建信息等其他键不返回）
+            if self.has_meta:
+                placeholders = ", ".join("?" * len(STATS_KEYS))
+                stats = dict(self._fetch(f"SELECT key, value FROM db_meta WHERE key IN ({placeholders})", STATS_KEYS))
+                if len(stats) == len(STATS_KEYS):
+                    return {key: stats[key] for key in STATS_KEYS}
+
             stats = {}
 
             # 统计words表
-            self.cursor.execute("SELECT COUNT(*) FROM words")
-            stats["total_words"] = self.cursor.fetchone()[0]
+            stats["total_words"] = self._fetch("SELECT COUNT(*) FROM words", one=True)[0]
 
             # 统计常用词
-            self.cursor.execute("SELECT COUNT(*) FROM words WHERE common = 1")
-            stats["common_words"] = self.cursor.fetchone()[0]
+            stats["common_words"] = self._fetch("SELECT COUNT(*) FROM words WHERE common = 1", one=True)[0]
+
+            # 统计读音和写法
+            stats["total_kana_readings"] = self._fetch("SELECT COUNT(*) FROM kana_readings", one=True)[0]
+            stats["total_kanji_writings"] = self._fetch("SELECT COUNT(*) FROM kanji_writings", one=True)[0]
 
             # 统计senses表
-            self.cursor.execute("SELECT COUNT(*) FROM senses")
-            stats["total_senses"] = self.cursor.fetchone()[0]
+            stats["total_senses"] = self._fetch("SELECT COUNT(*) FROM senses", one=True)[0]
 
             # 统计examples表
-            self.cursor.execute("SELECT COUNT(*) FROM examples")
-            stats["total_examples"] = self.cursor.fetchone()[0]
+            stats["total_examples"] = self._fetch("SELECT COUNT(*) FROM examples", one=True)[0]
 
             return stats
 
         except Exception as e:
+            self.instrumentation.record_error(e)
             console.print(f"[red]获取统计信息失败: {e}[/red]")
             return {}
 
-    def format_word_display(self, word_info: Dict) -> str:
-        """格式化词汇显示信息"""
-        if not word_info:
+    def format_word_display(self, word_entry: Optional[WordEntry]) -> str:
+        """格式化词汇显示信息（只读取需要显示的前几项）"""
+        if not word_entry:
             return "未找到相关词汇"
 
-        if "error" in word_info:
-            return f"获取词汇信息时出错: {word_info['error']}"
-
         lines = []
 
         # 汉字
-        if word_info["kanji"]:
-            lines.append(f"汉字: {' '.join(word_info['kanji'])}")
+        if word_entry.kanji:
+            lines.append(f"汉字: {' '.join(word_entry.kanji)}")
 
         # 假名
-        if word_info["kana"]:
-            lines.append(f"假名: {' '.join(word_info['kana'])}")
+        if word_entry.kana:
+            lines.append(f"假名: {' '.join(word_entry.kana)}")
 
         # 常用词标记
-        if word_info["common"]:
+        if word_entry.common:
             lines.append("常用词: 是")
 
+        # 只显示前3个词性和前3个含义
+        part_of_speech, meanings = word_entry.head_senses(3)
+
         # 词性
-        if word_info["part_of_speech"]:
-            lines.append(f"词性: {', '.join(word_info['part_of_speech'][:3])}")  # 只显示前3个词性
+        if part_of_speech:
+            lines.append(f"词性: {', '.join(part_of_speech)}")
 
         # 含义
-        if word_info["meanings"]:
-            lines.append(f"含义: {'; '.join(word_info['meanings'][:3])}")  # 只显示前3个含义
+        if meanings:
+            lines.append(f"含义: {'; '.join(meanings)}")
 
         # 例句
-        if word_info["examples"]:
-            lines.append(f"例句: {word_info['examples'][0]}")  # 只显示第一个例句
+        examples = word_entry.head_examples(1)  # 只显示第一个例句
+        if examples:
+            lines.append(f"例句: {examples[0]}")
 
         return "\n".join(lines)
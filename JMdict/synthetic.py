@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+合成 JMdict 数据生成器
+按 jmdict-simplified 的结构（words → kanji / kana / sense / examples）生成确定性的合成词典，
+读音由 kana_data 中的假名按接近真实的频率组合而成，可以在离线环境中以任意规模
+（从 1k 到数百万词条）测试迁移和查询性能。同样的参数和种子总是生成完全相同的文件。
+
+用法：
+    python -m JMdict.synthetic --words 100000 -o /tmp/jmdict-synthetic.json.zip
+    python -m JMdict.migrate_to_sqlite /tmp/jmdict-synthetic.json.zip --db /tmp/synthetic.db
+"""
+
+import argparse
+import io
+import json
+import random
+import zipfile
+from itertools import accumulate
+from typing import Dict, Iterator, List, Tuple
+
+from rich.console import Console
+from rich.progress import BarColumn, MofNCompleteColumn, Progress, TextColumn, TimeRemainingColumn
+
+from kana_data import kana_romaji
+
+console = Console()
+
+DEFAULT_SEED = 20240101
+FIRST_WORD_ID = 1000000
+SYNTHETIC_VERSION = "3.6.1-synthetic"
+
+SMALL_KANA = "ゃゅょャュョ"
+SOKUON = "っッ"
+DAKUTEN_ROMAJI_INITIALS = "gzdb"
+
+# 各类音节的相对频率：清音最常见，浊音、半浊音和拗音依次减少
+SYLLABLE_WEIGHTS = {"basic": 10.0, "voiced": 4.0, "semi_voiced": 1.5, "contracted": 1.2}
+# 词条读音的音节数分布
+LENGTH_WEIGHTS = {1: 8, 2: 35, 3: 30, 4: 17, 5: 10}
+
+KATAKANA_RATIO = 0.2  # 外来语（只有片假名读音、没有汉字写法）的比例
+KANJI_RATIO = 0.85  # 非外来语中有汉字写法的比例
+EXTRA_READING_RATIO = 0.1  # 有第二个读音的比例
+COMMON_RATIO = 0.2  # 常用词比例
+EXAMPLE_RATIO = 0.3  # 带例句的义项比例
+KANJI_POOL_SIZE = 2500  # 使用的汉字数（按类 Zipf 分布抽取）
+
+PARTS_OF_SPEECH = ["n", "v1", "v5r", "v5k", "vs", "adj-i", "adj-na", "adv", "exp", "int"]
+PART_OF_SPEECH_WEIGHTS = [40, 8, 6, 5, 10, 6, 8, 8, 5, 2]
+TAGS = {
+    "n": "noun (common) (futsuumeishi)",
+    "v1": "Ichidan verb",
+    "v5r": "Godan verb with 'ru' ending",
+    "v5k": "Godan verb with 'ku' ending",
+    "vs": "noun or participle which takes the aux. verb suru",
+    "adj-i": "adjective (keiyoushi)",
+    "adj-na": "adjectival nouns or quasi-adjectives (keiyodoshi)",
+    "adv": "adverb (fukushi)",
+    "exp": "expressions (phrases, clauses, etc.)",
+    "int": "interjection (kandoushi)",
+}
+
+ENGLISH_WORDS = (
+    "water fire love time person year day thing man world life hand part child eye woman place work week case "
+    "point government company number group problem fact house mountain river tree flower rain snow wind sky "
+    "sea stone road car train school teacher student book letter word language name friend family mother father "
+    "money shop food rice fish meat tea drink music song picture color light sound voice heart mind body head "
+    "face door window room city country town village morning evening night spring summer autumn winter east "
+    "west north south big small long short high low new old good bad hot cold fast slow early late happy sad "
+    "beautiful strong weak bright dark quiet loud to eat to drink to see to go to come to make to read to write "
+    "to speak to listen to walk to run to think to know to wait to buy to sell to open to close to begin to end"
+).split(" ")
+
+
+def build_syllables() -> Tuple[List[str], List[float], List[str], List[float]]:
+    """从 kana_data 中整理平假名和片假名音节及其频率权重"""
+    hiragana, hiragana_weights, katakana, katakana_weights = [], [], [], []
+    for kana, romaji in kana_romaji.items():
+        if kana in SMALL_KANA or kana in SOKUON:
+            continue
+        if len(kana) == 2 and kana[1] in SMALL_KANA:
+            category = "contracted"
+        elif len(kana) != 1:
+            # 跳过 "こんにちは" 之类的整词
+            continue
+        elif romaji[0] == "p":
+            category = "semi_voiced"
+        elif romaji[0] in DAKUTEN_ROMAJI_INITIALS or romaji[0] == "j":
+            category = "voiced"
+        else:
+            category = "basic"
+
+        weight = SYLLABLE_WEIGHTS[category]
+        if 0x3040 <= ord(kana[0]) <= 0x309F:
+            hiragana.append(kana)
+            hiragana_weights.append(weight)
+        else:
+            katakana.append(kana)
+            katakana_weights.append(weight)
+    return hiragana, hiragana_weights, katakana, katakana_weights
+
+
+class SyntheticJMdict:
+    """确定性的合成词条生成器"""
+
+    def __init__(self, seed: int = DEFAULT_SEED):
+        """初始化随机数生成器和音节、汉字、词汇表"""
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.hiragana, self.hiragana_weights, self.katakana, self.katakana_weights = build_syllables()
+
+        # 汉字池：从常用汉字区间中抽取，按排名赋予类 Zipf 权重
+        pool_rng = random.Random(seed + 1)
+        self.kanji_pool = pool_rng.sample([chr(code) for code in range(0x4E00, 0x9FA6)], KANJI_POOL_SIZE)
+        # random.choices 每次都会累加权重，预先计算累积权重可以避免在大规模生成时反复累加
+        self.hiragana_cum = list(accumulate(self.hiragana_weights))
+        self.katakana_cum = list(accumulate(self.katakana_weights))
+        self.kanji_cum = list(accumulate(1 / (rank + 1) ** 0.9 for rank in range(KANJI_POOL_SIZE)))
+        self.english_cum = list(accumulate(1 / (rank + 1) ** 0.7 for rank in range(len(ENGLISH_WORDS))))
+        self.part_of_speech_cum = list(accumulate(PART_OF_SPEECH_WEIGHTS))
+        self.lengths = list(LENGTH_WEIGHTS)
+        self.length_cum = list(accumulate(LENGTH_WEIGHTS.values()))
+
+    def _reading(self, katakana: bool) -> str:
+        """生成一个读音"""
+        rng = self.rng
+        length = rng.choices(self.lengths, cum_weights=self.length_cum)[0]
+        if katakana:
+            syllables = rng.choices(self.katakana, cum_weights=self.katakana_cum, k=length)
+        else:
+            syllables = rng.choices(self.hiragana, cum_weights=self.hiragana_cum, k=length)
+
+        text = ""
+        for index, syllable in enumerate(syllables):
+            text += syllable
+            if index < length - 1:
+                roll = rng.random()
+                if roll < 0.06:
+                    text += "ッ" if katakana else "っ"
+                elif roll < 0.12:
+                    text += "ー" if katakana else "ん"
+        if not katakana and rng.random() < 0.1:
+            text += "ん"
+        return text
+
+    def _writing(self) -> str:
+        """生成一个汉字写法"""
+        length = self.rng.choices((1, 2, 3), (30, 60, 10))[0]
+        return "".join(self.rng.choices(self.kanji_pool, cum_weights=self.kanji_cum, k=length))
+
+    def _gloss(self) -> str:
+        """生成一个英文释义"""
+        count = self.rng.choices((1, 2), (80, 20))[0]
+        return " ".join(self.rng.choices(ENGLISH_WORDS, cum_weights=self.english_cum, k=count))
+
+    def word(self, word_id: int) -> Dict:
+        """生成一个词条"""
+        rng = self.rng
+        katakana = rng.random() < KATAKANA_RATIO
+        common = rng.random() < COMMON_RATIO
+
+        readings = [self._reading(katakana)]
+        if rng.random() < EXTRA_READING_RATIO:
+            readings.append(self._reading(katakana))
+        writings = []
+        if not katakana and rng.random() < KANJI_RATIO:
+            writings.append(self._writing())
+            if rng.random() < EXTRA_READING_RATIO:
+                writings.append(self._writing())
+
+        senses = []
+        for _ in range(rng.choices((1, 2, 3, 4), (55, 28, 12, 5))[0]):
+            glosses = list(dict.fromkeys(self._gloss() for _ in range(rng.choices((1, 2, 3), (50, 35, 15))[0])))
+            examples = []
+            if rng.random() < EXAMPLE_RATIO:
+                headword = writings[0] if writings else readings[0]
+                examples.append(
+                    {
+                        "source": {"type": "tatoeba", "value": str(rng.randrange(1, 10_000_000))},
+                        "text": headword,
+                        "sentences": [
+                            {"lang": "jpn", "text": f"{headword}は{self._reading(False)}です。"},
+                            {"lang": "eng", "text": f"This is {glosses[0]}."},
+                        ],
+                    }
+                )
+            senses.append(
+                {
+                    "partOfSpeech": [rng.choices(PARTS_OF_SPEECH, cum_weights=self.part_of_speech_cum)[0]],
+                    "appliesToKanji": ["*"],
+                    "appliesToKana": ["*"],
+                    "related": [],
+                    "antonym": [],
+                    "field": [],
+                    "dialect": [],
+                    "misc": [],
+                    "info": [],
+                    "languageSource": [],
+                    "gloss": [{"lang": "eng", "gender": None, "type": None, "text": gloss} for gloss in glosses],
+                    "examples": examples,
+                }
+            )
+
+        return {
+            "id": str(word_id),
+            "kanji": [
+                {"common": common and index == 0, "text": text, "tags": []} for index, text in enumerate(writings)
+            ],
+            "kana": [
+                {"common": common and index == 0, "text": text, "tags": [], "appliesToKanji": ["*"]}
+                for index, text in enumerate(readings)
+            ],
+            "sense": senses,
+        }
+
+    def words(self, count: int) -> Iterator[Dict]:
+        """依次生成 count 个词条"""
+        for index in range(count):
+            yield self.word(FIRST_WORD_ID + index)
+
+    def header(self) -> Dict:
+        """JMdict 顶层字段（words 之外）"""
+        return {
+            "version": SYNTHETIC_VERSION,
+            "languages": ["eng"],
+            "commonOnly": False,
+            "dictDate": "2024-01-01",
+            "dictRevisions": [],
+            "tags": TAGS,
+        }
+
+
+def write_json(stream, count: int, seed: int = DEFAULT_SEED, progress=None, task=None):
+    """把合成词典以流的方式写入文本流，不在内存中保留词条"""
+    generator = SyntheticJMdict(seed)
+    header = json.dumps(generator.header(), ensure_ascii=False)
+    stream.write(header[:-1] + ', "words": [')
+    for index, word in enumerate(generator.words(count)):
+        if index:
+            stream.write(",")
+        stream.write("\n")
+        stream.write(json.dumps(word, ensure_ascii=False))
+        if progress is not None and index % 1000 == 999:
+            progress.update(task, completed=index + 1)
+    stream.write("\n]}\n")
+
+
+def write_synthetic(path: str, count: int, seed: int = DEFAULT_SEED, member_name: str = "jmdict-eng-synthetic.json"):
+    """生成合成词典文件，路径以 .zip 结尾时直接写入 zip 压缩包"""
+    with Progress(
+        TextColumn("[progress.description]{task.description}"),
+        BarColumn(),
+        MofNCompleteColumn(),
+        TimeRemainingColumn(),
+        console=console,
+    ) as progress:
+        task = progress.add_task("正在生成合成词典...", total=count)
+        if path.endswith(".zip"):
+            with zipfile.ZipFile(path, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+                with archive.open(member_name, "w", force_zip64=True) as raw:
+                    with io.TextIOWrapper(raw, encoding="utf-8") as stream:
+                        write_json(stream, count, seed, progress, task)
+        else:
+            with open(path, "w", encoding="utf-8") as stream:
+                write_json(stream, count, seed, progress, task)
+        progress.update(task, completed=count, description="✓ 合成词典生成完成")
+
+
+def main(argv=None):
+    """命令行入口"""
+    parser = argparse.ArgumentParser(description="生成确定性的合成 JMdict（jmdict-simplified 格式）")
+    parser.add_argument("--words", type=int, default=100_000, help="词条数")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED, help="随机种子")
+    parser.add_argument("-o", "--output", default="jmdict-synthetic.json.zip", help="输出文件（.json 或 .zip）")
+    args = parser.parse_args(argv)
+
+    write_synthetic(args.output, args.words, args.seed)
+    console.print(f"[green]✓ 已生成 {args.words} 个词条: {args.output}[/green]")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+词条预序列化
+迁移时把每个词条需要显示的内容序列化成一个紧凑的二进制块写入 word_blobs 表，
+查询时一次按主键读取加一次解码即可得到完整词条，不再需要连接多张表重建列表。
+安装了 msgpack 时使用 msgpack，否则使用紧凑的 JSON；每个块的第一个字节标明格式。
+"""
+
+import json
+from typing import Dict
+
+# 检查msgpack是否可用
+try:
+    import msgpack
+
+    MSGPACK_AVAILABLE = True
+except ImportError:
+    MSGPACK_AVAILABLE = False
+
+FORMAT_MSGPACK = b"m"
+FORMAT_JSON = b"j"
+
+
+def encode_entry(entry: Dict) -> bytes:
+    """序列化词条"""
+    if MSGPACK_AVAILABLE:
+        return FORMAT_MSGPACK + msgpack.packb(entry, use_bin_type=True)
+    return FORMAT_JSON + json.dumps(entry, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def decode_entry(data: bytes) -> Dict:
+    """反序列化词条，格式无法识别或缺少 msgpack 时抛出 ValueError"""
+    fmt, payload = data[:1], data[1:]
+    if fmt == FORMAT_JSON:
+        return json.loads(payload)
+    if fmt == FORMAT_MSGPACK:
+        if not MSGPACK_AVAILABLE:
+            raise ValueError("词条数据使用 msgpack 序列化，但当前环境没有安装 msgpack")
+        return msgpack.unpackb(payload, raw=False)
+    raise ValueError(f"未知的词条数据格式: {fmt!r}")
+
+
+def build_entry(word: Dict) -> Dict:
+    """从 JMdict JSON 词条构造显示用的词条内容（与 JMdictSQLiteManager._get_word_details 的结果一致，不含id）"""
+    part_of_speech = []
+    meanings = []
+    examples = []
+    for sense in word.get("sense", []):
+        part_of_speech.extend(str(item) for item in sense.get("partOfSpeech", []))
+        meanings.extend(str(gloss.get("text", "")) for gloss in sense.get("gloss", []) if gloss.get("text"))
+        for example in sense.get("examples", []):
+            for sentence in example.get("sentences", []):
+                if sentence.get("lang", sentence.get("land")) == "jpn" and sentence.get("text"):
+                    examples.append(sentence["text"])
+
+    return {
+        "kanji": [kanji["text"] for kanji in word.get("kanji", []) if kanji.get("text")],
+        "kana": [kana["text"] for kana in word.get("kana", []) if kana.get("text")],
+        "common": any(kana.get("common", False) for kana in word.get("kana", [])),
+        # 去重并保持原有顺序
+        "meanings": list(dict.fromkeys(meanings)),
+        "part_of_speech": list(dict.fromkeys(part_of_speech)),
+        "examples": list(dict.fromkeys(examples)),
+    }
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+词条模型
+使用 __slots__ 的紧凑词条对象：汉字、假名和常用标记在查询时读取，
+词性、含义和例句在第一次访问时才从数据库加载；只显示前几项时可以把 LIMIT 下推到 SQL
+"""
+
+from typing import Dict, List, Optional, Tuple
+
+
+class WordEntry:
+    """JMdict 词条"""
+
+    __slots__ = ("id", "kanji", "kana", "common", "_loader", "_part_of_speech", "_meanings", "_examples")
+
+    def __init__(
+        self,
+        word_id,
+        kanji: List[str],
+        kana: List[str],
+        common: bool,
+        loader=None,
+        part_of_speech: Optional[List[str]] = None,
+        meanings: Optional[List[str]] = None,
+        examples: Optional[List[str]] = None,
+    ):
+        """创建词条
+
+        loader: 延迟加载词性、含义和例句的对象（JMdictSQLiteManager），
+                需要提供 _load_senses(word_id, limit) 和 _load_examples(word_id, limit)；
+                三个列表都已给出时可以为None
+        """
+        self.id = word_id
+        self.kanji = kanji
+        self.kana = kana
+        self.common = common
+        self._loader = loader
+        self._part_of_speech = part_of_speech
+        self._meanings = meanings
+        self._examples = examples
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "WordEntry":
+        """从完整的词条字典创建（例如预序列化的词条数据）"""
+        return cls(
+            data["id"],
+            data.get("kanji", []),
+            data.get("kana", []),
+            bool(data.get("common", False)),
+            part_of_speech=data.get("part_of_speech", []),
+            meanings=data.get("meanings", []),
+            examples=data.get("examples", []),
+        )
+
+    def _ensure_senses(self):
+        """加载全部词性和含义"""
+        if self._meanings is None or self._part_of_speech is None:
+            self._part_of_speech, self._meanings = self._loader._load_senses(self.id)
+
+    @property
+    def part_of_speech(self) -> List[str]:
+        """全部词性（去重，保持顺序）"""
+        self._ensure_senses()
+        return self._part_of_speech
+
+    @property
+    def meanings(self) -> List[str]:
+        """全部含义（去重，保持顺序）"""
+        self._ensure_senses()
+        return self._meanings
+
+    @property
+    def examples(self) -> List[str]:
+        """全部例句（去重，保持顺序）"""
+        if self._examples is None:
+            self._examples = self._loader._load_examples(self.id)
+        return self._examples
+
+    def head_senses(self, n: int) -> Tuple[List[str], List[str]]:
+        """前 n 个词性和前 n 个含义，尚未加载时只读取前 n 个义项"""
+        if self._meanings is not None and self._part_of_speech is not None:
+            return self._part_of_speech[:n], self._meanings[:n]
+        part_of_speech, meanings = self._loader._load_senses(self.id, n)
+        return part_of_speech[:n], meanings[:n]
+
+    def head_examples(self, n: int) -> List[str]:
+        """前 n 个例句，尚未加载时只读取 n 行"""
+        if self._examples is not None:
+            return self._examples[:n]
+        return self._loader._load_examples(self.id, n)
+
+    def to_dict(self) -> Dict:
+        """转换为字典（会加载全部内容），用于JSON序列化"""
+        return {
+            "id": self.id,
+            "kanji": self.kanji,
+            "kana": self.kana,
+            "common": self.common,
+            "meanings": self.meanings,
+            "part_of_speech": self.part_of_speech,
+            "examples": self.examples,
+        }
+
+    def __repr__(self) -> str:
+        return f"WordEntry(id={self.id!r}, kanji={self.kanji!r}, kana={self.kana!r}, common={self.common!r})"
@@ -0,0 +1,398 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+本地 HTTP/JSON API 服务
+基于 asyncio 提供查词、练习会话和学习统计接口；
+词典查询在只读连接池上于线程池中并发执行，不阻塞事件循环
+"""
+
+import argparse
+import asyncio
+import json
+import queue
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from http import HTTPStatus
+from typing import Dict, Optional
+from urllib.parse import parse_qs, urlsplit
+
+from config import (
+    API_HOST,
+    API_MAX_BODY,
+    API_MAX_SESSIONS,
+    API_POOL_SIZE,
+    API_PORT,
+    API_SESSION_IDLE_SECONDS,
+    DEFAULT_PROFILE,
+    JMDICT_DB_PATH,
+    PROFILE_DB,
+)
+from JMdict.instrumentation import QueryInstrumentation
+from JMdict.sqlite_manager import JMdictSQLiteManager
+from JMdict.word_entry import WordEntry
+from profile_manager import LearnerProfile, ProfileStore
+from quiz_engine import MODE_NAMES, QuizSession
+
+SEARCH_METHODS = {
+    "kana": "find_words_with_kana",
+    "kanji": "search_by_kanji",
+    "meaning": "search_by_meaning",
+    "romaji": "search_by_romaji",
+}
+MAX_RESULTS_LIMIT = 100
+
+
+class ApiError(Exception):
+    """携带HTTP状态码的接口错误"""
+
+    def __init__(self, status: HTTPStatus, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+class DictionaryPool:
+    """只读词典连接池"""
+
+    def __init__(self, db_path: str, size: int = API_POOL_SIZE):
+        """打开 size 个只读连接"""
+        self._idle = queue.Queue()
+        self._managers = []
+        # 所有连接共享同一份查询统计
+        self.instrumentation = QueryInstrumentation()
+        for _ in range(size):
+            manager = JMdictSQLiteManager(db_path, read_only=True, verbose=False, instrumentation=self.instrumentation)
+            if not manager.connect():
+                self.close()
+                raise RuntimeError(f"无法打开词典数据库: {db_path}")
+            self._managers.append(manager)
+            self._idle.put(manager)
+
+    @contextmanager
+    def acquire(self):
+        """借出一个连接，用完后归还；词典重新迁移替换了数据库文件时先重新连接"""
+        manager = self._idle.get()
+        try:
+            if manager.file_replaced() and not manager.reconnect():
+                raise RuntimeError(f"无法重新打开词典数据库: {manager.db_path}")
+            yield manager
+        finally:
+            self._idle.put(manager)
+
+    def close(self):
+        """关闭所有连接"""
+        for manager in self._managers:
+            manager.disconnect()
+        self._managers = []
+
+
+class ApiServer:
+    """API 路由与请求处理"""
+
+    def __init__(self, db_path: str = JMDICT_DB_PATH, profile_db: str = PROFILE_DB, pool_size: int = API_POOL_SIZE):
+        """初始化连接池、线程池和用户数据库"""
+        self.pool = DictionaryPool(db_path, pool_size)
+        self.executor = ThreadPoolExecutor(max_workers=pool_size, thread_name_prefix="jmdict")
+        self.store = ProfileStore(profile_db)
+        self.profiles: Dict[str, LearnerProfile] = {}
+        # 练习会话按最近使用排列，闲置过久或超出数量上限时从最久未使用的开始回收
+        self.sessions: OrderedDict[str, QuizSession] = OrderedDict()
+        self.session_used: Dict[str, float] = {}
+
+    def close(self):
+        """释放所有资源"""
+        self.executor.shutdown(wait=True)
+        self.pool.close()
+        self.store.close()
+
+    async def run_query(self, method: str, *args):
+        """在线程池中用池内连接执行一个词典查询"""
+
+        def call():
+            # 词条的义项和例句是延迟加载的，必须在归还连接之前转换为字典
+            with self.pool.acquire() as manager:
+                return to_json(getattr(manager, method)(*args))
+
+        return await asyncio.get_running_loop().run_in_executor(self.executor, call)
+
+    def get_profile(self, name: str) -> LearnerProfile:
+        """获取（必要时加载）用户，同一用户的多个会话共享状态"""
+        if name not in self.profiles:
+            self.profiles[name] = LearnerProfile(self.store, name)
+        return self.profiles[name]
+
+    def add_session(self, session: QuizSession) -> str:
+        """保存新的练习会话，返回会话ID"""
+        self.expire_sessions(room=1)
+        session_id = uuid.uuid4().hex
+        self.sessions[session_id] = session
+        self.session_used[session_id] = time.monotonic()
+        return session_id
+
+    def get_session(self, session_id: str) -> QuizSession:
+        """根据ID查找练习会话，并记录使用时间"""
+        self.expire_sessions()
+        session = self.sessions.get(session_id)
+        if session is None:
+            raise ApiError(HTTPStatus.NOT_FOUND, f"练习会话不存在: {session_id}")
+        self.sessions.move_to_end(session_id)
+        self.session_used[session_id] = time.monotonic()
+        return session
+
+    def remove_session(self, session_id: str) -> QuizSession:
+        """移除练习会话"""
+        self.session_used.pop(session_id, None)
+        return self.sessions.pop(session_id)
+
+    def expire_sessions(self, room: int = 0, now: Optional[float] = None):
+        """回收闲置超过 API_SESSION_IDLE_SECONDS 的会话，并按最久未使用回收到能再放入 room 个会话
+        （答题结果已随每次作答写入数据库，回收不会丢失数据）"""
+        now = time.monotonic() if now is None else now
+        while self.sessions:
+            session_id = next(iter(self.sessions))
+            idle = now - self.session_used[session_id]
+            if idle < API_SESSION_IDLE_SECONDS and len(self.sessions) + room <= API_MAX_SESSIONS:
+                break
+            self.remove_session(session_id).finish()
+
+    async def dispatch(self, method: str, path: str, query: Dict[str, str], body: Optional[Dict]):
+        """根据请求方法和路径分发到对应的处理函数"""
+        parts = [part for part in path.split("/") if part]
+        if not parts or parts[0] != "api":
+            raise ApiError(HTTPStatus.NOT_FOUND, f"未知路径: {path}")
+        parts = parts[1:]
+
+        if method == "GET" and len(parts) == 2 and parts[0] == "search":
+            return await self.search(parts[1], query)
+        if method == "GET" and parts == ["words", "common"]:
+            return await self.run_query("get_common_words", parse_limit(query, default=10))
+        if method == "GET" and parts == ["dictionary", "stats"]:
+            return await self.run_query("get_database_stats")
+        if method == "GET" and parts == ["dictionary", "diagnostics"]:
+            return self.diagnostics()
+        if method == "GET" and parts == ["stats"]:
+            return self.stats(query.get("user", DEFAULT_PROFILE))
+        if method == "GET" and parts == ["profiles", "leaderboard"]:
+            return self.store.leaderboard(parse_limit(query, default=10))
+        if parts and parts[0] == "quiz":
+            return self.quiz(method, parts[1:], body or {})
+
+        raise ApiError(HTTPStatus.NOT_FOUND, f"未知接口: {method} {path}")
+
+    async def search(self, search_type: str, query: Dict[str, str]):
+        """查词：/api/search/{kana,kanji,meaning,romaji}?q=...&limit=...（按假名查询时可加 &cross_script=1）"""
+        method = SEARCH_METHODS.get(search_type)
+        if method is None:
+            raise ApiError(HTTPStatus.NOT_FOUND, f"未知查询方式: {search_type}")
+        text = query.get("q", "").strip()
+        if not text:
+            raise ApiError(HTTPStatus.BAD_REQUEST, "缺少查询参数 q")
+        if search_type == "kana":
+            # cross_script=1 时平假名和片假名互相匹配
+            return await self.run_query(method, text, parse_limit(query, default=5), parse_flag(query, "cross_script"))
+        return await self.run_query(method, text, parse_limit(query, default=5))
+
+    def diagnostics(self):
+        """词典查询耗时统计和最近的慢查询"""
+        instrumentation = self.pool.instrumentation
+        return {
+            "methods": instrumentation.summary(),
+            "statements": instrumentation.statements,
+            "slow_query_ms": instrumentation.slow_ms,
+            "slow_queries": instrumentation.slow_count,
+            "recent_slow_queries": list(instrumentation.recent_slow),
+        }
+
+    def stats(self, name: str):
+        """用户每日统计与累计数据"""
+        profile_id = self.store.get_profile_id(name)
+        if profile_id is None:
+            raise ApiError(HTTPStatus.NOT_FOUND, f"用户不存在: {name}")
+        daily = self.store.load_stats(profile_id)
+        total = sum(day["total"] for day in daily.values())
+        correct = sum(day["correct"] for day in daily.values())
+        return {"user": name, "total": total, "correct": correct, "daily": daily}
+
+    def quiz(self, method: str, parts, body: Dict):
+        """练习会话接口
+
+        POST   /api/quiz               创建会话 {"user": ..., "mode": "free"|"review"}
+        GET    /api/quiz/<id>/next     获取当前题目
+        POST   /api/quiz/<id>/answer   提交答案 {"answer": ...}
+        GET    /api/quiz/<id>/summary  会话摘要
+        DELETE /api/quiz/<id>          结束会话
+        """
+        if method == "POST" and not parts:
+            mode = body.get("mode", "free")
+            if mode not in MODE_NAMES:
+                raise ApiError(HTTPStatus.BAD_REQUEST, f"未知练习模式: {mode}")
+            profile = self.get_profile(str(body.get("user", DEFAULT_PROFILE)))
+            session = QuizSession(profile.data, mode=mode, on_answer=profile.record_answer)
+            session_id = self.add_session(session)
+            return {"session_id": session_id, "kana": session.next_item()}
+
+        if not parts:
+            raise ApiError(HTTPStatus.METHOD_NOT_ALLOWED, "不支持的请求方法")
+
+        session = self.get_session(parts[0])
+        action = parts[1] if len(parts) > 1 else None
+
+        if method == "GET" and action == "next":
+            return {"kana": session.next_item(), "finished": session.finished}
+        if method == "POST" and action == "answer":
+            if session.current is None:
+                raise ApiError(HTTPStatus.CONFLICT, "当前没有待作答的题目，请先获取下一题")
+            return session.submit_answer(str(body.get("answer", "")))
+        if method == "GET" and action == "summary":
+            return session.summary()
+        if method == "DELETE" and action is None:
+            self.remove_session(parts[0])
+            return session.finish()
+
+        raise ApiError(HTTPStatus.NOT_FOUND, "未知练习会话操作")
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """处理一个 HTTP/1.1 连接（支持 keep-alive）"""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+
+                try:
+                    method, target, version = request_line.decode("latin-1").split()
+                except ValueError:
+                    await write_response(writer, HTTPStatus.BAD_REQUEST, {"error": "请求行格式错误"}, False)
+                    break
+
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                keep_alive = headers.get("connection", "").lower() != "close" and version == "HTTP/1.1"
+                try:
+                    content_length(headers)
+                except ApiError as e:
+                    # 请求体的边界无法确定，剩余字节不能当作下一个请求解析，只能关闭连接
+                    await write_response(writer, e.status, {"error": e.message}, False)
+                    break
+                status, payload = await self.handle_request(method, target, headers, reader)
+                await write_response(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            # ValueError 包括请求行或请求头超过 StreamReader 长度上限时的 LimitOverrunError
+            pass
+        finally:
+            writer.close()
+
+    async def handle_request(self, method: str, target: str, headers: Dict[str, str], reader: asyncio.StreamReader):
+        """读取请求体并调用路由，返回状态码和响应内容"""
+        try:
+            length = content_length(headers)
+            body = None
+            if length:
+                raw = await reader.readexactly(length)
+                try:
+                    body = json.loads(raw)
+                except ValueError:
+                    raise ApiError(HTTPStatus.BAD_REQUEST, "请求体不是有效的JSON")
+                if not isinstance(body, dict):
+                    raise ApiError(HTTPStatus.BAD_REQUEST, "请求体必须是JSON对象")
+
+            url = urlsplit(target)
+            query = {key: values[0] for key, values in parse_qs(url.query).items()}
+            return HTTPStatus.OK, await self.dispatch(method, url.path, query, body)
+        except ApiError as e:
+            return e.status, {"error": e.message}
+        except Exception as e:
+            return HTTPStatus.INTERNAL_SERVER_ERROR, {"error": str(e)}
+
+
+def content_length(headers: Dict[str, str]) -> int:
+    """解析并校验 Content-Length"""
+    try:
+        length = int(headers.get("content-length", 0))
+    except ValueError:
+        raise ApiError(HTTPStatus.BAD_REQUEST, "Content-Length 必须是整数")
+    if length < 0:
+        raise ApiError(HTTPStatus.BAD_REQUEST, "Content-Length 不能为负数")
+    if length > API_MAX_BODY:
+        raise ApiError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, "请求体过大")
+    return length
+
+
+def to_json(value):
+    """把查询结果中的 WordEntry 转换为可以序列化的字典"""
+    if isinstance(value, WordEntry):
+        return value.to_dict()
+    if isinstance(value, list):
+        return [to_json(item) for item in value]
+    return value
+
+
+def parse_limit(query: Dict[str, str], default: int) -> int:
+    """解析 limit 参数"""
+    try:
+        limit = int(query.get("limit", default))
+    except ValueError:
+        raise ApiError(HTTPStatus.BAD_REQUEST, "limit 必须是整数")
+    return max(1, min(limit, MAX_RESULTS_LIMIT))
+
+
+def parse_flag(query: Dict[str, str], name: str) -> bool:
+    """解析布尔参数（1/true/yes 为真）"""
+    return query.get(name, "").strip().lower() in ("1", "true", "yes")
+
+
+async def write_response(writer: asyncio.StreamWriter, status: HTTPStatus, payload, keep_alive: bool):
+    """写出 JSON 响应"""
+    body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+    head = (
+        f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+        "Content-Type: application/json; charset=utf-8\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n"
+        "\r\n"
+    )
+    writer.write(head.encode("latin-1") + body)
+    await writer.drain()
+
+
+async def serve(host: str, port: int, app: ApiServer):
+    """启动服务并一直运行"""
+    server = await asyncio.start_server(app.handle_connection, host, port)
+    addresses = ", ".join(str(sock.getsockname()) for sock in server.sockets)
+    print(f"API 服务已启动: {addresses}")
+    async with server:
+        await server.serve_forever()
+
+
+def main(argv=None):
+    """命令行入口"""
+    parser = argparse.ArgumentParser(description="假名记忆器本地 HTTP/JSON API 服务")
+    parser.add_argument("--host", default=API_HOST, help="监听地址")
+    parser.add_argument("--port", type=int, default=API_PORT, help="监听端口")
+    parser.add_argument("--db", default=JMDICT_DB_PATH, help="JMdict SQLite 数据库路径")
+    parser.add_argument("--pool-size", type=int, default=API_POOL_SIZE, help="只读连接池大小")
+    args = parser.parse_args(argv)
+
+    app = ApiServer(args.db, pool_size=args.pool_size)
+    try:
+        asyncio.run(serve(args.host, args.port, app))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        app.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+JMdict 基准测试
+用合成词典测量 JMdictMigrator 的完整迁移耗时，以及 JMdictSQLiteManager 各查询方法
+在不同查询形态下（单个罕见假名、常见假名、长罗马音、罕见汉字、英文单词等）和
+_get_word_details 的耗时；结果写入 JSON，并与基线比较，超出容差时以非零退出码结束
+
+用法：
+    python -m benchmarks.bench_jmdict                     # 2 万词条的合成词典
+    python -m benchmarks.bench_jmdict --words 200000 --save-baseline
+    python -m benchmarks.bench_jmdict --db JMdict/jmdict.db   # 只测查询，使用真实词典
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+from typing import Callable, Dict, List, Tuple
+
+from config import BENCHMARK_RESULTS_DIR
+from JMdict import migrate_to_sqlite, synthetic
+from JMdict.instrumentation import QueryInstrumentation
+from JMdict.migrate_to_sqlite import JMdictMigrator
+from JMdict.sqlite_manager import JMdictSQLiteManager
+
+from .harness import BenchmarkSuite, add_common_arguments, finish, measure
+
+DETAIL_SAMPLE_SIZE = 200
+# 真实词典中的罕见汉字；合成词典使用汉字池中频率最低的汉字
+REAL_RARE_KANJI = "鬱"
+REAL_COMMON_KANJI = "日"
+
+
+def quiet_consoles():
+    """关闭迁移和生成过程中的进度输出，避免终端渲染影响计时"""
+    migrate_to_sqlite.console.quiet = True
+    synthetic.console.quiet = True
+
+
+def bench_migration(suite: BenchmarkSuite, source: str, workdir: str, words: int, repeat: int) -> Dict[str, str]:
+    """测量完整迁移（建表、流式读取、写入、建索引），分别测量写入和不写入 word_blobs 两种情况，返回数据库路径"""
+    databases = {}
+    for label, word_blobs in (("blobs", True), ("tables", False)):
+        db_path = os.path.join(workdir, f"jmdict-{label}.db")
+
+        def migrate():
+            if os.path.exists(db_path):
+                os.remove(db_path)
+            migrator = JMdictMigrator(source, db_path, word_blobs=word_blobs)
+            try:
+                migrator.create_database()
+                migrator.migrate_from_source()
+            finally:
+                migrator.close()
+
+        result = measure(migrate, repeat=repeat, warmup=0)
+        result["words_per_s"] = round(words / (result["p50_ms"] / 1000), 1)
+        result["db_bytes"] = os.path.getsize(db_path)
+        suite.add(f"migrate[{label}]", result)
+        databases[label] = db_path
+    return databases
+
+
+def query_shapes(common_kanji: str, rare_kanji: str) -> List[Tuple[str, str, Tuple]]:
+    """(名称, 方法名, 参数)"""
+    return [
+        ("find_words_with_kana[rare]", "find_words_with_kana", ("ぢ",)),
+        ("find_words_with_kana[common]", "find_words_with_kana", ("か",)),
+        ("find_words_with_kana[katakana]", "find_words_with_kana", ("ヴ",)),
+        ("get_random_word_with_kana", "get_random_word_with_kana", ("か",)),
+        ("search_by_romaji[short]", "search_by_romaji", ("ka",)),
+        ("search_by_romaji[long]", "search_by_romaji", ("arigatougozaimasu",)),
+        ("search_by_kanji[common]", "search_by_kanji", (common_kanji,)),
+        ("search_by_kanji[rare]", "search_by_kanji", (rare_kanji,)),
+        ("search_by_meaning[common]", "search_by_meaning", ("water",)),
+        ("search_by_meaning[phrase]", "search_by_meaning", ("to speak",)),
+        ("search_by_meaning[missing]", "search_by_meaning", ("xylophone",)),
+        ("search_examples[trigram]", "search_examples", ("です。",)),
+        ("search_examples[short]", "search_examples", ("は",)),
+        ("get_common_words", "get_common_words", (10,)),
+        ("get_database_stats", "get_database_stats", ()),
+    ]
+
+
+def open_manager(db_path: str) -> JMdictSQLiteManager:
+    """打开只读连接，不写慢查询日志"""
+    manager = JMdictSQLiteManager(
+        db_path, read_only=True, verbose=False, instrumentation=QueryInstrumentation(log_path=None)
+    )
+    if not manager.connect():
+        raise SystemExit(f"无法打开数据库: {db_path}")
+    return manager
+
+
+def result_rows(result) -> int:
+    """查询返回的条数"""
+    if isinstance(result, (list, dict)):
+        return len(result)
+    return int(result is not None)
+
+
+def bench_queries(suite: BenchmarkSuite, manager: JMdictSQLiteManager, shapes, repeat: int):
+    """测量各查询形态"""
+    for name, method, args in shapes:
+        func: Callable = getattr(manager, method)
+        result = measure(lambda: func(*args), repeat=repeat)
+        result["rows"] = result_rows(func(*args))
+        suite.add(name, result)
+
+
+def bench_word_details(suite: BenchmarkSuite, manager: JMdictSQLiteManager, seed: int, repeat: int):
+    """测量按id读取完整词条：预序列化数据和逐表重建两种方式"""
+    ids = [row[0] for row in manager._fetch("SELECT id FROM words")]
+    sample = random.Random(seed).sample(ids, min(DETAIL_SAMPLE_SIZE, len(ids)))
+    if not sample:
+        return
+
+    has_blobs = manager.has_blobs
+    for label, use_blobs in (("blobs", True), ("tables", False)):
+        if use_blobs and not has_blobs:
+            continue
+        manager.has_blobs = use_blobs
+        position = iter(range(10**9))
+
+        def details():
+            word_id = sample[next(position) % len(sample)]
+            return manager._get_word_details(word_id).to_dict()
+
+        suite.add(f"_get_word_details[{label}]", measure(details, repeat=max(repeat, len(sample))))
+    manager.has_blobs = has_blobs
+
+
+def main(argv=None):
+    """命令行入口"""
+    parser = argparse.ArgumentParser(description="JMdict 迁移和查询基准测试")
+    parser.add_argument("--words", type=int, default=20_000, help="合成词典的词条数")
+    parser.add_argument("--seed", type=int, default=synthetic.DEFAULT_SEED, help="合成词典的随机种子")
+    parser.add_argument("--migrate-repeat", type=int, default=3, help="迁移的测量次数")
+    parser.add_argument("--db", help="使用已有的数据库（只测查询，不生成合成词典、不测迁移）")
+    add_common_arguments(
+        parser,
+        default_output=os.path.join(BENCHMARK_RESULTS_DIR, "jmdict.json"),
+        default_baseline=os.path.join(BENCHMARK_RESULTS_DIR, "jmdict_baseline.json"),
+    )
+    args = parser.parse_args(argv)
+    quiet_consoles()
+
+    if args.db:
+        suite = BenchmarkSuite("jmdict", {"db": os.path.abspath(args.db)})
+        bench_queries(suite, open_manager(args.db), query_shapes(REAL_COMMON_KANJI, REAL_RARE_KANJI), args.repeat)
+        bench_word_details(suite, open_manager(args.db), args.seed, args.repeat)
+        finish(suite, args)
+
+    suite = BenchmarkSuite("jmdict", {"words": args.words, "seed": args.seed})
+    generator = synthetic.SyntheticJMdict(args.seed)
+    shapes = query_shapes(generator.kanji_pool[0], generator.kanji_pool[-1])
+
+    with tempfile.TemporaryDirectory(prefix="bench-jmdict-") as workdir:
+        source = os.path.join(workdir, "jmdict-synthetic.json.zip")
+        start = time.perf_counter()
+        synthetic.write_synthetic(source, args.words, args.seed)
+        print(f"已生成 {args.words} 个合成词条（{time.perf_counter() - start:.1f}s）\n", flush=True)
+
+        databases = bench_migration(suite, source, workdir, args.words, args.migrate_repeat)
+        manager = open_manager(databases["blobs"])
+        try:
+            bench_queries(suite, manager, shapes, args.repeat)
+            bench_word_details(suite, manager, args.seed, args.repeat)
+        finally:
+            manager.conn.close()
+
+    finish(suite, args)
+
+
+if __name__ == "__main__":
+    main()
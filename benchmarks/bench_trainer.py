@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+练习逻辑基准测试
+用规模递增的合成学习状态（几百到十万条记录）和多年的 stats.json，测量 pick_kana、
+build_weighted_list、due_for_review、update_stats 和排行榜排序的单次耗时与内存分配，
+用来观察基于 JSON/字典的数据结构在什么规模开始变慢；同样规模的词汇卡片表用于对比按索引查询的耗时
+
+用法：
+    python -m benchmarks.bench_trainer
+    python -m benchmarks.bench_trainer --sizes 300,100000 --years 1,10 --save-baseline
+"""
+
+import argparse
+import json
+import os
+import random
+import tempfile
+from datetime import date, timedelta
+from typing import Dict, List
+
+from config import BENCHMARK_RESULTS_DIR, BULK_BLOCK_SIZE, MAX_INTERVAL, STATS_FILE
+from data_manager import build_weighted_list, due_date, due_for_review, pick_kana
+from kana_data import kana_romaji
+from profile_manager import SHUFFLE_RANGE, ProfileStore, card_weight
+from stats_manager import rank_wrong_kana, update_stats
+
+from .harness import BenchmarkSuite, add_common_arguments, finish, measure, measure_allocations
+
+DEFAULT_SEED = 20240101
+DEFAULT_SIZES = "300,3000,30000,100000"
+DEFAULT_YEARS = "1,3,10"
+LARGE_SIZE = 10_000  # 超过该规模时减少调用次数
+
+
+def synthetic_learner_state(size: int, seed: int = DEFAULT_SEED) -> Dict:
+    """生成 size 条学习记录：先覆盖全部假名，超出的部分用带编号的条目模拟（例如词汇卡片）"""
+    rng = random.Random(seed)
+    today = date.today()
+    kana = list(kana_romaji)
+    data = {}
+    for index in range(size):
+        key = kana[index] if index < len(kana) else f"{kana[index % len(kana)]}{index}"
+        interval = rng.choice([1, 2, 4, 8, 16, 32, 64, MAX_INTERVAL])
+        data[key] = {
+            "wrong_count": rng.choices(range(8), weights=[30, 25, 15, 10, 8, 6, 4, 2])[0],
+            "last_review": (today - timedelta(days=rng.randrange(0, 2 * interval + 1))).isoformat(),
+            "interval": interval,
+        }
+    return data
+
+
+def synthetic_stats(years: int, seed: int = DEFAULT_SEED) -> Dict:
+    """生成 years 年的每日统计"""
+    rng = random.Random(seed)
+    today = date.today()
+    stats = {}
+    for offset in range(years * 365, 0, -1):
+        total = rng.randrange(0, 120)
+        stats[(today - timedelta(days=offset)).isoformat()] = {"total": total, "correct": rng.randint(0, total)}
+    return stats
+
+
+def add_result(suite: BenchmarkSuite, name: str, func, repeat: int):
+    """测量耗时和单次调用的内存分配"""
+    result = measure(func, repeat=repeat)
+    result.update(measure_allocations(func))
+    suite.add(name, result)
+
+
+def bench_learner_state(suite: BenchmarkSuite, sizes: List[int], seed: int, repeat: int):
+    """按学习记录规模测量出题和排行榜相关的函数"""
+    for size in sizes:
+        data = synthetic_learner_state(size, seed)
+        review_list = due_for_review(data)
+        calls = repeat if size <= LARGE_SIZE else max(5, repeat // 10)
+        rng_state = random.getstate()
+        random.seed(seed)
+
+        add_result(suite, f"due_for_review[n={size}]", lambda: due_for_review(data), calls)
+        add_result(suite, f"build_weighted_list[n={size}]", lambda: build_weighted_list(data), calls)
+        add_result(suite, f"pick_kana[due,n={size}]", lambda: pick_kana(data, review_list), calls)
+        add_result(suite, f"pick_kana[weighted,n={size}]", lambda: pick_kana(data, []), calls)
+        add_result(suite, f"rank_wrong_kana[n={size}]", lambda: rank_wrong_kana(data), calls)
+
+        random.setstate(rng_state)
+
+
+def synthetic_vocab_cards(store: ProfileStore, profile_id: int, size: int, seed: int = DEFAULT_SEED):
+    """在一个事务中写入 size 张词汇卡片，错题次数和复习日期的分布与 synthetic_learner_state 相同"""
+    rng = random.Random(seed)
+    rows = []
+    for word_id, info in enumerate(synthetic_learner_state(size, seed).values()):
+        interval = min(info["interval"], MAX_INTERVAL)
+        rows.append(
+            (
+                profile_id,
+                word_id,
+                f"単語{word_id}",
+                "たんご",
+                f"word {word_id}",
+                info["last_review"],
+                info["wrong_count"],
+                info["last_review"],
+                interval,
+                due_date(info["last_review"], interval),
+                card_weight(info["wrong_count"]),
+                rng.randrange(SHUFFLE_RANGE),
+            )
+        )
+    with store.conn:
+        store.conn.executemany(
+            """
+            INSERT INTO vocab_cards (
+                profile_id, word_id, headword, reading, meaning, added_at,
+                wrong_count, last_review, interval, due, weight, shuffle
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """,
+            rows,
+        )
+
+
+def bench_vocab_cards(suite: BenchmarkSuite, sizes: List[int], seed: int, repeat: int):
+    """按卡片数测量词汇卡片表的到期查询、加权选卡和统计"""
+    with tempfile.TemporaryDirectory(prefix="bench-vocab-") as workdir:
+        for size in sizes:
+            store = ProfileStore(os.path.join(workdir, f"profiles-{size}.db"))
+            try:
+                profile_id = store.get_or_create_profile("bench")
+                synthetic_vocab_cards(store, profile_id, size, seed)
+                rng = random.Random(seed)
+                add_result(
+                    suite, f"next_due_vocab_card[n={size}]", lambda: store.next_due_vocab_card(profile_id), repeat
+                )
+                add_result(suite, f"pick_vocab_card[n={size}]", lambda: store.pick_vocab_card(profile_id, rng), repeat)
+                add_result(suite, f"vocab_stats[n={size}]", lambda: store.vocab_stats(profile_id), repeat)
+            finally:
+                store.close()
+
+
+def bench_answer_writes(suite: BenchmarkSuite, seed: int, repeat: int):
+    """一组 BULK_BLOCK_SIZE 道题的写回：逐题各一个事务，与批量练习的一个事务对比"""
+    rng = random.Random(seed)
+    data = {}
+    block = rng.sample(list(kana_romaji), BULK_BLOCK_SIZE)
+    results = [{"kana": kana, "answer": kana_romaji[kana], "correct": True} for kana in block]
+    with tempfile.TemporaryDirectory(prefix="bench-writes-") as workdir:
+        store = ProfileStore(os.path.join(workdir, "profiles.db"))
+        try:
+            profile_id = store.get_or_create_profile("bench")
+
+            def one_by_one():
+                for result in results:
+                    store.record_answer(profile_id, result, data)
+
+            add_result(suite, f"record_answer[x{BULK_BLOCK_SIZE}]", one_by_one, repeat)
+            add_result(
+                suite,
+                f"record_answers[{BULK_BLOCK_SIZE}]",
+                lambda: store.record_answers(profile_id, results, data),
+                repeat,
+            )
+        finally:
+            store.close()
+
+
+def bench_update_stats(suite: BenchmarkSuite, years: List[int], seed: int, repeat: int):
+    """按统计天数测量 update_stats（读取、更新并写回 stats.json）"""
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory(prefix="bench-trainer-") as workdir:
+        # STATS_FILE 是相对路径，在临时目录中运行，不影响真实数据
+        os.chdir(workdir)
+        try:
+            for count in years:
+                with open(STATS_FILE, "w", encoding="utf-8") as f:
+                    json.dump(synthetic_stats(count, seed), f, ensure_ascii=False, indent=2)
+                add_result(suite, f"update_stats[years={count}]", lambda: update_stats(10, 8), repeat)
+        finally:
+            os.chdir(cwd)
+
+
+def parse_sizes(text: str) -> List[int]:
+    """解析以逗号分隔的整数列表"""
+    return [int(item) for item in text.split(",") if item.strip()]
+
+
+def main(argv=None):
+    """命令行入口"""
+    parser = argparse.ArgumentParser(description="练习逻辑基准测试（耗时与内存分配）")
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help="学习记录条数，以逗号分隔")
+    parser.add_argument("--years", default=DEFAULT_YEARS, help="stats.json 的年数，以逗号分隔")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED, help="随机种子")
+    add_common_arguments(
+        parser,
+        default_output=os.path.join(BENCHMARK_RESULTS_DIR, "trainer.json"),
+        default_baseline=os.path.join(BENCHMARK_RESULTS_DIR, "trainer_baseline.json"),
+    )
+    args = parser.parse_args(argv)
+
+    sizes, years = parse_sizes(args.sizes), parse_sizes(args.years)
+    suite = BenchmarkSuite("trainer", {"sizes": sizes, "years": years, "seed": args.seed})
+    bench_learner_state(suite, sizes, args.seed, args.repeat)
+    bench_vocab_cards(suite, sizes, args.seed, args.repeat)
+    bench_answer_writes(suite, args.seed, args.repeat)
+    bench_update_stats(suite, years, args.seed, args.repeat)
+    finish(suite, args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+终端画面基准测试
+用写入内存的终端（固定宽高、真彩色）测量练习画面每帧的渲染耗时和写出的字节数：
+逐行差分重绘（题目画面与结果画面交替）与每帧整屏重绘对比，
+p95 超出 SCREEN_RENDER_BUDGET_MS 时以非零退出码结束
+
+用法：
+    python -m benchmarks.bench_tui
+    python -m benchmarks.bench_tui --width 120 --height 40 --save-baseline
+"""
+
+import argparse
+import io
+import itertools
+import os
+import sys
+
+from rich.console import Console
+from rich.panel import Panel
+from rich.text import Text
+
+import trainer
+from config import BENCHMARK_RESULTS_DIR, SCREEN_RENDER_BUDGET_MS
+from kana_data import kana_romaji
+from screen import Screen
+
+from .harness import BenchmarkSuite, add_common_arguments, finish, measure
+
+# 与 format_word_display 的输出大小相近的例词
+EXAMPLE_WORD = "📝 日本語 (にほんご)\n⭐ 常用词汇\n🏷️ 词性: noun (common) (futsuumeishi)\n💡 含义: Japanese (language)"
+
+
+def quiz_frames(kana: str, total: int):
+    """一道题的题目画面和结果画面（与 trainer.quiz_mode 相同的组成）"""
+    question = [
+        Panel(Text(f"请问假名 {kana} 的罗马音是：", style="bold white"), border_style="white", padding=(1, 2)),
+        Panel(Text("📚 相关词汇:", style="bold blue"), border_style="blue", padding=(0, 2)),
+        Panel(Text(EXAMPLE_WORD, style="white"), border_style="blue", padding=(1, 2)),
+        Text(""),
+    ]
+    header = trainer.quiz_header("自由练习", total, total)
+    result_header = trainer.quiz_header("自由练习", total + 1, total + 1)
+    rate = Panel(Text(f"当前正确率: {total + 1}/{total + 1} (100.0%)", style="cyan"), border_style="cyan")
+    result = [
+        *question,
+        trainer.answer_echo(kana_romaji[kana]),
+        trainer.result_panel(True, ""),
+        rate,
+    ]
+    return [*header, *question], [*result_header, *result]
+
+
+def bench_screen(suite: BenchmarkSuite, width: int, height: int, repeat: int):
+    """测量差分重绘和整屏重绘的每帧耗时与写出字节数"""
+    frames = []
+    for total, kana in enumerate(itertools.islice(itertools.cycle(list(kana_romaji)[:46]), 20)):
+        frames.extend(quiz_frames(kana, total))
+
+    for label, full in (("diff", False), ("full", True)):
+        output = io.StringIO()
+        console = Console(file=output, force_terminal=True, width=width, height=height, color_system="truecolor")
+        screen = Screen(console)
+        position = itertools.cycle(frames)
+
+        def show():
+            if full:
+                screen.invalidate()
+            screen.show(*next(position))
+
+        result = measure(show, repeat=max(repeat, len(frames)))
+        output.seek(0)
+        output.truncate()
+        for frame in frames:
+            if full:
+                screen.invalidate()
+            screen.show(*frame)
+        result["bytes_per_frame"] = round(len(output.getvalue().encode("utf-8")) / len(frames))
+        suite.add(f"screen.show[{label}]", result)
+
+
+def check_budget(suite: BenchmarkSuite, budget_ms: float) -> bool:
+    """差分重绘的 p95 是否在预算以内"""
+    result = suite.results["screen.show[diff]"]
+    ok = result["p95_ms"] <= budget_ms
+    status = "✓" if ok else "✗ 超出预算"
+    print(f"\n每帧渲染 p95 {result['p95_ms']:.3f} ms（预算 {budget_ms} ms）{status}")
+    return ok
+
+
+def main(argv=None):
+    """命令行入口"""
+    parser = argparse.ArgumentParser(description="终端画面基准测试（每帧渲染耗时）")
+    parser.add_argument("--width", type=int, default=100, help="终端宽度")
+    parser.add_argument("--height", type=int, default=50, help="终端高度")
+    parser.add_argument("--budget", type=float, default=SCREEN_RENDER_BUDGET_MS, help="每帧 p95 耗时预算（毫秒）")
+    add_common_arguments(
+        parser,
+        default_output=os.path.join(BENCHMARK_RESULTS_DIR, "tui.json"),
+        default_baseline=os.path.join(BENCHMARK_RESULTS_DIR, "tui_baseline.json"),
+    )
+    args = parser.parse_args(argv)
+
+    suite = BenchmarkSuite("tui", {"width": args.width, "height": args.height})
+    bench_screen(suite, args.width, args.height, args.repeat)
+    if not check_budget(suite, args.budget):
+        suite.save(args.output)
+        sys.exit(1)
+    finish(suite, args)
+
+
+if __name__ == "__main__":
+    main()
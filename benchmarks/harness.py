@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+基准测试公共工具
+计时与分位数统计、可选的内存分配统计、结果的 JSON 输出，以及与基线对比检查性能回退
+"""
+
+import argparse
+import gc
+import json
+import math
+import os
+import platform
+import sqlite3
+import statistics
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+from config import BENCHMARK_REGRESSION_TOLERANCE
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """计算已排序数据的分位数（最近秩法）"""
+    if not sorted_values:
+        return 0.0
+    # 第 ceil(pct% × n) 个值，下标从 0 开始
+    index = max(0, min(len(sorted_values) - 1, math.ceil(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def measure(func: Callable, repeat: int = 50, warmup: int = 3, min_time: float = 0.0) -> Dict:
+    """多次调用 func 并统计每次调用的耗时（毫秒）
+
+    min_time: 调用次数达到 repeat 后，总耗时不足该秒数时继续调用，减少短操作的噪声
+    """
+    for _ in range(warmup):
+        func()
+
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        timings = []
+        started = time.perf_counter()
+        while len(timings) < repeat or time.perf_counter() - started < min_time:
+            start = time.perf_counter()
+            func()
+            timings.append((time.perf_counter() - start) * 1000)
+    finally:
+        if gc_enabled:
+            gc.enable()
+
+    timings.sort()
+    return {
+        "calls": len(timings),
+        "mean_ms": round(statistics.fmean(timings), 4),
+        "p50_ms": round(percentile(timings, 50), 4),
+        "p95_ms": round(percentile(timings, 95), 4),
+        "min_ms": round(timings[0], 4),
+        "max_ms": round(timings[-1], 4),
+    }
+
+
+def measure_allocations(func: Callable) -> Dict:
+    """用 tracemalloc 统计一次调用的内存分配：峰值字节数、净增加的字节数和分配块数"""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        func()
+        after = tracemalloc.take_snapshot()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    stats = after.compare_to(before, "filename")
+    return {
+        "peak_bytes": peak,
+        "net_bytes": sum(stat.size_diff for stat in stats),
+        "net_blocks": sum(stat.count_diff for stat in stats),
+    }
+
+
+# 与基线比较前必须一致的环境信息
+ENVIRONMENT_KEYS = ("platform", "machine")
+
+
+def environment() -> Dict:
+    """运行环境信息，随结果一起保存以便比较"""
+    return {
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "time": datetime.now().isoformat(timespec="seconds"),
+    }
+
+
+class BenchmarkSuite:
+    """一组基准测试的结果"""
+
+    def __init__(self, name: str, params: Optional[Dict] = None):
+        """name 为测试集名称，params 为影响结果的参数（参数不同的基线不做比较）"""
+        self.name = name
+        self.params = params or {}
+        self.results: Dict[str, Dict] = {}
+
+    def add(self, name: str, result: Dict, verbose: bool = True):
+        """记录一项结果"""
+        self.results[name] = result
+        if verbose:
+            print(format_result(name, result), flush=True)
+
+    def to_dict(self) -> Dict:
+        """转换为可以保存为 JSON 的字典"""
+        return {"suite": self.name, "params": self.params, "environment": environment(), "results": self.results}
+
+    def save(self, path: str):
+        """保存结果"""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False, indent=2)
+
+
+def format_result(name: str, result: Dict) -> str:
+    """单项结果的一行文本"""
+    parts = [f"{name:<40}"]
+    if "p50_ms" in result:
+        parts.append(f"p50 {result['p50_ms']:>10.3f} ms  p95 {result['p95_ms']:>10.3f} ms  ({result['calls']} 次)")
+    if "peak_bytes" in result:
+        parts.append(f"峰值 {result['peak_bytes'] / 1024:>9.1f} KiB  净分配 {result['net_blocks']:>7} 块")
+    for key, value in result.items():
+        if key.endswith("_per_s"):
+            parts.append(f"{key} {value:,.0f}")
+    return "  ".join(parts)
+
+
+def load_baseline(path: str) -> Dict:
+    """读取基线，不存在时返回空字典"""
+    if not path or not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def compare(suite: BenchmarkSuite, baseline: Dict, tolerance: float = BENCHMARK_REGRESSION_TOLERANCE) -> List[Dict]:
+    """与基线比较 p50 耗时（以及峰值内存），返回超出容差的项目"""
+    regressions = []
+    for name, result in suite.results.items():
+        old = baseline.get("results", {}).get(name)
+        if not old:
+            continue
+        for metric in ("p50_ms", "peak_bytes"):
+            if metric in result and old.get(metric):
+                change = (result[metric] - old[metric]) / old[metric]
+                if change > tolerance:
+                    regressions.append(
+                        {
+                            "name": name,
+                            "metric": metric,
+                            "baseline": old[metric],
+                            "current": result[metric],
+                            "change": change,
+                        }
+                    )
+    return regressions
+
+
+def print_comparison(suite: BenchmarkSuite, baseline: Dict, tolerance: float) -> bool:
+    """打印与基线的比较结果，返回是否通过"""
+    if not baseline:
+        print("\n尚无基线，可使用 --save-baseline 保存当前结果")
+        return True
+    if baseline.get("params") != suite.params:
+        print(f"\n⚠ 基线参数 {baseline.get('params')} 与本次 {suite.params} 不同，跳过比较")
+        return True
+    current = environment()
+    recorded = baseline.get("environment", {})
+    changed = {key: recorded.get(key) for key in ENVIRONMENT_KEYS if recorded.get(key) != current[key]}
+    if changed:
+        # 耗时只在同一台机器、同一系统上可比
+        print(f"\n⚠ 基线的运行环境 {changed} 与本机不同，跳过比较（可使用 --save-baseline 在本机重新保存）")
+        return True
+
+    regressions = compare(suite, baseline, tolerance)
+    if not regressions:
+        print(f"\n✓ 所有项目均未超出基线容差（{tolerance:.0%}）")
+        return True
+
+    print(f"\n✗ {len(regressions)} 项超出基线容差（{tolerance:.0%}）:")
+    for item in regressions:
+        print(f"  {item['name']:<40} {item['metric']}: {item['baseline']} → {item['current']}（{item['change']:+.1%}）")
+    return False
+
+
+def add_common_arguments(parser: argparse.ArgumentParser, default_output: str, default_baseline: str):
+    """添加各基准测试共用的命令行参数"""
+    parser.add_argument("--repeat", type=int, default=50, help="每项测试的最少调用次数")
+    parser.add_argument("--output", default=default_output, help="结果输出文件（JSON）")
+    parser.add_argument("--baseline", default=default_baseline, help="基线文件")
+    parser.add_argument("--save-baseline", action="store_true", help="将本次结果保存为基线")
+    parser.add_argument("--tolerance", type=float, default=BENCHMARK_REGRESSION_TOLERANCE, help="回退容差（比例）")
+
+
+def finish(suite: BenchmarkSuite, args: argparse.Namespace):
+    """保存结果、与基线比较并以退出码报告是否有回退"""
+    suite.save(args.output)
+    print(f"\n结果已保存: {args.output}")
+    ok = print_comparison(suite, load_baseline(args.baseline), args.tolerance)
+    if args.save_baseline:
+        suite.save(args.baseline)
+        print(f"已保存基线: {args.baseline}")
+    sys.exit(0 if ok else 1)
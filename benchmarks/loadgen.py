@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+API 服务压测工具
+用多个 keep-alive 连接并发请求本地 API 服务，统计吞吐量和延迟分位数
+
+用法：
+    python -m benchmarks.loadgen --concurrency 16 --duration 10
+    python -m benchmarks.loadgen --path "/api/search/kanji?q=日" --path "/api/search/meaning?q=water"
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from typing import Dict, List
+from urllib.parse import quote
+
+from config import API_HOST, API_PORT
+
+from .harness import percentile
+
+DEFAULT_PATHS = [
+    "/api/search/kana?q=あ",
+    "/api/search/kana?q=ア",
+    "/api/search/kanji?q=日",
+    "/api/search/meaning?q=water",
+    "/api/search/romaji?q=sakura",
+    "/api/words/common?limit=10",
+]
+
+
+async def worker(host: str, port: int, paths: List[str], deadline: float, offset: int, latencies, errors):
+    """单个连接：循环发送请求直到截止时间"""
+    reader, writer = await asyncio.open_connection(host, port)
+    i = offset
+    try:
+        while time.perf_counter() < deadline:
+            path = paths[i % len(paths)]
+            i += 1
+            request = f"GET {path} HTTP/1.1\r\nHost: {host}\r\nConnection: keep-alive\r\n\r\n"
+            start = time.perf_counter()
+            writer.write(request.encode("latin-1"))
+            await writer.drain()
+
+            status_line = await reader.readline()
+            length = 0
+            while True:
+                line = await reader.readline()
+                if line in (b"\r\n", b""):
+                    break
+                name, _, value = line.decode("latin-1").partition(":")
+                if name.strip().lower() == "content-length":
+                    length = int(value)
+            await reader.readexactly(length)
+            latencies.append(time.perf_counter() - start)
+
+            status = status_line.decode("latin-1").strip()
+            if " 200 " not in status:
+                errors[status] = errors.get(status, 0) + 1
+    finally:
+        writer.close()
+
+
+async def run_load(host: str, port: int, paths: List[str], concurrency: int, duration: float) -> Dict:
+    """运行压测并返回结果"""
+    latencies: List[float] = []
+    errors: Dict[str, int] = {}
+    start = time.perf_counter()
+    deadline = start + duration
+    await asyncio.gather(*(worker(host, port, paths, deadline, i, latencies, errors) for i in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "concurrency": concurrency,
+        "duration_s": round(elapsed, 3),
+        "throughput_rps": round(len(latencies) / elapsed, 1) if elapsed > 0 else 0.0,
+        "latency_ms": {
+            "p50": round(percentile(latencies, 50) * 1000, 3),
+            "p95": round(percentile(latencies, 95) * 1000, 3),
+            "p99": round(percentile(latencies, 99) * 1000, 3),
+            "max": round(latencies[-1] * 1000, 3) if latencies else 0.0,
+        },
+    }
+
+
+def main(argv=None):
+    """命令行入口"""
+    parser = argparse.ArgumentParser(description="本地 API 服务压测工具")
+    parser.add_argument("--host", default=API_HOST, help="服务地址")
+    parser.add_argument("--port", type=int, default=API_PORT, help="服务端口")
+    parser.add_argument("--concurrency", type=int, default=8, help="并发连接数")
+    parser.add_argument("--duration", type=float, default=10.0, help="压测时长（秒）")
+    parser.add_argument("--path", action="append", help="请求路径，可重复指定（默认混合各类查词请求）")
+    parser.add_argument("--json", action="store_true", help="以JSON格式输出结果")
+    args = parser.parse_args(argv)
+
+    paths = [quote(path, safe="/?=&") for path in (args.path or DEFAULT_PATHS)]
+    result = asyncio.run(run_load(args.host, args.port, paths, args.concurrency, args.duration))
+
+    if args.json:
+        print(json.dumps(result, ensure_ascii=False))
+        return
+
+    latency = result["latency_ms"]
+    print(f"请求数: {result['requests']}  并发: {result['concurrency']}  时长: {result['duration_s']}s")
+    print(f"吞吐量: {result['throughput_rps']} req/s")
+    print(f"延迟: p50={latency['p50']}ms  p95={latency['p95']}ms  p99={latency['p99']}ms  max={latency['max']}ms")
+    if result["errors"]:
+        print(f"错误: {result['errors']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -6,16 +6,51 @@
 管理程序中的常量和配置项
 """
 
+import os
+
 # 文件路径配置
 DATA_FILE = "wrong_kana.json"
 STATS_FILE = "stats.json"
+PROFILE_DB = "profiles.db"  # 多用户学习数据库
 TEMP_DIR = "/tmp"
 
 # 学习参数配置
 MAX_WEIGHT = 20  # 最大权重
+READABLE_MASTERED_INTERVAL = 8  # 错题记录中复习间隔达到该天数的假名视为已掌握（没有错题记录的假名也视为已掌握）
+EASY_EXAMPLE_WRONG_COUNT = 2  # 错题次数达到该值时，例词改为以该假名开头的常用词
 MIN_INTERVAL = 1  # 最小复习间隔（天）
 MAX_INTERVAL = 90  # 最大复习间隔（天）
 INTERVAL_MULTIPLIER = 2  # 答对后间隔倍数
+VOCAB_CARD_MEANINGS = 3  # 词汇卡片保存的含义条数
+BULK_BLOCK_SIZE = 10  # 批量练习随机出题时每组的假名数
+
+# 启动耗时配置
+STARTUP_DEFERRED_MODULES = ("matplotlib", "requests", "pydantic", "numpy")  # 不允许在启动时导入的重量级模块
+STARTUP_BASELINE_FILE = "startup_baseline.json"
+STARTUP_REGRESSION_TOLERANCE = 0.2  # 超出基线20%视为回退
+
+# 终端画面配置
+SCREEN_PROMPT_ROWS = 4  # 画面之下为输入提示和菜单保留的行数，画面加上保留行超出终端高度时整屏重绘
+SCREEN_RENDER_BUDGET_MS = 5  # 每帧渲染耗时（p95）的预算，由 benchmarks/bench_tui.py 检查
+
+# 追踪配置（默认关闭，设置 KANA_TRACE=1 或以 --trace 启动时开启）
+TRACE_ENABLED = os.environ.get("KANA_TRACE", "") not in ("", "0")
+TRACE_DIR = os.environ.get("KANA_TRACE_DIR", "traces")  # span（JSONL）和指标（Prometheus 文本格式）的输出目录
+TRACE_BUFFER_SPANS = 1000  # 缓冲的 span 达到该数量时追加写入文件
+TRACE_SUMMARY_TOP = 15  # 退出时摘要显示的 span 数
+
+# 性能剖析配置（以 --profile 启动 main.py 或迁移脚本时开启）
+PROFILING_DIR = os.environ.get("KANA_PROFILING_DIR", "perf_profiles")  # .pstats 和折叠栈文件的输出目录
+PROFILING_SAMPLE_INTERVAL_MS = 5  # 调用栈采样间隔（毫秒），0 表示只用 cProfile
+PROFILING_SUMMARY_TOP = 15  # 退出时摘要显示的函数数
+
+# 基准测试配置
+BENCHMARK_RESULTS_DIR = "benchmarks/results"  # 基准测试结果和基线（JSON）
+BENCHMARK_REGRESSION_TOLERANCE = 0.25  # p50 耗时或峰值内存超出基线25%视为回退
+
+# 用户配置
+DEFAULT_PROFILE = "default"  # 默认用户名（首次运行时会导入旧的JSON数据）
+PROFILE_MENU_LIMIT = 20  # 切换用户菜单中显示的最近活跃用户数
 
 # 排行榜配置
 DEFAULT_TOP_N = 15  # 默认排行榜显示数量
@@ -27,8 +62,36 @@ BAR_LENGTH = 40  # 终端条形图长度
 
 # JMdict 配置
 JMDICT_URL = "https://api.github.com/repos/scriptin/jmdict-simplified/releases/latest"  # NOQA
-PROXY = "http://127.0.0.1:7890"
-JMDICT_ZIP_PATH = "JMdict.json.zip"
+# 词典发布源：github、HTTP 镜像地址或本地镜像目录，见 JMdict/release_source.py
+JMDICT_SOURCE = os.environ.get("KANA_JMDICT_SOURCE", "github")
+# 代理（可选），例如 http://127.0.0.1:7890；未设置时 requests 仍会读取 HTTP(S)_PROXY 环境变量
+PROXY = os.environ.get("KANA_PROXY") or None
+# 按内容寻址的共享资源缓存目录，可以放在多台机器共享的目录上；设为空字符串禁用
+ASSET_CACHE_DIR = os.environ.get("KANA_ASSET_CACHE", os.path.expanduser("~/.cache/kana_trainer/assets"))
+JMDICT_ZIP_PATH = "JMdict/JMdict.json.zip"  # 下载的词典压缩包（迁移时直接流式读取）
 JMDICT_LOCAL_PATH = "JMdict/JMdict.json"
 JMDICT_ASSET_PREFIX = "jmdict-examples-eng"
 JMDICT_ASSET_SUFFIX = ".json.zip"
+JMDICT_DB_PATH = "JMdict/jmdict.db"
+JMDICT_RELEASE_CACHE = "JMdict/release_cache.json"  # 发布信息缓存（ETag、资源摘要）
+JMDICT_SLOW_QUERY_MS = 50  # 单条SQL超过该耗时（毫秒）记为慢查询
+JMDICT_SLOW_QUERY_LOG = "JMdict/slow_queries.log"  # 慢查询日志（JSON Lines，附带 EXPLAIN QUERY PLAN）
+JMDICT_EXAMPLE_PAGE_SIZE = 10  # 例句搜索每页显示的条数
+JMDICT_WORD_BLOBS = True  # 迁移时写入预序列化的词条数据（安装了 msgpack 时使用 msgpack，否则使用 JSON）
+DOWNLOAD_CHUNK_SIZE = 256 * 1024  # 流式下载的分块大小（字节）
+DOWNLOAD_RETRIES = 5  # 连接中断后的续传次数
+DOWNLOAD_TIMEOUT = 30  # 连接/读取超时（秒）
+
+# 本地 HTTP/JSON API 服务配置
+API_HOST = "127.0.0.1"
+API_PORT = 8765
+API_POOL_SIZE = 4  # 只读词典连接池大小
+API_MAX_BODY = 64 * 1024  # 请求体最大字节数
+API_SESSION_IDLE_SECONDS = 30 * 60  # 练习会话闲置超过该时间后回收
+API_MAX_SESSIONS = 1000  # 同时保留的练习会话数上限，超出时回收最久未使用的会话
+
+# 常驻查询守护进程配置
+DAEMON_SOCKET = "/tmp/kana_trainer.sock"
+DAEMON_PID_FILE = "/tmp/kana_trainer.pid"
+DAEMON_WORKERS = 4  # 预先fork的工作进程数
+DAEMON_CACHE_SIZE = 4096  # 每个工作进程的查询结果缓存条数
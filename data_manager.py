@@ -11,7 +11,8 @@ import os
 import random
 from datetime import datetime, timedelta
 
-from config import MAX_WEIGHT
+from config import INTERVAL_MULTIPLIER, MAX_INTERVAL, MAX_WEIGHT, READABLE_MASTERED_INTERVAL
+from tracing import traced
 
 
 def today_str():
@@ -19,6 +20,11 @@ def today_str():
     return datetime.now().strftime("%Y-%m-%d")
 
 
+def due_date(last_review, interval):
+    """下次复习日期：上次复习日期（YYYY-MM-DD）+ 间隔天数"""
+    return (datetime.strptime(last_review, "%Y-%m-%d").date() + timedelta(days=int(interval))).strftime("%Y-%m-%d")
+
+
 def load_json(file):
     """加载JSON文件，如果文件不存在或读取失败则返回空字典"""
     if os.path.exists(file):
@@ -30,6 +36,7 @@ def load_json(file):
     return {}
 
 
+@traced()
 def save_json(file, data):
     """保存数据到JSON文件"""
     with open(file, "w", encoding="utf-8") as f:
@@ -63,9 +70,65 @@ def build_weighted_list(data):
     return weighted
 
 
+@traced()
 def pick_kana(data, review_list):
     """选择假名：优先从复习列表中选择，否则从权重列表中选择"""
     if review_list:
         return random.choice(review_list)
     wl = build_weighted_list(data)
     return random.choice(wl)
+
+
+def pick_kana_block(data, review_list, size):
+    """选出 size 个不重复的假名：先从复习列表中随机选，不够时按错题权重补足"""
+    block = random.sample(review_list, min(size, len(review_list)))
+    chosen = set(block)
+    weighted = [kana for kana in build_weighted_list(data) if kana not in chosen]
+    while len(block) < size and weighted:
+        kana = random.choice(weighted)
+        block.append(kana)
+        weighted = [item for item in weighted if item != kana]
+    return block
+
+
+def mastered_kana(data):
+    """已掌握的假名：没有错题记录，或错题记录的复习间隔已经足够长"""
+    from kana_data import kana_romaji
+
+    return [
+        kana
+        for kana in kana_romaji
+        if kana not in data or int(data[kana].get("interval", 1)) >= READABLE_MASTERED_INTERVAL
+    ]
+
+
+def next_review_state(info, is_correct):
+    """间隔重复算法的一步：返回答题后的新学习状态（info 为None时视为新记录，不修改传入的字典）
+
+    答对：间隔翻倍，错题次数减一；答错：错题次数加一，间隔重置为1天
+    """
+    state = {"wrong_count": 0, "last_review": today_str(), "interval": 1}
+    if info:
+        state.update(info)
+    if is_correct:
+        state["interval"] = max(1, int(state.get("interval", 1)) * INTERVAL_MULTIPLIER)
+        state["wrong_count"] = max(0, int(state.get("wrong_count", 0)) - 1)
+    else:
+        state["wrong_count"] = int(state.get("wrong_count", 0)) + 1
+        state["interval"] = 1
+    state["last_review"] = today_str()
+    return state
+
+
+def apply_answer(data, kana, is_correct):
+    """根据答题结果更新假名的学习状态（间隔重复算法）"""
+    if kana not in data:
+        if is_correct:
+            return
+        data[kana] = {}
+
+    data[kana].update(next_review_state(data[kana], is_correct))
+
+    # 如果错题次数为0且间隔足够长，从错题记录中删除
+    if is_correct and data[kana]["wrong_count"] == 0 and data[kana]["interval"] > MAX_INTERVAL:
+        del data[kana]
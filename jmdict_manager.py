@@ -7,9 +7,10 @@ JMdict词典管理器
 支持SQLite数据库查询
 """
 
-from typing import Dict, List, Optional
+from typing import List, Optional
 
 from JMdict.sqlite_manager import JMdictSQLiteManager
+from JMdict.word_entry import WordEntry
 
 
 class JMdictManager:
@@ -24,15 +25,19 @@ class JMdictManager:
         """加载JMdict数据（连接SQLite数据库）"""
         return self.sqlite_manager.connect()
 
-    def find_words_with_kana(self, kana: str, max_results: int = 5) -> List[Dict]:
-        """查找包含指定假名的词汇"""
-        return self.sqlite_manager.find_words_with_kana(kana, max_results)
+    def find_words_with_kana(self, kana: str, max_results: int = 5, cross_script: bool = False) -> List[WordEntry]:
+        """查找包含指定假名的词汇，cross_script 为 True 时平假名和片假名互相匹配"""
+        return self.sqlite_manager.find_words_with_kana(kana, max_results, cross_script)
 
-    def get_random_word_with_kana(self, kana: str) -> Optional[Dict]:
+    def get_random_word_with_kana(self, kana: str, cross_script: bool = False) -> Optional[WordEntry]:
         """随机获取一个包含指定假名的词汇"""
-        return self.sqlite_manager.get_random_word_with_kana(kana)
+        return self.sqlite_manager.get_random_word_with_kana(kana, cross_script)
 
-    def format_word_display(self, word_info: Dict) -> str:
+    def get_example_word(self, kana: str, easy: bool = False) -> Optional[WordEntry]:
+        """为练习挑选例词，easy 为 True 时优先选择以该假名开头的常用词"""
+        return self.sqlite_manager.get_example_word(kana, easy)
+
+    def format_word_display(self, word_info: WordEntry) -> str:
         """格式化词汇显示信息"""
         return self.sqlite_manager.format_word_display(word_info)
 
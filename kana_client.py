@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+常驻守护进程的轻量客户端
+只依赖标准库，把查词和练习请求转发给 kana_daemon.py，适合在 shell 脚本中调用
+
+用法：
+    python kana_client.py search kana あ --limit 3
+    python kana_client.py quiz next --user alice
+    python kana_client.py quiz answer あ a --user alice
+    python kana_client.py stats --user alice
+"""
+
+import argparse
+import json
+import socket
+import sys
+
+from config import DAEMON_SOCKET, DEFAULT_PROFILE
+
+
+def send_request(request, socket_path=DAEMON_SOCKET):
+    """发送一个请求并返回守护进程的响应"""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        client.connect(socket_path)
+        client.sendall(json.dumps(request, ensure_ascii=False).encode("utf-8") + b"\n")
+        with client.makefile("rb") as stream:
+            return json.loads(stream.readline())
+
+
+def build_request(args):
+    """根据命令行参数构造请求"""
+    if args.command == "search":
+        return {
+            "cmd": "search",
+            "type": args.type,
+            "q": args.query,
+            "limit": args.limit,
+            "cross_script": args.cross_script,
+        }
+    if args.command == "example":
+        return {"cmd": "example", "kana": args.kana, "cross_script": args.cross_script}
+    if args.command == "quiz" and args.action == "next":
+        return {"cmd": "quiz_next", "user": args.user, "mode": args.mode}
+    if args.command == "quiz" and args.action == "answer":
+        return {"cmd": "quiz_answer", "user": args.user, "kana": args.kana, "answer": args.answer}
+    if args.command == "stats":
+        return {"cmd": "stats", "user": args.user}
+    return {"cmd": "ping"}
+
+
+def print_result(args, result):
+    """以便于阅读的格式输出结果"""
+    if args.command == "search":
+        for i, item in enumerate(result, 1):
+            print(f"[{i}]\n{item['text']}\n")
+    elif args.command == "example":
+        print(result["text"] if result else "未找到相关词汇")
+    elif args.command == "quiz" and args.action == "next":
+        print(result["kana"] or "")
+    elif args.command == "quiz" and args.action == "answer":
+        print("正确" if result["correct"] else f"错误，正确答案是: {result['romaji']}")
+    elif args.command == "stats":
+        for day, day_stats in result.items():
+            print(f"{day}\t{day_stats['total']}\t{day_stats['correct']}")
+    else:
+        print(f"pong (pid={result['pid']})")
+
+
+def main(argv=None):
+    """命令行入口"""
+    parser = argparse.ArgumentParser(description="kana_daemon.py 的命令行客户端")
+    parser.add_argument("--socket", default=DAEMON_SOCKET, help="Unix 域套接字路径")
+    parser.add_argument("--json", action="store_true", help="输出原始JSON")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    search = subparsers.add_parser("search", help="查词")
+    search.add_argument("type", choices=["kana", "kanji", "meaning", "romaji"], help="查询方式")
+    search.add_argument("query", help="查询内容")
+    search.add_argument("--limit", type=int, default=5, help="最多返回的词汇数")
+    search.add_argument("--cross-script", action="store_true", help="按假名查询时平假名和片假名互相匹配")
+
+    example = subparsers.add_parser("example", help="随机获取包含指定假名的词汇")
+    example.add_argument("kana", help="假名")
+    example.add_argument("--cross-script", action="store_true", help="平假名和片假名互相匹配")
+
+    quiz = subparsers.add_parser("quiz", help="练习：取题或提交答案")
+    quiz_actions = quiz.add_subparsers(dest="action", required=True)
+    quiz_next = quiz_actions.add_parser("next", help="获取下一道题")
+    quiz_next.add_argument("--mode", choices=["free", "review"], default="free", help="练习模式")
+    quiz_next.add_argument("--user", default=DEFAULT_PROFILE, help="用户名")
+    quiz_answer = quiz_actions.add_parser("answer", help="提交答案")
+    quiz_answer.add_argument("kana", help="题目假名")
+    quiz_answer.add_argument("answer", help="罗马音答案")
+    quiz_answer.add_argument("--user", default=DEFAULT_PROFILE, help="用户名")
+
+    stats = subparsers.add_parser("stats", help="查看每日统计")
+    stats.add_argument("--user", default=DEFAULT_PROFILE, help="用户名")
+
+    subparsers.add_parser("ping", help="检查守护进程是否可用")
+
+    args = parser.parse_args(argv)
+
+    try:
+        response = send_request(build_request(args), args.socket)
+    except OSError as e:
+        print(f"无法连接守护进程（{args.socket}）: {e}\n请先运行: python kana_daemon.py start", file=sys.stderr)
+        sys.exit(2)
+
+    if not response["ok"]:
+        print(f"错误: {response['error']}", file=sys.stderr)
+        sys.exit(1)
+
+    if args.json:
+        print(json.dumps(response["result"], ensure_ascii=False))
+    else:
+        print_result(args, response["result"])
+
+
+if __name__ == "__main__":
+    main()
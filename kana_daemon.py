@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+常驻查询守护进程
+预先导入模块、打开词典连接并预热 SQLite 页缓存，然后 fork 出多个工作进程
+在 Unix 域套接字上处理查词和练习请求（每行一个 JSON 请求/响应），
+配合 kana_client.py 让脚本中的一次性查询在毫秒级返回
+
+用法：
+    python kana_daemon.py start [--foreground]
+    python kana_daemon.py status
+    python kana_daemon.py stop
+"""
+
+import argparse
+import json
+import os
+import signal
+import socket
+import sys
+import time
+from functools import lru_cache
+from typing import Dict
+
+from config import DAEMON_CACHE_SIZE, DAEMON_PID_FILE, DAEMON_SOCKET, DAEMON_WORKERS, DEFAULT_PROFILE, JMDICT_DB_PATH
+from JMdict.sqlite_manager import JMdictSQLiteManager
+from profile_manager import LearnerProfile, ProfileStore
+from quiz_engine import QuizSession
+
+SEARCH_METHODS = {
+    "kana": "find_words_with_kana",
+    "kanji": "search_by_kanji",
+    "meaning": "search_by_meaning",
+    "romaji": "search_by_romaji",
+}
+
+# 预热时执行的查询：顺序扫描各表，把数据页读入页缓存
+WARMUP_QUERIES = [
+    "SELECT COUNT(*), SUM(common) FROM words",
+    "SELECT COUNT(*), SUM(LENGTH(text)) FROM kana_readings",
+    "SELECT COUNT(*), SUM(LENGTH(text)) FROM kanji_writings",
+    "SELECT COUNT(*), SUM(LENGTH(gloss)) FROM senses",
+    "SELECT COUNT(*), SUM(word_id) FROM examples",
+    "SELECT COUNT(*), SUM(LENGTH(data)) FROM word_blobs",
+]
+
+
+def warm_up(manager: JMdictSQLiteManager):
+    """预热词典数据库的页缓存"""
+    manager.conn.execute("PRAGMA cache_size = -65536")
+    for query in WARMUP_QUERIES:
+        try:
+            manager.conn.execute(query).fetchall()
+        except Exception:
+            # 表结构可能随版本变化，预热失败不影响服务
+            pass
+
+
+class DaemonWorker:
+    """工作进程：持有自己的词典连接、用户数据库连接和查询缓存"""
+
+    def __init__(self, db_path: str):
+        """打开连接并预热"""
+        self.manager = JMdictSQLiteManager(db_path, read_only=True, verbose=False)
+        if not self.manager.connect():
+            raise RuntimeError(f"无法打开词典数据库: {db_path}")
+        warm_up(self.manager)
+        self.store = ProfileStore()
+        self.search = lru_cache(maxsize=DAEMON_CACHE_SIZE)(self._search)
+        self.build_id = self.manager.get_build_id()
+
+    def check_build(self):
+        """词典重新迁移后数据库文件会被替换，此时重新连接、预热并清空查询结果缓存
+
+        旧连接一直指向被替换掉的文件，所以先比较文件本身，再用新连接读取构建id
+        """
+        if not self.manager.file_replaced():
+            return
+        if not self.manager.reconnect():
+            raise RuntimeError(f"无法重新打开词典数据库: {self.manager.db_path}")
+        warm_up(self.manager)
+        self.search.cache_clear()
+        self.build_id = self.manager.get_build_id()
+
+    def _search(self, search_type: str, text: str, limit: int, cross_script: bool = False):
+        """执行查词并附带格式化文本，cross_script 只对按假名查询有效"""
+        method = SEARCH_METHODS.get(search_type)
+        if method is None:
+            raise ValueError(f"未知查询方式: {search_type}")
+        if search_type == "kana":
+            words = self.manager.find_words_with_kana(text, limit, cross_script=cross_script)
+        else:
+            words = getattr(self.manager, method)(text, limit)
+        return [{"word": word.to_dict(), "text": self.manager.format_word_display(word)} for word in words]
+
+    def handle(self, request: Dict):
+        """处理一个请求并返回结果"""
+        cmd = request.get("cmd")
+
+        if cmd == "ping":
+            return {"pid": os.getpid()}
+        if cmd in ("search", "common", "example"):
+            self.check_build()
+        if cmd == "search":
+            return self.search(
+                request.get("type", "kana"),
+                request["q"],
+                int(request.get("limit", 5)),
+                bool(request.get("cross_script", False)),
+            )
+        if cmd == "common":
+            return [word.to_dict() for word in self.manager.get_common_words(int(request.get("limit", 10)))]
+        if cmd == "example":
+            word = self.manager.get_random_word_with_kana(request["kana"], bool(request.get("cross_script", False)))
+            return {"word": word.to_dict(), "text": self.manager.format_word_display(word)} if word else None
+
+        user = str(request.get("user", DEFAULT_PROFILE))
+        if cmd == "quiz_next":
+            profile = LearnerProfile(self.store, user)
+            session = QuizSession(profile.data, mode=request.get("mode", "free"))
+            return {"kana": session.next_item()}
+        if cmd == "quiz_answer":
+            profile = LearnerProfile(self.store, user)
+            session = QuizSession(profile.data, on_answer=profile.record_answer)
+            session.ask(request["kana"])
+            return session.submit_answer(str(request.get("answer", "")))
+        if cmd == "stats":
+            profile = LearnerProfile(self.store, user)
+            return profile.load_stats()
+
+        raise ValueError(f"未知命令: {cmd}")
+
+    def serve(self, server: socket.socket):
+        """循环接受连接，每个连接可以发送多行请求"""
+        while True:
+            conn, _ = server.accept()
+            with conn, conn.makefile("rwb") as stream:
+                for line in stream:
+                    try:
+                        response = {"ok": True, "result": self.handle(json.loads(line))}
+                    except Exception as e:
+                        response = {"ok": False, "error": str(e)}
+                    stream.write(json.dumps(response, ensure_ascii=False).encode("utf-8") + b"\n")
+                    stream.flush()
+
+
+def spawn_worker(server: socket.socket, db_path: str) -> int:
+    """fork 一个工作进程，返回子进程pid"""
+    pid = os.fork()
+    if pid:
+        return pid
+
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    try:
+        DaemonWorker(db_path).serve(server)
+    finally:
+        os._exit(1)
+
+
+def run_master(socket_path: str, db_path: str, workers: int):
+    """主进程：绑定套接字、预热后 fork 工作进程，并在其退出时重新拉起"""
+    if not os.path.exists(db_path):
+        raise SystemExit(f"找不到词典数据库: {db_path}")
+
+    if os.path.exists(socket_path):
+        os.remove(socket_path)
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(socket_path)
+    server.listen(128)
+
+    # 在主进程中读一遍数据库文件，让操作系统页缓存对所有工作进程都是热的
+    manager = JMdictSQLiteManager(db_path, read_only=True, verbose=False)
+    if manager.connect():
+        warm_up(manager)
+        manager.disconnect()
+
+    with open(DAEMON_PID_FILE, "w") as f:
+        f.write(str(os.getpid()))
+
+    children = set()
+
+    def shutdown(signum, frame):
+        for pid in children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        for path in (socket_path, DAEMON_PID_FILE):
+            if os.path.exists(path):
+                os.remove(path)
+        os._exit(0)
+
+    signal.signal(signal.SIGTERM, shutdown)
+    signal.signal(signal.SIGINT, shutdown)
+
+    for _ in range(workers):
+        children.add(spawn_worker(server, db_path))
+    print(f"守护进程已启动: pid={os.getpid()} socket={socket_path} workers={workers}", flush=True)
+
+    while True:
+        pid, _ = os.wait()
+        children.discard(pid)
+        # 避免工作进程启动即失败时陷入忙循环
+        time.sleep(1)
+        children.add(spawn_worker(server, db_path))
+
+
+def read_pid():
+    """读取守护进程pid，进程不存在时返回None"""
+    try:
+        with open(DAEMON_PID_FILE, "r") as f:
+            pid = int(f.read().strip())
+        os.kill(pid, 0)
+        return pid
+    except (OSError, ValueError):
+        return None
+
+
+def daemonize():
+    """脱离终端转入后台运行"""
+    if os.fork():
+        os._exit(0)
+    os.setsid()
+    if os.fork():
+        os._exit(0)
+    devnull = os.open(os.devnull, os.O_RDWR)
+    for fd in (0, 1, 2):
+        os.dup2(devnull, fd)
+
+
+def main(argv=None):
+    """命令行入口"""
+    parser = argparse.ArgumentParser(description="假名记忆器常驻查询守护进程")
+    parser.add_argument("action", choices=["start", "stop", "status"], help="操作")
+    parser.add_argument("--foreground", action="store_true", help="在前台运行（不转入后台）")
+    parser.add_argument("--socket", default=DAEMON_SOCKET, help="Unix 域套接字路径")
+    parser.add_argument("--db", default=JMDICT_DB_PATH, help="JMdict SQLite 数据库路径")
+    parser.add_argument("--workers", type=int, default=DAEMON_WORKERS, help="工作进程数")
+    args = parser.parse_args(argv)
+
+    pid = read_pid()
+    if args.action == "status":
+        print(f"守护进程运行中: pid={pid}" if pid else "守护进程未运行")
+        sys.exit(0 if pid else 1)
+    if args.action == "stop":
+        if not pid:
+            print("守护进程未运行")
+            return
+        os.kill(pid, signal.SIGTERM)
+        print(f"已停止守护进程: pid={pid}")
+        return
+
+    if pid:
+        print(f"守护进程已在运行: pid={pid}")
+        return
+
+    db_path = os.path.abspath(args.db)
+    if not args.foreground:
+        print(f"守护进程正在后台启动，套接字: {args.socket}")
+        daemonize()
+    run_master(args.socket, db_path, args.workers)
+
+
+if __name__ == "__main__":
+    main()
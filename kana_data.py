@@ -6,6 +6,8 @@
 包含假名到罗马音的映射关系
 """
 
+from JMdict.kana_script import to_katakana
+
 # 假名到罗马音的映射字典
 kana_romaji = {
     "あ": "a",
@@ -266,3 +268,17 @@ for kana, romaji in kana_romaji.items():
         # 如果已有片假名，添加平假名作为备选
         if romaji not in romaji_hiragana:
             romaji_hiragana[romaji] = kana
+
+# 五十音图的行（平假名），用于整行批量练习；拗音行和片假名的行由此生成
+hiragana_rows = {
+    "あ行": "あいうえお", "か行": "かきくけこ", "さ行": "さしすせそ", "た行": "たちつてと", "な行": "なにぬねの",
+    "は行": "はひふへほ", "ま行": "まみむめも", "や行": "やゆよ", "ら行": "らりるれろ", "わ行": "わをん",
+    "が行": "がぎぐげご", "ざ行": "ざじずぜぞ", "だ行": "だぢづでど", "ば行": "ばびぶべぼ", "ぱ行": "ぱぴぷぺぽ",
+}
+
+
+# 行名 → 该行的假名列表（全部是 kana_romaji 中的键）
+kana_rows = {name: list(row) for name, row in hiragana_rows.items()}
+for head in "きぎしじちにひびぴみり":
+    kana_rows[head + "ゃ行"] = [head + small for small in "ゃゅょ"]
+kana_rows.update({to_katakana(name): [to_katakana(kana) for kana in row] for name, row in list(kana_rows.items())})
@@ -6,51 +6,82 @@
 提供主菜单和程序入口
 """
 
-import os
+import argparse
+import sys
 
 from InquirerPy import inquirer
 from rich.console import Console
 from rich.panel import Panel
 from rich.text import Text
 
-from config import DATA_FILE
-from data_manager import load_json
+from config import DEFAULT_PROFILE, PROFILE_MENU_LIMIT
 from JMdict.command import search_word_command, update_jmdict_command
-from stats_manager import show_leaderboard, show_stats
-from trainer import quiz_mode
+from profile_manager import LearnerProfile, ProfileStore
+from stats_manager import show_leaderboard, show_profile_leaderboard, show_stats
+from trainer import bulk_mode, quiz_mode, readable_mode, vocab_mode
 
 console = Console()
 
 
 def clear_screen():
-    """清屏函数"""
-    os.system("cls" if os.name == "nt" else "clear")
+    """清屏函数（输出控制序列，不启动子进程）"""
+    console.clear()
 
 
-def show_header():
+def show_header(profile=None):
     """显示程序头部"""
-    header_text = Text("=== 假名记忆器 Kana Trainer ===", style="bold magenta")
+    title = "=== 假名记忆器 Kana Trainer ==="
+    if profile:
+        title += f"  👤 {profile.name}"
+    header_text = Text(title, style="bold magenta")
     header_panel = Panel(header_text, border_style="magenta", padding=(0, 2))
     console.print(header_panel)
     console.print()
 
 
+def choose_profile(store, current):
+    """切换用户：从最近活跃用户中选择，或输入用户名（不存在则新建）"""
+    recent = store.list_profiles(limit=PROFILE_MENU_LIMIT)
+    choices = [{"name": f"{p['name']}（最近活跃: {p['last_active']}）", "value": p["name"]} for p in recent]
+    choices.append({"name": "✏️ 输入用户名 / 新建用户", "value": None})
+
+    name = inquirer.select(
+        message=f"请选择用户（共 {store.count_profiles()} 位）:",
+        choices=choices,
+        pointer=">",
+        instruction="(用上下键选择，Enter确认)",
+    ).execute()
+
+    if name is None:
+        name = inquirer.text(message="请输入用户名:").execute().strip()
+        if not name:
+            return current
+
+    return LearnerProfile(store, name)
+
+
 def main():
     """主程序入口"""
-    data = load_json(DATA_FILE)
+    store = ProfileStore()
+    profile = LearnerProfile(store, store.get_last_active_profile() or DEFAULT_PROFILE)
 
     while True:
         clear_screen()
-        show_header()
+        show_header(profile)
 
         choice = inquirer.select(
             message="请选择模式:",
             choices=[
                 {"name": "📅 每日复习（优先出到期题）", "value": "review"},
                 {"name": "🎯 自由练习（全部假名，按错题权重）", "value": "free"},
+                {"name": "🧮 批量练习（整行或一组假名，一次作答）", "value": "bulk"},
+                {"name": "📗 认读单词（只出已掌握假名组成的词）", "value": "readable"},
+                {"name": "🗂️ 词汇卡片（查词时添加的单词）", "value": "vocab"},
                 {"name": "📖 查词功能", "value": "search"},
                 {"name": "📊 查看统计与趋势", "value": "stats"},
                 {"name": "🏆 错题排行榜", "value": "leader"},
+                {"name": "🏅 用户排行榜", "value": "profiles_leader"},
+                {"name": "👤 切换用户", "value": "switch_profile"},
                 {"name": "🔄 更新词典", "value": "update_jmdict"},
                 {"name": "🚪 退出", "value": "quit"},
             ],
@@ -61,35 +92,85 @@ def main():
         if choice == "quit":
             clear_screen()
             console.print("[bold]再见！祝学习顺利 : )[/bold]")
+            store.close()
             break
         elif choice == "stats":
             clear_screen()
-            show_header()
-            show_stats()
+            show_header(profile)
+            show_stats(profile.load_stats())
             input("\n按 Enter 键返回主菜单...")
         elif choice == "leader":
             clear_screen()
-            show_header()
-            show_leaderboard(data)
+            show_header(profile)
+            show_leaderboard(profile.data)
             input("\n按 Enter 键返回主菜单...")
+        elif choice == "profiles_leader":
+            clear_screen()
+            show_header(profile)
+            show_profile_leaderboard(store)
+            input("\n按 Enter 键返回主菜单...")
+        elif choice == "switch_profile":
+            clear_screen()
+            show_header(profile)
+            profile = choose_profile(store, profile)
         elif choice in ("review", "free"):
             clear_screen()
-            show_header()
-            quiz_mode(data, mode=choice)
+            show_header(profile)
+            quiz_mode(profile, mode=choice)
+            input("\n按 Enter 键返回主菜单...")
+        elif choice == "bulk":
+            clear_screen()
+            show_header(profile)
+            bulk_mode(profile)
+            input("\n按 Enter 键返回主菜单...")
+        elif choice == "readable":
+            clear_screen()
+            show_header(profile)
+            readable_mode(profile)
+            input("\n按 Enter 键返回主菜单...")
+        elif choice == "vocab":
+            clear_screen()
+            show_header(profile)
+            vocab_mode(profile)
             input("\n按 Enter 键返回主菜单...")
         elif choice == "search":
             clear_screen()
-            show_header()
-            search_word_command()
+            show_header(profile)
+            search_word_command(profile)
             input("\n按 Enter 键返回主菜单...")
         elif choice == "update_jmdict":
             clear_screen()
-            show_header()
+            show_header(profile)
             update_jmdict_command()
             input("\n按 Enter 键返回主菜单...")
         else:
             console.print("未知选项，请重试。")
 
 
+def parse_args(argv=None):
+    """解析命令行参数"""
+    parser = argparse.ArgumentParser(description="假名记忆器 Kana Trainer")
+    parser.add_argument("--startup-timing", action="store_true", help="输出基于 -X importtime 的启动耗时报告后退出")
+    parser.add_argument("--trace", action="store_true", help="开启追踪，退出时导出 span 和指标并打印耗时摘要")
+    parser.add_argument(
+        "--profile", action="store_true", help="剖析整个会话（含启动），退出时写出 .pstats 和火焰图折叠栈并打印热点"
+    )
+    return parser.parse_args(argv)
+
+
 if __name__ == "__main__":
+    args = parse_args()
+    if args.startup_timing:
+        from startup_timing import run
+
+        sys.exit(run())
+    if args.profile:
+        # 在新的解释器中从导入阶段开始剖析
+        from profiling import relaunch
+
+        sys.exit(relaunch("main", __file__, [arg for arg in sys.argv[1:] if arg != "--profile"]))
+    if args.trace:
+        import tracing
+
+        tracing.enable()
     main()
@@ -0,0 +1,532 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+用户档案管理模块
+将多个学习者的假名状态、答题记录和每日统计保存在同一个带索引的SQLite数据库中
+"""
+
+import os
+import random
+import sqlite3
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+from config import DATA_FILE, DEFAULT_PROFILE, MAX_WEIGHT, PROFILE_DB, STATS_FILE, VOCAB_CARD_MEANINGS
+from data_manager import load_json, today_str
+from tracing import traced
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS profiles (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT NOT NULL UNIQUE,
+    created_at TEXT NOT NULL,
+    last_active TEXT NOT NULL,
+    total_answers INTEGER NOT NULL DEFAULT 0,
+    total_correct INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_profiles_last_active ON profiles (last_active DESC);
+CREATE INDEX IF NOT EXISTS idx_profiles_total_correct ON profiles (total_correct DESC, total_answers);
+
+CREATE TABLE IF NOT EXISTS kana_state (
+    profile_id INTEGER NOT NULL,
+    kana TEXT NOT NULL,
+    wrong_count INTEGER NOT NULL DEFAULT 0,
+    last_review TEXT NOT NULL,
+    interval INTEGER NOT NULL DEFAULT 1,
+    PRIMARY KEY (profile_id, kana),
+    FOREIGN KEY (profile_id) REFERENCES profiles (id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_kana_state_wrong ON kana_state (profile_id, wrong_count DESC);
+
+CREATE TABLE IF NOT EXISTS answer_events (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    profile_id INTEGER NOT NULL,
+    answered_at TEXT NOT NULL,
+    kana TEXT NOT NULL,
+    answer TEXT NOT NULL,
+    correct BOOLEAN NOT NULL,
+    FOREIGN KEY (profile_id) REFERENCES profiles (id)
+);
+CREATE INDEX IF NOT EXISTS idx_answer_events_profile ON answer_events (profile_id, answered_at);
+
+CREATE TABLE IF NOT EXISTS daily_stats (
+    profile_id INTEGER NOT NULL,
+    day TEXT NOT NULL,
+    total INTEGER NOT NULL DEFAULT 0,
+    correct INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (profile_id, day),
+    FOREIGN KEY (profile_id) REFERENCES profiles (id)
+) WITHOUT ROWID;
+
+-- 词汇卡片：due 为下次复习日期，weight 为出题权重（1 + 错题次数，上限 MAX_WEIGHT），
+-- shuffle 为随机键，用于在同一权重内用一次索引查找随机选卡
+CREATE TABLE IF NOT EXISTS vocab_cards (
+    profile_id INTEGER NOT NULL,
+    word_id INTEGER NOT NULL,
+    headword TEXT NOT NULL,
+    reading TEXT NOT NULL,
+    meaning TEXT NOT NULL,
+    added_at TEXT NOT NULL,
+    wrong_count INTEGER NOT NULL DEFAULT 0,
+    last_review TEXT NOT NULL,
+    interval INTEGER NOT NULL DEFAULT 1,
+    due TEXT NOT NULL,
+    weight INTEGER NOT NULL DEFAULT 1,
+    shuffle INTEGER NOT NULL,
+    PRIMARY KEY (profile_id, word_id),
+    FOREIGN KEY (profile_id) REFERENCES profiles (id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_vocab_cards_due ON vocab_cards (profile_id, due, shuffle);
+CREATE INDEX IF NOT EXISTS idx_vocab_cards_weight ON vocab_cards (profile_id, weight, shuffle);
+
+-- 按权重和到期日期汇总的卡片数，由触发器维护，统计和加权选卡不需要扫描卡片表
+CREATE TABLE IF NOT EXISTS vocab_weight_counts (
+    profile_id INTEGER NOT NULL,
+    weight INTEGER NOT NULL,
+    cards INTEGER NOT NULL,
+    PRIMARY KEY (profile_id, weight)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS vocab_due_counts (
+    profile_id INTEGER NOT NULL,
+    due TEXT NOT NULL,
+    cards INTEGER NOT NULL,
+    PRIMARY KEY (profile_id, due)
+) WITHOUT ROWID;
+
+CREATE TRIGGER IF NOT EXISTS vocab_cards_insert AFTER INSERT ON vocab_cards BEGIN
+    INSERT INTO vocab_weight_counts (profile_id, weight, cards) VALUES (NEW.profile_id, NEW.weight, 1)
+        ON CONFLICT (profile_id, weight) DO UPDATE SET cards = cards + 1;
+    INSERT INTO vocab_due_counts (profile_id, due, cards) VALUES (NEW.profile_id, NEW.due, 1)
+        ON CONFLICT (profile_id, due) DO UPDATE SET cards = cards + 1;
+END;
+CREATE TRIGGER IF NOT EXISTS vocab_cards_delete AFTER DELETE ON vocab_cards BEGIN
+    UPDATE vocab_weight_counts SET cards = cards - 1 WHERE profile_id = OLD.profile_id AND weight = OLD.weight;
+    UPDATE vocab_due_counts SET cards = cards - 1 WHERE profile_id = OLD.profile_id AND due = OLD.due;
+    DELETE FROM vocab_due_counts WHERE profile_id = OLD.profile_id AND due = OLD.due AND cards = 0;
+END;
+CREATE TRIGGER IF NOT EXISTS vocab_cards_update AFTER UPDATE OF weight, due ON vocab_cards BEGIN
+    UPDATE vocab_weight_counts SET cards = cards - 1 WHERE profile_id = OLD.profile_id AND weight = OLD.weight;
+    INSERT INTO vocab_weight_counts (profile_id, weight, cards) VALUES (NEW.profile_id, NEW.weight, 1)
+        ON CONFLICT (profile_id, weight) DO UPDATE SET cards = cards + 1;
+    UPDATE vocab_due_counts SET cards = cards - 1 WHERE profile_id = OLD.profile_id AND due = OLD.due;
+    DELETE FROM vocab_due_counts WHERE profile_id = OLD.profile_id AND due = OLD.due AND cards = 0;
+    INSERT INTO vocab_due_counts (profile_id, due, cards) VALUES (NEW.profile_id, NEW.due, 1)
+        ON CONFLICT (profile_id, due) DO UPDATE SET cards = cards + 1;
+END;
+"""
+
+VOCAB_CARD_COLUMNS = "word_id, headword, reading, meaning, wrong_count, last_review, interval, due"
+SHUFFLE_RANGE = 1 << 31
+
+
+def now_str():
+    """获取当前时间字符串，格式：YYYY-MM-DD HH:MM:SS"""
+    return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+
+def card_weight(wrong_count: int) -> int:
+    """与 build_weighted_list 相同的出题权重：1 + 错题次数，限制在 1..MAX_WEIGHT"""
+    return max(1, min(1 + wrong_count, MAX_WEIGHT))
+
+
+def vocab_card_from_word(word) -> Dict:
+    """从词条（WordEntry）生成词汇卡片：第一个写法、第一个读音和前几个含义"""
+    _, meanings = word.head_senses(VOCAB_CARD_MEANINGS)
+    return {
+        "word_id": int(word.id),
+        "headword": (word.kanji or word.kana)[0],
+        "reading": word.kana[0],
+        "meaning": "; ".join(meanings),
+    }
+
+
+def row_to_card(row) -> Dict:
+    """把 VOCAB_CARD_COLUMNS 顺序的查询结果转换为卡片字典"""
+    word_id, headword, reading, meaning, wrong_count, last_review, interval, due = row
+    return {
+        "word_id": word_id,
+        "headword": headword,
+        "reading": reading,
+        "meaning": meaning,
+        "wrong_count": wrong_count,
+        "last_review": last_review,
+        "interval": interval,
+        "due": due,
+    }
+
+
+class ProfileStore:
+    """多用户学习数据存储"""
+
+    def __init__(self, db_path: str = PROFILE_DB):
+        """打开（必要时创建）用户数据库"""
+        self.db_path = db_path
+        self.conn = sqlite3.connect(db_path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        self.conn.commit()
+
+    def close(self):
+        """关闭数据库连接"""
+        if self.conn:
+            self.conn.close()
+            self.conn = None
+
+    def get_profile_id(self, name: str) -> Optional[int]:
+        """根据用户名查找用户ID"""
+        row = self.conn.execute("SELECT id FROM profiles WHERE name = ?", (name,)).fetchone()
+        return row[0] if row else None
+
+    def get_or_create_profile(self, name: str) -> int:
+        """获取用户ID，不存在时创建新用户"""
+        profile_id = self.get_profile_id(name)
+        if profile_id is not None:
+            return profile_id
+
+        now = now_str()
+        with self.conn:
+            cursor = self.conn.execute(
+                "INSERT INTO profiles (name, created_at, last_active) VALUES (?, ?, ?)", (name, now, now)
+            )
+        return cursor.lastrowid
+
+    def get_last_active_profile(self) -> Optional[str]:
+        """获取最近活跃的用户名"""
+        row = self.conn.execute("SELECT name FROM profiles ORDER BY last_active DESC LIMIT 1").fetchone()
+        return row[0] if row else None
+
+    def touch_profile(self, profile_id: int):
+        """更新用户的最近活跃时间"""
+        with self.conn:
+            self.conn.execute("UPDATE profiles SET last_active = ? WHERE id = ?", (now_str(), profile_id))
+
+    def count_profiles(self) -> int:
+        """统计用户总数"""
+        return self.conn.execute("SELECT COUNT(*) FROM profiles").fetchone()[0]
+
+    def list_profiles(self, limit: int = 50, offset: int = 0) -> List[Dict]:
+        """按最近活跃时间分页列出用户"""
+        rows = self.conn.execute(
+            """
+            SELECT name, last_active, total_answers, total_correct
+            FROM profiles
+            ORDER BY last_active DESC
+            LIMIT ? OFFSET ?
+        """,
+            (limit, offset),
+        ).fetchall()
+        return [
+            {"name": name, "last_active": last_active, "total": total, "correct": correct}
+            for name, last_active, total, correct in rows
+        ]
+
+    def leaderboard(self, limit: int = 10) -> List[Dict]:
+        """按累计答对数排名的用户排行榜"""
+        rows = self.conn.execute(
+            """
+            SELECT name, total_answers, total_correct
+            FROM profiles
+            ORDER BY total_correct DESC, total_answers
+            LIMIT ?
+        """,
+            (limit,),
+        ).fetchall()
+        return [{"name": name, "total": total, "correct": correct} for name, total, correct in rows]
+
+    def load_kana_state(self, profile_id: int) -> Dict:
+        """加载用户的假名学习状态，格式与 wrong_kana.json 相同"""
+        rows = self.conn.execute(
+            "SELECT kana, wrong_count, last_review, interval FROM kana_state WHERE profile_id = ?", (profile_id,)
+        ).fetchall()
+        return {
+            kana: {"wrong_count": wrong_count, "last_review": last_review, "interval": interval}
+            for kana, wrong_count, last_review, interval in rows
+        }
+
+    def load_stats(self, profile_id: int) -> Dict:
+        """加载用户的每日统计，格式与 stats.json 相同"""
+        rows = self.conn.execute(
+            "SELECT day, total, correct FROM daily_stats WHERE profile_id = ? ORDER BY day", (profile_id,)
+        ).fetchall()
+        return {day: {"total": total, "correct": correct} for day, total, correct in rows}
+
+    def _write_kana(self, profile_id: int, kana: str, info: Optional[Dict]):
+        """写入单个假名的状态，info为None时删除记录"""
+        if info is None:
+            self.conn.execute("DELETE FROM kana_state WHERE profile_id = ? AND kana = ?", (profile_id, kana))
+            return
+        self.conn.execute(
+            """
+            INSERT OR REPLACE INTO kana_state (profile_id, kana, wrong_count, last_review, interval)
+            VALUES (?, ?, ?, ?, ?)
+        """,
+            (
+                profile_id,
+                kana,
+                int(info.get("wrong_count", 0)),
+                info.get("last_review", today_str()),
+                int(info.get("interval", 1)),
+            ),
+        )
+
+    def _add_stats(self, profile_id: int, total: int, correct: int):
+        """累加当天统计和用户累计数据"""
+        self.conn.execute(
+            """
+            INSERT INTO daily_stats (profile_id, day, total, correct) VALUES (?, ?, ?, ?)
+            ON CONFLICT (profile_id, day) DO UPDATE SET
+                total = total + excluded.total,
+                correct = correct + excluded.correct
+        """,
+            (profile_id, today_str(), total, correct),
+        )
+        self.conn.execute(
+            """
+            UPDATE profiles
+            SET total_answers = total_answers + ?, total_correct = total_correct + ?, last_active = ?
+            WHERE id = ?
+        """,
+            (total, correct, now_str(), profile_id),
+        )
+
+    def record_answer(self, profile_id: int, result: Dict, data: Dict):
+        """在一个事务中记录一次答题：假名状态、答题事件和统计"""
+        self.record_answers(profile_id, [result], data)
+
+    @traced()
+    def record_answers(self, profile_id: int, results: List[Dict], data: Dict):
+        """在一个事务中记录一批答题（批量练习）：涉及的假名状态、全部答题事件和一次统计累加"""
+        if not results:
+            return
+        now = now_str()
+        with self.conn:
+            for kana in dict.fromkeys(result["kana"] for result in results):
+                self._write_kana(profile_id, kana, data.get(kana))
+            self.conn.executemany(
+                "INSERT INTO answer_events (profile_id, answered_at, kana, answer, correct) VALUES (?, ?, ?, ?, ?)",
+                [(profile_id, now, result["kana"], result["answer"], bool(result["correct"])) for result in results],
+            )
+            self._add_stats(profile_id, len(results), sum(1 for result in results if result["correct"]))
+
+    def record_word_answer(self, profile_id: int, result: Dict):
+        """记录一次认读单词的答题：答题事件（以读音为题目）和统计，不改变假名的学习状态"""
+        with self.conn:
+            self.conn.execute(
+                "INSERT INTO answer_events (profile_id, answered_at, kana, answer, correct) VALUES (?, ?, ?, ?, ?)",
+                (profile_id, now_str(), result["kana"], result["answer"], bool(result["correct"])),
+            )
+            self._add_stats(profile_id, 1, 1 if result["correct"] else 0)
+
+    def add_vocab_cards(self, profile_id: int, cards: Iterable[Dict]) -> int:
+        """添加词汇卡片（新卡片当天到期），已有的卡片保持不变，返回新增的卡片数"""
+        today = today_str()
+        now = now_str()
+        with self.conn:
+            before = self._count_vocab_cards(profile_id)
+            self.conn.executemany(
+                f"""
+                INSERT INTO vocab_cards (profile_id, added_at, weight, shuffle, {VOCAB_CARD_COLUMNS})
+                VALUES (?, ?, 1, ?, ?, ?, ?, ?, 0, ?, 1, ?)
+                ON CONFLICT (profile_id, word_id) DO NOTHING
+            """,
+                (
+                    (
+                        profile_id,
+                        now,
+                        random.randrange(SHUFFLE_RANGE),
+                        card["word_id"],
+                        card["headword"],
+                        card["reading"],
+                        card["meaning"],
+                        today,
+                        today,
+                    )
+                    for card in cards
+                ),
+            )
+            return self._count_vocab_cards(profile_id) - before
+
+    def _count_vocab_cards(self, profile_id: int) -> int:
+        """卡片总数（读取汇总表）"""
+        return self.conn.execute(
+            "SELECT COALESCE(SUM(cards), 0) FROM vocab_weight_counts WHERE profile_id = ?", (profile_id,)
+        ).fetchone()[0]
+
+    def next_due_vocab_card(self, profile_id: int) -> Optional[Dict]:
+        """最早到期的一张卡片（同一天到期的按随机键排列），没有到期卡片时返回None"""
+        row = self.conn.execute(
+            f"""
+            SELECT {VOCAB_CARD_COLUMNS} FROM vocab_cards
+            WHERE profile_id = ? AND due <= ?
+            ORDER BY due, shuffle
+            LIMIT 1
+        """,
+            (profile_id, today_str()),
+        ).fetchone()
+        return row_to_card(row) if row else None
+
+    def due_vocab_cards(self, profile_id: int, limit: int = 50) -> List[Dict]:
+        """按到期日期列出到期的卡片"""
+        rows = self.conn.execute(
+            f"""
+            SELECT {VOCAB_CARD_COLUMNS} FROM vocab_cards
+            WHERE profile_id = ? AND due <= ?
+            ORDER BY due, shuffle
+            LIMIT ?
+        """,
+            (profile_id, today_str(), limit),
+        ).fetchall()
+        return [row_to_card(row) for row in rows]
+
+    def pick_vocab_card(self, profile_id: int, rng=random) -> Optional[Dict]:
+        """按错题权重随机选一张卡片：先按各权重的卡片数选出权重，再用随机键在该权重内查找"""
+        counts = self.conn.execute(
+            "SELECT weight, cards FROM vocab_weight_counts WHERE profile_id = ? AND cards > 0", (profile_id,)
+        ).fetchall()
+        total = sum(weight * cards for weight, cards in counts)
+        if total == 0:
+            return None
+
+        target = rng.random() * total
+        for weight, cards in counts:
+            target -= weight * cards
+            if target < 0:
+                break
+
+        sql = f"""
+            SELECT {VOCAB_CARD_COLUMNS} FROM vocab_cards
+            WHERE profile_id = ? AND weight = ? AND shuffle >= ?
+            ORDER BY shuffle
+            LIMIT 1
+        """
+        row = self.conn.execute(sql, (profile_id, weight, rng.randrange(SHUFFLE_RANGE))).fetchone()
+        if row is None:
+            # 随机键之后没有卡片时从头开始
+            row = self.conn.execute(sql, (profile_id, weight, 0)).fetchone()
+        return row_to_card(row) if row else None
+
+    def vocab_stats(self, profile_id: int) -> Dict:
+        """卡片总数、到期卡片数和各权重的卡片数（只读取汇总表）"""
+        weights = dict(
+            self.conn.execute(
+                "SELECT weight, cards FROM vocab_weight_counts WHERE profile_id = ? AND cards > 0 ORDER BY weight",
+                (profile_id,),
+            ).fetchall()
+        )
+        due = self.conn.execute(
+            "SELECT COALESCE(SUM(cards), 0) FROM vocab_due_counts WHERE profile_id = ? AND due <= ?",
+            (profile_id, today_str()),
+        ).fetchone()[0]
+        return {"cards": sum(weights.values()), "due": due, "weights": weights}
+
+    @traced()
+    def record_vocab_answer(self, profile_id: int, result: Dict):
+        """在一个事务中记录一次词汇卡片答题：卡片状态、答题事件（以读音为题目）和统计"""
+        card = result["card"]
+        with self.conn:
+            self.conn.execute(
+                """
+                UPDATE vocab_cards
+                SET wrong_count = ?, last_review = ?, interval = ?, due = ?, weight = ?, shuffle = ?
+                WHERE profile_id = ? AND word_id = ?
+            """,
+                (
+                    card["wrong_count"],
+                    card["last_review"],
+                    card["interval"],
+                    card["due"],
+                    card_weight(card["wrong_count"]),
+                    random.randrange(SHUFFLE_RANGE),
+                    profile_id,
+                    card["word_id"],
+                ),
+            )
+            self.conn.execute(
+                "INSERT INTO answer_events (profile_id, answered_at, kana, answer, correct) VALUES (?, ?, ?, ?, ?)",
+                (profile_id, now_str(), result["kana"], result["answer"], bool(result["correct"])),
+            )
+            self._add_stats(profile_id, 1, 1 if result["correct"] else 0)
+
+    def import_legacy_json(self, profile_id: int, data_file: str = DATA_FILE, stats_file: str = STATS_FILE) -> bool:
+        """将旧版的 wrong_kana.json 和 stats.json 导入到指定用户"""
+        if not os.path.exists(data_file) and not os.path.exists(stats_file):
+            return False
+
+        data = load_json(data_file)
+        stats = load_json(stats_file)
+        with self.conn:
+            for kana, info in data.items():
+                self._write_kana(profile_id, kana, info)
+            for day, day_stats in stats.items():
+                total = int(day_stats.get("total", 0))
+                correct = int(day_stats.get("correct", 0))
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO daily_stats (profile_id, day, total, correct) VALUES (?, ?, ?, ?)",
+                    (profile_id, day, total, correct),
+                )
+            self.conn.execute(
+                """
+                UPDATE profiles
+                SET total_answers = (SELECT COALESCE(SUM(total), 0) FROM daily_stats WHERE profile_id = ?),
+                    total_correct = (SELECT COALESCE(SUM(correct), 0) FROM daily_stats WHERE profile_id = ?)
+                WHERE id = ?
+            """,
+                (profile_id, profile_id, profile_id),
+            )
+        return True
+
+
+class LearnerProfile:
+    """当前学习者：持有假名状态并负责将答题结果写回数据库"""
+
+    def __init__(self, store: ProfileStore, name: str):
+        """加载（必要时创建）指定用户"""
+        is_new = store.get_profile_id(name) is None
+        self.store = store
+        self.name = name
+        self.id = store.get_or_create_profile(name)
+
+        # 首次创建默认用户时导入旧版JSON数据
+        if is_new and name == DEFAULT_PROFILE:
+            store.import_legacy_json(self.id)
+
+        store.touch_profile(self.id)
+        self.data = store.load_kana_state(self.id)
+
+    def record_answer(self, result: Dict):
+        """QuizSession 的 on_answer 回调"""
+        self.store.record_answer(self.id, result, self.data)
+
+    def record_answers(self, results: List[Dict]):
+        """BulkQuizSession 的 on_batch 回调"""
+        self.store.record_answers(self.id, results, self.data)
+
+    def record_word_answer(self, result: Dict):
+        """ReadableWordSession 的 on_answer 回调"""
+        self.store.record_word_answer(self.id, result)
+
+    def load_stats(self) -> Dict:
+        """加载当前用户的每日统计"""
+        return self.store.load_stats(self.id)
+
+    def add_vocab_words(self, words) -> int:
+        """把查词结果（WordEntry）加入词汇卡片，返回新增的卡片数"""
+        return self.store.add_vocab_cards(self.id, [vocab_card_from_word(word) for word in words])
+
+    def next_due_vocab_card(self) -> Optional[Dict]:
+        """最早到期的词汇卡片"""
+        return self.store.next_due_vocab_card(self.id)
+
+    def pick_vocab_card(self, rng=random) -> Optional[Dict]:
+        """按错题权重随机选一张词汇卡片"""
+        return self.store.pick_vocab_card(self.id, rng)
+
+    def vocab_stats(self) -> Dict:
+        """词汇卡片统计"""
+        return self.store.vocab_stats(self.id)
+
+    def record_vocab_answer(self, result: Dict):
+        """VocabReviewSession 的 on_answer 回调"""
+        self.store.record_vocab_answer(self.id, result)
@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+性能剖析模块（只依赖标准库）
+用 cProfile 记录整个会话的函数调用，同时按 CPU 时间定时采样主线程的调用栈；
+退出时写出 .pstats（可用 snakeviz、python -m pstats 等查看）和折叠栈文件
+（每行 "栈;帧 次数"，可直接交给 flamegraph.pl、speedscope、inferno 生成火焰图），
+并在标准错误输出打印自身耗时最多的函数。
+
+以 --profile 启动 main.py 时通过本模块的命令行重新运行 main.py，剖析结果包含导入阶段：
+    python profiling.py --name main main.py
+迁移脚本的 --profile 在解析参数后直接调用 enable()。
+"""
+
+import argparse
+import atexit
+import cProfile
+import os
+import pstats
+import runpy
+import signal
+import subprocess
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+from config import PROFILING_DIR, PROFILING_SAMPLE_INTERVAL_MS, PROFILING_SUMMARY_TOP
+
+PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+PSTATS_SUFFIX = ".pstats"
+COLLAPSED_SUFFIX = ".collapsed"
+
+_profiler: Optional["Profiler"] = None
+
+
+def short_path(filename: str) -> str:
+    """缩短源文件路径：项目内的文件用相对路径，第三方库从包名开始"""
+    if filename.startswith(PROJECT_DIR + os.sep):
+        return os.path.relpath(filename, PROJECT_DIR)
+    marker = "site-packages" + os.sep
+    if marker in filename:
+        return filename.split(marker, 1)[1]
+    return os.path.basename(filename)
+
+
+class StackSampler:
+    """调用栈采样器，结果按折叠栈计数
+
+    支持 setitimer 的平台用 SIGPROF 定时器按进程 CPU 时间采样，信号处理函数在主线程中
+    拿到被打断的帧，等待输入（input()、菜单）时不消耗 CPU 也就不会被采样；
+    其他平台退化为后台线程按墙钟抓取主线程的调用栈
+    """
+
+    def __init__(self, interval_ms: float):
+        self.interval = interval_ms / 1000
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self.use_signal = hasattr(signal, "setitimer") and threading.current_thread() is threading.main_thread()
+        self._labels: Dict = {}
+        self._thread_id = threading.get_ident()
+        self._thread: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+        self._previous_handler = None
+
+    @property
+    def clock(self) -> str:
+        """采样所按的时钟"""
+        return "CPU 时间" if self.use_signal else "墙钟"
+
+    def label(self, code) -> str:
+        """帧在折叠栈中的名称：函数名 (文件:行号)"""
+        name = self._labels.get(code)
+        if name is None:
+            name = f"{code.co_name} ({short_path(code.co_filename)}:{code.co_firstlineno})".replace(";", ":")
+            self._labels[code] = name
+        return name
+
+    def record(self, frame):
+        """记录一个调用栈（从被打断的帧回溯到入口）"""
+        stack = []
+        while frame is not None:
+            # 跳过本模块自身的帧（剖析入口和信号处理函数）
+            if frame.f_code.co_filename != __file__:
+                stack.append(self.label(frame.f_code))
+            frame = frame.f_back
+        if stack:
+            self.stacks[";".join(reversed(stack))] += 1
+            self.samples += 1
+
+    def start(self):
+        """开始采样"""
+        if self.use_signal:
+            self._previous_handler = signal.signal(signal.SIGPROF, self._handle)
+            signal.setitimer(signal.ITIMER_PROF, self.interval, self.interval)
+        else:
+            self._thread = threading.Thread(target=self._run, name="profiling-sampler", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """停止采样"""
+        if self.use_signal:
+            signal.setitimer(signal.ITIMER_PROF, 0, 0)
+            signal.signal(signal.SIGPROF, self._previous_handler or signal.SIG_DFL)
+        elif self._thread:
+            self._stopped.set()
+            self._thread.join()
+
+    def _handle(self, signum, frame):
+        """SIGPROF 处理函数"""
+        self.record(frame)
+
+    def _run(self):
+        """后台线程定时抓取主线程的调用栈"""
+        while not self._stopped.wait(self.interval):
+            frame = sys._current_frames().get(self._thread_id)
+            if frame is None:
+                break
+            self.record(frame)
+
+
+class Profiler:
+    """cProfile 加调用栈采样，停止后写出 .pstats 和折叠栈文件"""
+
+    def __init__(self, name: str, directory: str = PROFILING_DIR, interval_ms: float = PROFILING_SAMPLE_INTERVAL_MS):
+        """name 为输出文件名前缀（main、migrate 等），interval_ms 为采样间隔，0 表示不采样"""
+        self.name = name
+        self.directory = directory
+        self.profile = cProfile.Profile()
+        self.sampler = StackSampler(interval_ms) if interval_ms > 0 else None
+        self.started = 0.0
+        self.elapsed = 0.0
+        self.paths: List[str] = []
+
+    def start(self):
+        """开始记录（cProfile 和采样都只针对调用 start 的线程）"""
+        self.started = time.perf_counter()
+        if self.sampler:
+            self.sampler.start()
+        self.profile.enable()
+
+    def stop(self):
+        """停止记录"""
+        self.profile.disable()
+        self.elapsed = time.perf_counter() - self.started
+        if self.sampler:
+            self.sampler.stop()
+
+    def write(self) -> List[str]:
+        """写出 .pstats 和折叠栈文件，返回写出的路径"""
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        base = os.path.join(self.directory, f"{self.name}-{stamp}-{os.getpid()}")
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            self.profile.dump_stats(base + PSTATS_SUFFIX)
+            self.paths.append(base + PSTATS_SUFFIX)
+            if self.sampler and self.sampler.stacks:
+                with open(base + COLLAPSED_SUFFIX, "w", encoding="utf-8") as f:
+                    for stack, count in self.sampler.stacks.most_common():
+                        f.write(f"{stack} {count}\n")
+                self.paths.append(base + COLLAPSED_SUFFIX)
+        except OSError as e:
+            sys.stderr.write(f"剖析结果写入失败: {e}\n")
+        return self.paths
+
+    def hotspots(self, top: int = PROFILING_SUMMARY_TOP) -> List[Tuple[str, int, float, float]]:
+        """自身耗时最多的函数：[(函数, 调用次数, 自身耗时秒, 累计耗时秒)]"""
+        stats = pstats.Stats(self.profile).stats
+        items = [
+            (f"{func} ({short_path(filename)}:{line})" if line else func, calls, tottime, cumtime)
+            for (filename, line, func), (_, calls, tottime, cumtime, _) in stats.items()
+            if filename != __file__
+        ]
+        return sorted(items, key=lambda item: item[2], reverse=True)[:top]
+
+    def print_summary(self, out=sys.stderr, top: int = PROFILING_SUMMARY_TOP):
+        """打印自身耗时最多的函数和输出文件"""
+        hotspots = self.hotspots(top)
+        out.write(f"\n剖析摘要（会话 {self.elapsed:.2f} 秒，自身耗时最多的 {len(hotspots)} 个函数，毫秒）\n")
+        out.write(f"{'函数':<64}{'调用次数':>10}{'自身耗时':>12}{'累计耗时':>12}\n")
+        for func, calls, tottime, cumtime in hotspots:
+            out.write(f"{func[:63]:<64}{calls:>10}{tottime * 1000:>12.2f}{cumtime * 1000:>12.2f}\n")
+        if self.sampler:
+            out.write(
+                f"调用栈采样（按{self.sampler.clock}）: {self.sampler.samples} 次，间隔 {self.sampler.interval * 1000:g} ms\n"
+            )
+        for path in self.paths:
+            out.write(f"已写入: {path}\n")
+
+
+def enabled() -> bool:
+    """剖析是否已开启"""
+    return _profiler is not None
+
+
+def enable(name: str, directory: str = PROFILING_DIR) -> Profiler:
+    """开始剖析当前线程，程序退出时写出结果并打印摘要；已开启时返回当前的 Profiler"""
+    global _profiler
+    if _profiler is None:
+        _profiler = Profiler(name, directory)
+        _profiler.start()
+        atexit.register(shutdown)
+    return _profiler
+
+
+def shutdown():
+    """停止剖析，写出结果并打印摘要"""
+    global _profiler
+    profiler, _profiler = _profiler, None
+    if profiler is not None:
+        profiler.stop()
+        profiler.write()
+        profiler.print_summary()
+
+
+def relaunch(name: str, script: str, argv: List[str]) -> int:
+    """在新的解释器中通过本模块运行脚本（剖析从导入阶段开始），返回退出码"""
+    command = [sys.executable, os.path.abspath(__file__), "--name", name, script, *argv]
+    try:
+        return subprocess.call(command)
+    except KeyboardInterrupt:
+        return 130
+
+
+def main(argv=None):
+    """命令行入口：剖析运行指定脚本"""
+    parser = argparse.ArgumentParser(description="剖析运行 Python 脚本，写出 .pstats 和折叠栈文件")
+    parser.add_argument("--name", help="输出文件名前缀，默认为脚本名")
+    parser.add_argument("script", help="要运行的脚本")
+    parser.add_argument("args", nargs=argparse.REMAINDER, help="传给脚本的参数")
+    args = parser.parse_args(argv)
+
+    script = os.path.abspath(args.script)
+    sys.argv = [script, *args.args]
+    sys.path[0] = os.path.dirname(script)
+    enable(args.name or os.path.splitext(os.path.basename(script))[0])
+    runpy.run_path(script, run_name="__main__")
+
+
+if __name__ == "__main__":
+    # 以模块名重新导入：runpy 运行脚本时会替换 __main__，剖析状态需要放在独立的模块中
+    import profiling
+
+    profiling.main()
@@ -0,0 +1,448 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+练习引擎模块
+提供与界面无关的假名练习会话（选题、判题、状态更新），
+终端界面、脚本模式等前端都基于它实现
+"""
+
+import argparse
+import json
+import random
+import sys
+from typing import Callable, Dict, Iterable, List, Optional
+
+from config import BULK_BLOCK_SIZE, DEFAULT_PROFILE, MAX_INTERVAL
+from data_manager import (
+    apply_answer,
+    due_date,
+    due_for_review,
+    load_json,
+    mastered_kana,
+    next_review_state,
+    pick_kana,
+    pick_kana_block,
+    save_json,
+)
+from kana_data import kana_romaji, kana_rows
+from tracing import count
+
+MODE_NAMES = {"review": "每日复习", "free": "自由练习"}
+
+
+class QuizSession:
+    """假名练习会话引擎，不进行任何渲染或阻塞输入"""
+
+    def __init__(self, data: Dict, mode: str = "free", on_answer: Optional[Callable[[Dict], None]] = None):
+        """初始化练习会话
+
+        data: 错题记录字典（会被就地更新）
+        mode: "review" 每日复习 / "free" 自由练习
+        on_answer: 每次判题后的回调，接收判题结果，用于持久化等副作用
+        """
+        if mode not in MODE_NAMES:
+            raise ValueError(f"未知练习模式: {mode}")
+
+        self.data = data
+        self.mode = mode
+        self.on_answer = on_answer
+        self.review_list = due_for_review(data) if mode == "review" else []
+        self.correct_count = 0
+        self.total_count = 0
+        self.current = None
+        self.finished = False
+
+    @property
+    def mode_name(self) -> str:
+        """练习模式名称"""
+        return MODE_NAMES[self.mode]
+
+    def next_item(self) -> Optional[str]:
+        """选出下一道题的假名，会话结束时返回None"""
+        if self.finished:
+            return None
+
+        if self.mode == "review" and not self.review_list:
+            self.finished = True
+            return None
+
+        if self.current is None:
+            self.current = pick_kana(self.data, self.review_list)
+        return self.current
+
+    def ask(self, kana: str) -> str:
+        """指定下一道题（供不保存会话状态的前端使用）"""
+        if kana not in kana_romaji:
+            raise ValueError(f"未知假名: {kana}")
+        self.current = kana
+        return kana
+
+    def submit_answer(self, answer: str) -> Dict:
+        """提交当前题目的答案并返回判题结果"""
+        if self.current is None:
+            raise RuntimeError("当前没有待作答的题目，请先调用 next_item()")
+
+        kana = self.current
+        romaji = kana_romaji[kana]
+        answer = answer.strip().lower()
+        is_correct = answer == romaji
+
+        self.total_count += 1
+        if is_correct:
+            self.correct_count += 1
+
+        apply_answer(self.data, kana, is_correct)
+        count("quiz.answers")
+        count("quiz.correct", is_correct)
+
+        # 如果是复习模式，从复习列表中移除已练习的假名
+        if self.mode == "review" and kana in self.review_list:
+            self.review_list.remove(kana)
+
+        self.current = None
+
+        result = {"kana": kana, "romaji": romaji, "answer": answer, "correct": is_correct}
+        if self.on_answer:
+            self.on_answer(result)
+        return result
+
+    def finish(self) -> Dict:
+        """结束会话并返回统计摘要"""
+        self.finished = True
+        self.current = None
+        return self.summary()
+
+    def summary(self) -> Dict:
+        """返回当前会话的统计摘要"""
+        rate = self.correct_count / self.total_count * 100 if self.total_count > 0 else 0.0
+        return {
+            "mode": self.mode,
+            "total": self.total_count,
+            "correct": self.correct_count,
+            "rate": round(rate, 1),
+            "remaining_review": len(self.review_list),
+        }
+
+
+class BulkQuizSession(QuizSession):
+    """批量练习会话：一次出一整行或随机一组假名，一行答案（以空格分隔）一起判题，
+    学习状态一次更新，结果通过 on_batch 回调一次写回"""
+
+    def __init__(
+        self,
+        data: Dict,
+        mode: str = "free",
+        block_size: int = BULK_BLOCK_SIZE,
+        on_batch: Optional[Callable[[List[Dict]], None]] = None,
+    ):
+        """初始化练习会话
+
+        block_size: 随机出题时每组的假名数
+        on_batch: 每组判题后的回调，接收这一组的判题结果列表
+        """
+        super().__init__(data, mode=mode)
+        # 随机出题时自由练习也先出到期题（答过的假名在 submit_answers 中移出）
+        self.review_list = due_for_review(data)
+        self.block_size = block_size
+        self.on_batch = on_batch
+        self.batch = None
+
+    def next_batch(self, row: Optional[str] = None) -> Optional[List[str]]:
+        """选出下一组假名：指定 row 时为该行（顺序打乱），否则先出复习题再按错题权重补足；会话结束时返回None"""
+        if self.finished:
+            return None
+
+        if self.batch is None:
+            if row is not None:
+                if row not in kana_rows:
+                    raise ValueError(f"未知的假名行: {row}")
+                self.batch = random.sample(kana_rows[row], len(kana_rows[row]))
+            elif self.mode == "review":
+                if not self.review_list:
+                    self.finished = True
+                    return None
+                self.batch = random.sample(self.review_list, min(self.block_size, len(self.review_list)))
+            else:
+                self.batch = pick_kana_block(self.data, self.review_list, self.block_size)
+        return self.batch
+
+    def submit_answers(self, line: str) -> List[Dict]:
+        """提交一行以空格分隔的答案，按顺序与当前这组假名对应（缺少的答案判为错误，多余的忽略）"""
+        if self.batch is None:
+            raise RuntimeError("当前没有待作答的题目，请先调用 next_batch()")
+
+        answers = line.strip().lower().split()
+        results = []
+        for position, kana in enumerate(self.batch):
+            romaji = kana_romaji[kana]
+            answer = answers[position] if position < len(answers) else ""
+            is_correct = answer == romaji
+            apply_answer(self.data, kana, is_correct)
+            results.append({"kana": kana, "romaji": romaji, "answer": answer, "correct": is_correct})
+
+        self.total_count += len(results)
+        self.correct_count += sum(1 for result in results if result["correct"])
+        count("quiz.answers", len(results))
+        count("quiz.correct", sum(1 for result in results if result["correct"]))
+        if self.review_list:
+            answered = set(self.batch)
+            self.review_list = [kana for kana in self.review_list if kana not in answered]
+        self.batch = None
+
+        if self.on_batch:
+            self.on_batch(results)
+        return results
+
+    def finish(self) -> Dict:
+        """结束会话并返回统计摘要"""
+        self.batch = None
+        return super().finish()
+
+
+class ReadableWordSession:
+    """认读单词练习会话：只出主读音全部由已掌握假名组成的词，不修改假名的学习状态"""
+
+    mode_name = "认读单词"
+
+    def __init__(self, data: Dict, index, manager, on_answer: Optional[Callable[[Dict], None]] = None):
+        """初始化练习会话
+
+        data: 错题记录字典（用于判断已掌握的假名，可以在练习过程中变化）
+        index: JMdict.kana_mask.ReadableWordIndex
+        manager: JMdictSQLiteManager，用于读取选中的词条
+        on_answer: 每次判题后的回调
+        """
+        self.data = data
+        self.index = index
+        self.manager = manager
+        self.on_answer = on_answer
+        self.correct_count = 0
+        self.total_count = 0
+        self.current = None
+        self.finished = False
+
+    def mastered_mask(self) -> int:
+        """按当前的错题记录计算已掌握假名的掩码（掩码不变时筛选结果会被复用）"""
+        return self.index.mastered_mask(mastered_kana(self.data))
+
+    def readable_count(self) -> int:
+        """当前可以出题的词条数"""
+        return self.index.count(self.mastered_mask())
+
+    def next_item(self):
+        """选出下一个词条（WordEntry），没有可读的词时返回None"""
+        if self.finished:
+            return None
+        if self.current is None:
+            word_id = self.index.pick(self.mastered_mask())
+            if word_id is None:
+                self.finished = True
+                return None
+            self.current = self.manager._get_word_details(word_id)
+        return self.current
+
+    def submit_answer(self, answer: str) -> Dict:
+        """提交当前词条读音的罗马音并返回判题结果"""
+        if self.current is None:
+            raise RuntimeError("当前没有待作答的题目，请先调用 next_item()")
+
+        from JMdict.kana_mask import reading_romaji
+
+        word = self.current
+        reading = word.kana[0]
+        romaji = reading_romaji(reading)
+        answer = answer.strip().lower()
+        is_correct = answer == romaji
+
+        self.total_count += 1
+        if is_correct:
+            self.correct_count += 1
+        self.current = None
+
+        result = {"kana": reading, "romaji": romaji, "answer": answer, "correct": is_correct, "word_id": word.id}
+        if self.on_answer:
+            self.on_answer(result)
+        return result
+
+    def finish(self) -> Dict:
+        """结束会话并返回统计摘要"""
+        self.finished = True
+        self.current = None
+        return self.summary()
+
+    def summary(self) -> Dict:
+        """返回当前会话的统计摘要"""
+        rate = self.correct_count / self.total_count * 100 if self.total_count > 0 else 0.0
+        return {"mode": "readable", "total": self.total_count, "correct": self.correct_count, "rate": round(rate, 1)}
+
+
+class VocabReviewSession:
+    """词汇卡片练习会话：看写法和含义，输入读音（罗马音或假名），按间隔重复算法安排下次复习"""
+
+    mode_name = "词汇卡片"
+
+    def __init__(self, deck, mode: str = "review", on_answer: Optional[Callable[[Dict], None]] = None):
+        """初始化练习会话
+
+        deck: 提供 next_due_vocab_card() 和 pick_vocab_card() 的卡片来源（LearnerProfile）
+        mode: "review" 只复习到期卡片 / "free" 先复习到期卡片，之后按错题权重随机出题
+        on_answer: 每次判题后的回调，结果中的 "card" 为更新后的卡片状态，需要由回调写回
+        """
+        if mode not in MODE_NAMES:
+            raise ValueError(f"未知练习模式: {mode}")
+
+        self.deck = deck
+        self.mode = mode
+        self.on_answer = on_answer
+        self.correct_count = 0
+        self.total_count = 0
+        self.current = None
+        self.finished = False
+
+    def next_item(self) -> Optional[Dict]:
+        """选出下一张卡片，会话结束时返回None"""
+        if self.finished:
+            return None
+        if self.current is None:
+            card = self.deck.next_due_vocab_card()
+            if card is None and self.mode == "free":
+                card = self.deck.pick_vocab_card()
+            if card is None:
+                self.finished = True
+                return None
+            self.current = card
+        return self.current
+
+    def submit_answer(self, answer: str) -> Dict:
+        """提交当前卡片读音的罗马音（或假名）并返回判题结果"""
+        if self.current is None:
+            raise RuntimeError("当前没有待作答的题目，请先调用 next_item()")
+
+        from JMdict.kana_mask import reading_romaji
+
+        card = self.current
+        romaji = reading_romaji(card["reading"])
+        answer = answer.strip().lower()
+        is_correct = answer in (romaji, card["reading"])
+
+        self.total_count += 1
+        if is_correct:
+            self.correct_count += 1
+        self.current = None
+
+        card = dict(card)
+        card.update(next_review_state(card, is_correct))
+        # 卡片由学习者主动添加，不会像假名错题记录那样被删除，间隔最长 MAX_INTERVAL 天
+        card["interval"] = min(card["interval"], MAX_INTERVAL)
+        card["due"] = due_date(card["last_review"], card["interval"])
+        result = {
+            "kana": card["reading"],
+            "romaji": romaji or card["reading"],
+            "answer": answer,
+            "correct": is_correct,
+            "word_id": card["word_id"],
+            "card": card,
+        }
+        if self.on_answer:
+            self.on_answer(result)
+        return result
+
+    def finish(self) -> Dict:
+        """结束会话并返回统计摘要"""
+        self.finished = True
+        self.current = None
+        return self.summary()
+
+    def summary(self) -> Dict:
+        """返回当前会话的统计摘要"""
+        rate = self.correct_count / self.total_count * 100 if self.total_count > 0 else 0.0
+        return {"mode": self.mode, "total": self.total_count, "correct": self.correct_count, "rate": round(rate, 1)}
+
+
+def parse_answer_line(line: str) -> Optional[str]:
+    """解析答案流中的一行，支持纯文本或JSONL（{"answer": "ka"}）"""
+    line = line.strip()
+    if not line:
+        return None
+    if line.startswith("{"):
+        record = json.loads(line)
+        return str(record.get("answer", ""))
+    return line
+
+
+def next_answer(lines) -> Optional[str]:
+    """从答案流中读取下一个答案（跳过空行），读完时返回None"""
+    for line in lines:
+        answer = parse_answer_line(line)
+        if answer is not None:
+            return answer
+    return None
+
+
+def run_script(session: QuizSession, lines: Iterable[str], out=sys.stdout, prompts: bool = False) -> Dict:
+    """用脚本化的答案流驱动练习会话，每道题输出一行JSON结果
+
+    prompts 为 True 时在读取每个答案之前先输出一行 {"prompt": 假名} 并刷新，
+    作为子进程运行的脚本可以先看到题目再作答
+    """
+    lines = iter(lines)
+    while True:
+        kana = session.next_item()
+        if kana is None:
+            break
+        if prompts:
+            out.write(json.dumps({"prompt": kana}, ensure_ascii=False) + "\n")
+            out.flush()
+
+        answer = next_answer(lines)
+        if answer is None or answer.lower() == "q":
+            break
+
+        result = session.submit_answer(answer)
+        out.write(json.dumps(result, ensure_ascii=False) + "\n")
+
+    summary = session.finish()
+    out.write(json.dumps({"summary": summary}, ensure_ascii=False) + "\n")
+    return summary
+
+
+def main(argv=None):
+    """非交互式练习入口：从标准输入读取答案流"""
+    parser = argparse.ArgumentParser(description="从标准输入读取答案（每行一个，或JSONL），非交互式运行假名练习")
+    parser.add_argument("--mode", choices=sorted(MODE_NAMES), default="free", help="练习模式")
+    parser.add_argument("--user", default=DEFAULT_PROFILE, help="用户名（数据保存在用户数据库中）")
+    parser.add_argument("--data", help="改用旧版JSON错题记录文件，而不是用户数据库")
+    parser.add_argument("--dry-run", action="store_true", help="不写回错题记录和统计数据")
+    parser.add_argument("--prompts", action="store_true", help='读取每个答案之前先输出一行 {"prompt": 假名}')
+    parser.add_argument("--seed", type=int, help="随机种子（学习数据相同时出题顺序可复现，可配合 --dry-run）")
+    args = parser.parse_args(argv)
+    if args.seed is not None:
+        random.seed(args.seed)
+
+    if args.data:
+        data = load_json(args.data)
+        on_answer = None if args.dry_run else (lambda result: save_json(args.data, data))
+        session = QuizSession(data, mode=args.mode, on_answer=on_answer)
+        summary = run_script(session, sys.stdin, prompts=args.prompts)
+
+        if not args.dry_run:
+            from stats_manager import update_stats
+
+            update_stats(summary["total"], summary["correct"])
+        return
+
+    from profile_manager import LearnerProfile, ProfileStore
+
+    store = ProfileStore()
+    try:
+        profile = LearnerProfile(store, args.user)
+        on_answer = None if args.dry_run else profile.record_answer
+        session = QuizSession(profile.data, mode=args.mode, on_answer=on_answer)
+        run_script(session, sys.stdin, prompts=args.prompts)
+    finally:
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+终端画面模块
+把一屏内容渲染为文本行，与上一帧逐行比较，只重写变化的行（光标定位 + 清除行尾），
+代替每道题前 os.system("clear") 启动子进程再重绘整屏；每帧的渲染耗时记录在直方图中
+"""
+
+import time
+from typing import Dict, List, Optional
+
+from rich.console import Console, Group
+
+from config import SCREEN_PROMPT_ROWS
+from tracing import LatencyHistogram
+
+CLEAR_SCREEN = "\x1b[H\x1b[2J"  # 光标移到左上角并清屏
+CLEAR_TO_END = "\x1b[J"  # 清除光标之后的全部内容
+CLEAR_LINE_END = "\x1b[K"  # 清除光标之后的本行内容
+
+
+def move_to(row: int) -> str:
+    """把光标移到第 row 行（从1开始）的行首"""
+    return f"\x1b[{row};1H"
+
+
+class Screen:
+    """逐行差分重绘的终端画面
+
+    每一帧从屏幕左上角开始，画面之下留给 input() 等提示；
+    画面被其他输出改变后（菜单、直接打印等）需要调用 invalidate()，下一帧整屏重绘
+    """
+
+    def __init__(self, console: Console, reserve: int = SCREEN_PROMPT_ROWS):
+        """reserve 为画面之下需要保留的行数，画面加上保留行超出终端高度时改为整屏重绘"""
+        self.console = console
+        self.reserve = reserve
+        self.lines: Optional[List[str]] = None  # 上一帧的各行，None 表示屏幕内容未知
+        self.size = None
+        self.latency = LatencyHistogram()
+        self.last_ms = 0.0
+
+    def invalidate(self):
+        """屏幕内容已被其他输出改变，下一帧整屏重绘"""
+        self.lines = None
+
+    def render(self, *renderables) -> List[str]:
+        """把一帧内容渲染为带样式控制序列的文本行"""
+        with self.console.capture() as capture:
+            self.console.print(Group(*renderables))
+        return capture.get().rstrip("\n").split("\n")
+
+    def show(self, *renderables):
+        """显示一帧：只重写与上一帧不同的行，并清除画面之下的旧内容，光标停在画面下一行"""
+        start = time.perf_counter()
+        console = self.console
+
+        if not console.is_terminal or console.legacy_windows:
+            # 输出被重定向或不支持控制序列的旧版 Windows 控制台：按普通输出打印
+            if console.is_terminal:
+                console.clear()
+            console.print(Group(*renderables))
+            self._record(start)
+            return
+
+        lines = self.render(*renderables)
+        size = console.size
+        fits = len(lines) + self.reserve <= size.height
+        if self.lines is None or size != self.size or not fits:
+            output = CLEAR_SCREEN + "\n".join(lines) + "\n"
+        else:
+            parts = [
+                move_to(row) + line + CLEAR_LINE_END
+                for row, line in enumerate(lines, 1)
+                if row > len(self.lines) or self.lines[row - 1] != line
+            ]
+            parts.append(move_to(len(lines) + 1) + CLEAR_TO_END)
+            output = "".join(parts)
+
+        # 画面超出终端高度时会滚动，行号不再对应，下一帧仍然整屏重绘
+        self.lines = lines if fits else None
+        self.size = size
+        console.file.write(output)
+        console.file.flush()
+        self._record(start)
+
+    def _record(self, start: float):
+        """记录一帧的耗时（渲染和写出）"""
+        self.last_ms = (time.perf_counter() - start) * 1000
+        self.latency.add(self.last_ms)
+
+    def stats(self) -> Dict:
+        """各帧耗时统计（毫秒）"""
+        return {
+            "frames": self.latency.count,
+            "mean_ms": round(self.latency.mean_ms, 3),
+            "p50_ms": round(self.latency.percentile(50), 3),
+            "p95_ms": round(self.latency.percentile(95), 3),
+            "max_ms": round(self.latency.max_ms, 3),
+        }
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+启动耗时分析模块
+基于 `python -X importtime` 的输出统计 main.py 的导入耗时，
+检查重量级依赖是否被提前导入，并与基线对比以发现性能回退
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from typing import Dict, List
+
+from config import STARTUP_BASELINE_FILE, STARTUP_DEFERRED_MODULES, STARTUP_REGRESSION_TOLERANCE
+
+PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+# 基线随仓库提交，按项目目录定位，与当前工作目录无关
+BASELINE_PATH = os.path.join(PROJECT_DIR, STARTUP_BASELINE_FILE)
+
+
+def parse_importtime(stderr: str) -> List[Dict]:
+    """解析 -X importtime 输出，返回 [{"module", "depth", "self_us", "cumulative_us"}]"""
+    records = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        try:
+            self_us, cumulative_us, name = line[len("import time:") :].split("|")
+            self_us = int(self_us)
+            cumulative_us = int(cumulative_us)
+        except ValueError:
+            # 表头行
+            continue
+        stripped = name.lstrip(" ")
+        depth = (len(name) - len(stripped) - 1) // 2
+        records.append({"module": stripped.strip(), "depth": depth, "self_us": self_us, "cumulative_us": cumulative_us})
+    return records
+
+
+def measure_once(module: str = "main") -> List[Dict]:
+    """在新的解释器中导入指定模块，返回导入耗时记录"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=PROJECT_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return parse_importtime(result.stderr)
+
+
+def measure(module: str = "main", repeat: int = 5) -> Dict:
+    """多次测量并取中位数"""
+    runs = [measure_once(module) for _ in range(repeat)]
+
+    totals = []
+    children: Dict[str, List[int]] = {}
+    imported = set()
+    for records in runs:
+        # 输出按后序排列：子模块记录出现在父模块记录之前
+        pending = []
+        for record in records:
+            imported.add(record["module"])
+            if record["depth"] == 1:
+                pending.append(record)
+            elif record["depth"] == 0:
+                if record["module"] == module:
+                    totals.append(record["cumulative_us"])
+                    for child in pending:
+                        children.setdefault(child["module"], []).append(child["cumulative_us"])
+                pending = []
+
+    return {
+        "module": module,
+        "repeat": repeat,
+        "total_ms": round(statistics.median(totals) / 1000, 2) if totals else 0.0,
+        "modules_ms": {name: round(statistics.median(values) / 1000, 2) for name, values in children.items()},
+        "eager_heavy_modules": sorted({name.split(".")[0] for name in imported} & set(STARTUP_DEFERRED_MODULES)),
+    }
+
+
+def load_baseline(path: str = BASELINE_PATH) -> Dict:
+    """读取启动耗时基线"""
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_baseline(report: Dict, path: str = BASELINE_PATH):
+    """保存启动耗时基线"""
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+
+
+def print_report(report: Dict, baseline: Dict, top_n: int = 10) -> bool:
+    """打印报告，返回是否通过检查（无重量级模块提前导入且未超出基线容差）"""
+    ok = True
+    print(f"启动导入耗时（{report['module']}，{report['repeat']} 次取中位数）: {report['total_ms']:.1f} ms")
+
+    print(f"\n耗时最多的直接导入（前 {top_n} 个）:")
+    ranked = sorted(report["modules_ms"].items(), key=lambda x: x[1], reverse=True)
+    for name, ms in ranked[:top_n]:
+        print(f"  {ms:8.1f} ms  {name}")
+
+    if report["eager_heavy_modules"]:
+        ok = False
+        print(f"\n✗ 以下重量级模块不应在启动时导入: {', '.join(report['eager_heavy_modules'])}")
+    else:
+        print(f"\n✓ 未提前导入重量级模块（{', '.join(STARTUP_DEFERRED_MODULES)}）")
+
+    if baseline.get("total_ms"):
+        limit = baseline["total_ms"] * (1 + STARTUP_REGRESSION_TOLERANCE)
+        delta = (report["total_ms"] - baseline["total_ms"]) / baseline["total_ms"] * 100
+        print(f"基线: {baseline['total_ms']:.1f} ms（变化 {delta:+.1f}%，容差 {STARTUP_REGRESSION_TOLERANCE:.0%}）")
+        if report["total_ms"] > limit:
+            ok = False
+            print("✗ 启动耗时超出基线容差")
+    else:
+        print("尚无基线，可使用 --save-baseline 保存当前结果")
+
+    return ok
+
+
+def run(repeat: int = 5, save: bool = False) -> int:
+    """测量、打印报告并返回退出码"""
+    report = measure(repeat=repeat)
+    ok = print_report(report, load_baseline())
+    if save:
+        save_baseline(report)
+        print(f"已保存基线: {BASELINE_PATH}")
+    return 0 if ok else 1
+
+
+def main(argv=None):
+    """命令行入口"""
+    parser = argparse.ArgumentParser(description="基于 -X importtime 的启动耗时报告")
+    parser.add_argument("--repeat", type=int, default=5, help="测量次数（取中位数）")
+    parser.add_argument("--save-baseline", action="store_true", help="将本次结果保存为基线")
+    args = parser.parse_args(argv)
+    sys.exit(run(args.repeat, args.save_baseline))
+
+
+if __name__ == "__main__":
+    main()
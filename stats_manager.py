@@ -6,7 +6,7 @@
 处理学习统计、排行榜和图表显示
 """
 
-import os
+import importlib.util
 from datetime import datetime
 
 from InquirerPy import inquirer
@@ -19,21 +19,17 @@ from rich.text import Text
 from config import BAR_LENGTH, CHART_HEIGHT, CHART_WIDTH, DEFAULT_TOP_N, STATS_FILE
 from data_manager import load_json, save_json
 from kana_data import kana_romaji
+from tracing import traced
 
 console = Console()
 
-# 检查matplotlib是否可用
-try:
-    import matplotlib.pyplot as plt
-
-    MATPLOTLIB_AVAILABLE = True
-except ImportError:
-    MATPLOTLIB_AVAILABLE = False
+# 检查matplotlib是否可用（只在真正绘图时才导入，避免拖慢启动）
+MATPLOTLIB_AVAILABLE = importlib.util.find_spec("matplotlib") is not None
 
 
 def clear_screen():
-    """清屏函数"""
-    os.system("cls" if os.name == "nt" else "clear")
+    """清屏函数（输出控制序列，不启动子进程）"""
+    console.clear()
 
 
 def show_stats_header():
@@ -45,6 +41,7 @@ def show_stats_header():
     console.print()
 
 
+@traced()
 def update_stats(total, correct):
     """更新学习统计数据"""
     stats = load_json(STATS_FILE)
@@ -58,11 +55,12 @@ def update_stats(total, correct):
     save_json(STATS_FILE, stats)
 
 
-def show_stats():
-    """显示学习统计和趋势图"""
+def show_stats(stats=None):
+    """显示学习统计和趋势图，未传入统计数据时读取 stats.json"""
     show_stats_header()
 
-    stats = load_json(STATS_FILE)
+    if stats is None:
+        stats = load_json(STATS_FILE)
     if not stats:
         no_data_text = Text("暂无统计数据（每天答题数/正确数会记录到 stats.json）", style="yellow")
         no_data_panel = Panel(no_data_text, border_style="yellow", padding=(1, 2))
@@ -104,6 +102,8 @@ def show_stats():
         ).execute()
         if use_plot:
             try:
+                import matplotlib.pyplot as plt
+
                 x = [datetime.strptime(d, "%Y-%m-%d") for d in sorted_days]
                 y_tot = totals
                 y_cor = corrects
@@ -132,6 +132,11 @@ def show_leaderboard_header():
     console.print()
 
 
+def rank_wrong_kana(data):
+    """按错题次数从多到少排序，返回 (假名, 学习状态) 列表"""
+    return sorted(data.items(), key=lambda x: x[1].get("wrong_count", 0), reverse=True)
+
+
 def show_leaderboard(data, top_n=DEFAULT_TOP_N):
     """显示错题排行榜"""
     show_leaderboard_header()
@@ -143,7 +148,7 @@ def show_leaderboard(data, top_n=DEFAULT_TOP_N):
         return
 
     # 按错题次数排序
-    sorted_kana = sorted(data.items(), key=lambda x: x[1].get("wrong_count", 0), reverse=True)
+    sorted_kana = rank_wrong_kana(data)
 
     if not sorted_kana:
         no_data_text = Text("暂无错题记录", style="yellow")
@@ -180,6 +185,35 @@ def show_leaderboard(data, top_n=DEFAULT_TOP_N):
     console.print(stats_panel)
 
 
+def show_profile_leaderboard(store, top_n=DEFAULT_TOP_N):
+    """显示用户排行榜（按累计答对数）"""
+    clear_screen()
+    title_text = Text("🏅 用户排行榜", style="bold cyan")
+    title_panel = Panel(title_text, border_style="cyan", padding=(0, 2))
+    console.print(title_panel)
+    console.print()
+
+    rows = store.leaderboard(top_n)
+    if not rows:
+        no_data_text = Text("暂无用户记录", style="yellow")
+        no_data_panel = Panel(no_data_text, border_style="yellow", padding=(1, 2))
+        console.print(no_data_panel)
+        return
+
+    table = Table(title=f"用户排行榜 (前 {top_n} 名，共 {store.count_profiles()} 位用户)", box=box.MINIMAL_DOUBLE_HEAD)
+    table.add_column("排名", justify="center")
+    table.add_column("用户", justify="center")
+    table.add_column("答对数", justify="center")
+    table.add_column("答题数", justify="center")
+    table.add_column("正确率", justify="center")
+
+    for i, row in enumerate(rows, 1):
+        rate = f"{(row['correct'] / row['total'] * 100):.1f}%" if row["total"] > 0 else "0.0%"
+        table.add_row(str(i), row["name"], str(row["correct"]), str(row["total"]), rate)
+
+    console.print(table)
+
+
 def show_leaderboard_interactive(data):
     """交互式排行榜显示"""
     show_leaderboard_header()
@@ -0,0 +1,30 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+测试共用的夹具
+"""
+
+import pytest
+
+from JMdict import migrate_to_sqlite, synthetic
+from JMdict.migrate_to_sqlite import JMdictMigrator
+
+
+@pytest.fixture(scope="session")
+def jmdict_db(tmp_path_factory):
+    """由合成数据迁移得到的小词典数据库路径"""
+    migrate_to_sqlite.console.quiet = True
+    synthetic.console.quiet = True
+    workdir = tmp_path_factory.mktemp("jmdict")
+    source = str(workdir / "jmdict.json.zip")
+    db_path = str(workdir / "jmdict.db")
+    synthetic.write_synthetic(source, 300)
+
+    migrator = JMdictMigrator(source, db_path)
+    try:
+        migrator.create_database()
+        migrator.migrate_from_source()
+    finally:
+        migrator.close()
+    return db_path
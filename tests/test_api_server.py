@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+本地 API 服务测试
+"""
+
+import asyncio
+import json
+import shutil
+from http import HTTPStatus
+
+import pytest
+
+import api_server
+from api_server import ApiServer, DictionaryPool
+from JMdict import synthetic
+from JMdict.migrate_to_sqlite import JMdictMigrator
+
+
+@pytest.fixture
+def app(jmdict_db, tmp_path):
+    server = ApiServer(jmdict_db, profile_db=str(tmp_path / "profiles.db"), pool_size=1)
+    yield server
+    server.close()
+
+
+def request(app, method, target, body=b"", headers=None):
+    """用内存中的请求体调用 handle_request，返回 (状态码, 响应内容)"""
+
+    async def run():
+        reader = asyncio.StreamReader()
+        reader.feed_data(body)
+        reader.feed_eof()
+        request_headers = {"content-length": str(len(body))}
+        request_headers.update(headers or {})
+        return await app.handle_request(method, target, request_headers, reader)
+
+    return asyncio.run(run())
+
+
+class RecordingWriter:
+    """记录写出内容的 StreamWriter 替身"""
+
+    def __init__(self):
+        self.data = b""
+        self.closed = False
+
+    def write(self, data):
+        self.data += data
+
+    async def drain(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+
+def converse(app, data):
+    """把原始字节交给 handle_connection，返回写出的全部响应"""
+
+    async def run():
+        reader = asyncio.StreamReader()
+        reader.feed_data(data)
+        reader.feed_eof()
+        writer = RecordingWriter()
+        await app.handle_connection(reader, writer)
+        assert writer.closed
+        return writer.data
+
+    return asyncio.run(run())
+
+
+@pytest.mark.parametrize("body", [b"[]", b"1", b'"x"', b"null"])
+def test_non_object_json_body_is_rejected(app, body):
+    status, payload = request(app, "POST", "/api/quiz", body)
+    assert status == HTTPStatus.BAD_REQUEST
+    assert "error" in payload
+    assert not app.sessions
+
+
+@pytest.mark.parametrize("length", ["-1", "abc"])
+def test_invalid_content_length_is_rejected(app, length):
+    status, _ = request(app, "POST", "/api/quiz", b"{}", {"content-length": length})
+    assert status == HTTPStatus.BAD_REQUEST
+
+
+@pytest.mark.parametrize(
+    "length, status",
+    [("abc", HTTPStatus.BAD_REQUEST), (str(api_server.API_MAX_BODY + 1), HTTPStatus.REQUEST_ENTITY_TOO_LARGE)],
+)
+def test_unframed_body_closes_connection(app, length, status):
+    # 请求体没有被读取，后面的字节不能被当作下一个请求
+    leftover = b"x" * 100 + b"\r\nGET /api/stats HTTP/1.1\r\n\r\n"
+    data = converse(app, f"POST /api/quiz HTTP/1.1\r\nContent-Length: {length}\r\n\r\n".encode() + leftover)
+    assert data.startswith(f"HTTP/1.1 {status.value} ".encode())
+    assert data.count(b"HTTP/1.1 ") == 1
+    assert b"Connection: close\r\n" in data
+
+
+def test_overlong_request_line_closes_connection(app):
+    assert converse(app, b"GET /" + b"a" * 100_000 + b" HTTP/1.1\r\n\r\n") == b""
+
+
+def test_quiz_session_round_trip(app):
+    status, created = request(app, "POST", "/api/quiz", json.dumps({"user": "tester"}).encode())
+    assert status == HTTPStatus.OK
+    session_id = created["session_id"]
+
+    status, result = request(app, "POST", f"/api/quiz/{session_id}/answer", b'{"answer": "x"}')
+    assert status == HTTPStatus.OK
+    assert result["kana"] == created["kana"]
+
+    status, _ = request(app, "DELETE", f"/api/quiz/{session_id}")
+    assert status == HTTPStatus.OK
+    assert not app.sessions and not app.session_used
+
+
+def test_idle_sessions_expire(app):
+    first = request(app, "POST", "/api/quiz", b"{}")[1]["session_id"]
+    second = request(app, "POST", "/api/quiz", b"{}")[1]["session_id"]
+    app.session_used[first] -= api_server.API_SESSION_IDLE_SECONDS + 1
+
+    app.expire_sessions()
+    assert list(app.sessions) == [second]
+    status, _ = request(app, "GET", f"/api/quiz/{first}/next")
+    assert status == HTTPStatus.NOT_FOUND
+
+
+def test_session_count_is_capped(app, monkeypatch):
+    monkeypatch.setattr(api_server, "API_MAX_SESSIONS", 3)
+    ids = [request(app, "POST", "/api/quiz", b"{}")[1]["session_id"] for _ in range(3)]
+    # 使用过的会话移到最后，超出上限时回收最久未使用的会话
+    request(app, "GET", f"/api/quiz/{ids[0]}/next")
+    newest = request(app, "POST", "/api/quiz", b"{}")[1]["session_id"]
+    assert list(app.sessions) == [ids[2], ids[0], newest]
+
+
+def test_pool_reconnects_after_database_is_replaced(jmdict_db, tmp_path):
+    db_path = str(tmp_path / "jmdict.db")
+    shutil.copyfile(jmdict_db, db_path)
+    pool = DictionaryPool(db_path, size=1)
+    try:
+        with pool.acquire() as manager:
+            assert manager.get_database_stats()["total_words"] == 300
+
+        source = tmp_path / "jmdict.json.zip"
+        synthetic.write_synthetic(str(source), 50)
+        migrator = JMdictMigrator(str(source), db_path)
+        try:
+            migrator.create_database()
+            migrator.migrate_from_source()
+        finally:
+            migrator.close()
+
+        with pool.acquire() as manager:
+            assert manager.get_database_stats()["total_words"] == 50
+    finally:
+        pool.close()
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+基准测试工具函数测试
+"""
+
+import pytest
+
+from benchmarks.harness import BenchmarkSuite, percentile, print_comparison
+
+
+@pytest.mark.parametrize(
+    "values, pct, expected",
+    [
+        (range(1, 101), 50, 50),
+        (range(1, 101), 99, 99),
+        (range(1, 101), 100, 100),
+        (range(1, 21), 95, 19),
+        (range(1, 21), 50, 10),
+        (range(1, 5), 0, 1),
+        ([7.0], 99, 7.0),
+    ],
+)
+def test_percentile_uses_nearest_rank(values, pct, expected):
+    assert percentile(list(values), pct) == expected
+
+
+def test_percentile_of_empty_data_is_zero():
+    assert percentile([], 95) == 0.0
+
+
+def regressed_suite():
+    """一项 p50 比基线慢一倍的结果，以及对应的基线"""
+    suite = BenchmarkSuite("demo", {"size": 1})
+    suite.results["lookup"] = {"p50_ms": 2.0}
+    baseline = suite.to_dict()
+    baseline["results"] = {"lookup": {"p50_ms": 1.0}}
+    return suite, baseline
+
+
+def test_regression_fails_comparison(capsys):
+    suite, baseline = regressed_suite()
+    assert not print_comparison(suite, baseline, 0.25)
+
+
+@pytest.mark.parametrize("key", ["platform", "machine"])
+def test_baseline_from_another_machine_is_skipped(capsys, key):
+    suite, baseline = regressed_suite()
+    baseline["environment"][key] = "other"
+    assert print_comparison(suite, baseline, 0.25)
+    assert "跳过比较" in capsys.readouterr().out
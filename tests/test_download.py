@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+词典资源下载测试（断点续传、服务器不支持续传时重新下载、SHA-256 校验）
+用本地 http.server 提供文件
+"""
+
+import hashlib
+import http.server
+import os
+import threading
+
+import pytest
+
+from config import DOWNLOAD_CHUNK_SIZE
+from JMdict import download
+from JMdict.download import AssetCache, DownloadError, download_asset
+
+PAYLOAD = os.urandom(DOWNLOAD_CHUNK_SIZE + 50_000)
+DIGEST = "sha256:" + hashlib.sha256(PAYLOAD).hexdigest()
+
+
+class AssetHandler(http.server.BaseHTTPRequestHandler):
+    """提供 PAYLOAD，可以忽略 Range 请求，或在第一次响应中途断开连接"""
+
+    honor_range = True
+    cut_first_response_at = None
+    ranges = []
+
+    def do_GET(self):
+        header = self.headers.get("Range")
+        type(self).ranges.append(header)
+        start = int(header[len("bytes=") : -1]) if header and self.honor_range else 0
+        if start >= len(PAYLOAD):
+            self.send_response(416)
+            self.end_headers()
+            return
+
+        body = PAYLOAD[start:]
+        self.send_response(206 if start else 200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        cut = type(self).cut_first_response_at
+        if cut is not None:
+            # 只发送一部分后断开，模拟连接中断
+            type(self).cut_first_response_at = None
+            self.wfile.write(body[:cut])
+            self.close_connection = True
+            return
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def server(monkeypatch):
+    monkeypatch.setenv("NO_PROXY", "*")
+    monkeypatch.setattr(download.console, "quiet", True)
+
+    class Handler(AssetHandler):
+        ranges = []
+
+    httpd = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield Handler, f"http://127.0.0.1:{httpd.server_address[1]}/jmdict.zip"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_resumes_from_existing_part_file(server, tmp_path):
+    handler, url = server
+    dest = str(tmp_path / "jmdict.zip")
+    with open(dest + ".part", "wb") as f:
+        f.write(PAYLOAD[:100_000])
+
+    digest = download_asset(url, dest, expected_size=len(PAYLOAD), expected_digest=DIGEST)
+
+    assert handler.ranges == ["bytes=100000-"]
+    assert digest == DIGEST.split(":")[1]
+    assert open(dest, "rb").read() == PAYLOAD
+    assert not os.path.exists(dest + ".part")
+
+
+def test_resumes_after_connection_drop(server, tmp_path):
+    handler, url = server
+    # 中断前写入的是完整的分块，续传从最后一个完整分块之后开始
+    handler.cut_first_response_at = DOWNLOAD_CHUNK_SIZE + 1000
+    dest = str(tmp_path / "jmdict.zip")
+
+    download_asset(url, dest, expected_size=len(PAYLOAD), expected_digest=DIGEST)
+
+    assert handler.ranges == [None, f"bytes={DOWNLOAD_CHUNK_SIZE}-"]
+    assert open(dest, "rb").read() == PAYLOAD
+
+
+def test_restarts_when_server_ignores_range(server, tmp_path):
+    handler, url = server
+    handler.honor_range = False
+    dest = str(tmp_path / "jmdict.zip")
+    with open(dest + ".part", "wb") as f:
+        f.write(b"stale data")
+
+    download_asset(url, dest, expected_size=len(PAYLOAD), expected_digest=DIGEST)
+
+    # 服务器返回 200 时丢弃已下载的部分，而不是把完整文件追加在后面
+    assert handler.ranges == ["bytes=10-"]
+    assert open(dest, "rb").read() == PAYLOAD
+
+
+def test_sha256_mismatch_is_rejected(server, tmp_path):
+    _, url = server
+    dest = str(tmp_path / "jmdict.zip")
+
+    with pytest.raises(DownloadError, match="SHA-256"):
+        download_asset(url, dest, expected_size=len(PAYLOAD), expected_digest="sha256:" + "0" * 64)
+
+    assert not os.path.exists(dest)
+    assert not os.path.exists(dest + ".part")
+
+
+def test_asset_cache_copy_error_leaves_no_partial_file(tmp_path, monkeypatch):
+    source = tmp_path / "jmdict.zip"
+    source.write_bytes(PAYLOAD)
+    cache = AssetCache(str(tmp_path / "cache"))
+    cache.put(str(source), DIGEST.split(":")[1])
+    dest = str(tmp_path / "out" / "jmdict.zip")
+    os.makedirs(os.path.dirname(dest))
+    # 之前中断的下载留下的 .part 不属于缓存复制，不能被删掉
+    with open(dest + ".part", "wb") as f:
+        f.write(PAYLOAD[:10])
+
+    def failing_copy(src, dst):
+        with open(dst, "wb") as f:
+            f.write(b"partial")
+        raise OSError("disk full")
+
+    monkeypatch.setattr(download.shutil, "copyfile", failing_copy)
+    with pytest.raises(OSError):
+        cache.fetch(DIGEST, dest)
+    assert not os.path.exists(dest + ".cache-tmp")
+    with open(dest + ".part", "rb") as f:
+        assert f.read() == PAYLOAD[:10]
@@ -0,0 +1,26 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+多用户学习数据存储测试
+"""
+
+from data_manager import today_str
+from profile_manager import ProfileStore
+
+
+def test_add_vocab_cards_is_due_today_and_idempotent(tmp_path):
+    store = ProfileStore(str(tmp_path / "profiles.db"))
+    profile_id = store.get_or_create_profile("tester")
+    card = {"word_id": 1000, "headword": "日本語", "reading": "にほんご", "meaning": "Japanese"}
+
+    assert store.add_vocab_cards(profile_id, [card]) == 1
+    assert store.add_vocab_cards(profile_id, [card]) == 0
+
+    due = store.next_due_vocab_card(profile_id)
+    assert due["word_id"] == 1000
+    assert due["last_review"] == today_str()
+    assert due["due"] == today_str()
+    assert due["interval"] == 1
+    assert due["wrong_count"] == 0
+    store.close()
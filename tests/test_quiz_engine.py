@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+练习引擎测试
+"""
+
+import io
+import json
+import random
+from datetime import date, timedelta
+
+from kana_data import kana_romaji
+from quiz_engine import BulkQuizSession, QuizSession, run_script
+
+
+def kana_record(days_ago, interval):
+    """days_ago 天前复习过、复习间隔为 interval 天的错题记录"""
+    last_review = (date.today() - timedelta(days=days_ago)).strftime("%Y-%m-%d")
+    return {"wrong_count": 3, "last_review": last_review, "interval": interval}
+
+
+def test_bulk_random_block_leads_with_due_kana():
+    kana = list(kana_romaji)
+    due = kana[:3]
+    data = {k: kana_record(10, 1) for k in due}
+    # 错题权重更高但尚未到期的假名不应排在到期题之前
+    data.update({k: kana_record(0, 30) for k in kana[3:20]})
+
+    for _ in range(50):
+        session = BulkQuizSession(dict(data), mode="free", block_size=10)
+        block = session.next_batch()
+        assert len(block) == 10
+        assert set(block[:3]) == set(due)
+        assert len(set(block)) == 10
+
+
+def test_bulk_answered_due_kana_leave_review_list():
+    kana = list(kana_romaji)
+    data = {k: kana_record(10, 1) for k in kana[:3]}
+    session = BulkQuizSession(data, mode="free", block_size=5)
+
+    block = session.next_batch()
+    session.submit_answers(" ".join(kana_romaji[k] for k in block))
+
+    assert session.review_list == []
+    assert session.summary()["remaining_review"] == 0
+
+
+def scripted_run(seed, answers, prompts=False):
+    """用固定种子和答案流运行一次脚本模式，返回输出的各行"""
+    random.seed(seed)
+    out = io.StringIO()
+    run_script(QuizSession({}, mode="free"), answers, out=out, prompts=prompts)
+    return [json.loads(line) for line in out.getvalue().splitlines()]
+
+
+def test_run_script_is_reproducible_with_seed():
+    answers = ["a", "", "ka", "shi", "q", "ignored"]
+    first = scripted_run(7, answers)
+    assert first == scripted_run(7, answers)
+    assert len(first) == 4
+    assert first[-1]["summary"]["total"] == 3
+
+
+def test_run_script_prompts_before_each_answer():
+    records = scripted_run(7, ["a", "ka"], prompts=True)
+    prompts = [record["prompt"] for record in records if "prompt" in record]
+    results = [record for record in records if "kana" in record]
+
+    # 每个结果之前都有对应的题目，答案流读完时还会输出一道未作答的题目
+    assert [records[i]["prompt"] for i in (0, 2)] == [result["kana"] for result in results]
+    assert len(prompts) == 3
+    assert records[-1]["summary"]["total"] == 2
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+词典数据库迁移与查询测试
+"""
+
+import os
+import shutil
+
+import pytest
+
+from JMdict import synthetic
+from JMdict.instrumentation import QueryInstrumentation
+from JMdict.migrate_to_sqlite import BUILD_SUFFIX, JMdictMigrator, get_db_meta
+from JMdict.sqlite_manager import STATS_KEYS, JMdictSQLiteManager
+
+
+def test_database_stats_only_returns_counts(jmdict_db):
+    manager = JMdictSQLiteManager(jmdict_db, verbose=False, instrumentation=QueryInstrumentation(log_path=None))
+    assert manager.connect()
+    assert manager.has_meta
+
+    stats = manager.get_database_stats()
+    assert list(stats) == list(STATS_KEYS)
+    assert stats["total_words"] == 300
+
+    # 与没有 db_meta 时逐表 COUNT(*) 的结果一致
+    manager.has_meta = False
+    assert manager.get_database_stats() == stats
+    manager.disconnect()
+
+
+def test_failed_migration_keeps_existing_database(jmdict_db, tmp_path):
+    db_path = str(tmp_path / "jmdict.db")
+    shutil.copyfile(jmdict_db, db_path)
+    with open(jmdict_db, "rb") as f:
+        original = f.read()
+
+    # JSON 在词条中途截断，流式读取到一半时失败
+    source = tmp_path / "broken.json"
+    source.write_text('{"words": [{"id": "1", "kana": [{"text": "あ"}], "kanji": [], "sense": []}, {"id": "2", "ka')
+    migrator = JMdictMigrator(str(source), db_path)
+    migrator.create_database()
+    with pytest.raises(Exception):
+        migrator.migrate_from_source()
+    migrator.close()
+
+    with open(db_path, "rb") as f:
+        assert f.read() == original
+    assert not os.path.exists(db_path + BUILD_SUFFIX)
+
+
+def test_migration_replaces_database(jmdict_db, tmp_path):
+    db_path = str(tmp_path / "jmdict.db")
+    shutil.copyfile(jmdict_db, db_path)
+    source = tmp_path / "jmdict.json.zip"
+    synthetic.write_synthetic(str(source), 50)
+
+    migrator = JMdictMigrator(str(source), db_path)
+    migrator.create_database()
+    assert migrator.migrate_from_source() == 50
+    migrator.close()
+
+    assert get_db_meta(db_path)["total_words"] == 50
+    assert not os.path.exists(db_path + BUILD_SUFFIX)
+
+
+def test_reader_reconnects_after_database_is_replaced(jmdict_db, tmp_path):
+    db_path = str(tmp_path / "jmdict.db")
+    shutil.copyfile(jmdict_db, db_path)
+    manager = JMdictSQLiteManager(db_path, read_only=True, verbose=False)
+    assert manager.connect()
+    build_id = manager.get_build_id()
+    assert not manager.file_replaced()
+
+    source = tmp_path / "jmdict.json.zip"
+    synthetic.write_synthetic(str(source), 50)
+    migrator = JMdictMigrator(str(source), db_path)
+    try:
+        migrator.create_database()
+        migrator.migrate_from_source()
+    finally:
+        migrator.close()
+
+    # 旧连接仍读到旧文件的构建id
+    assert manager.get_build_id() == build_id
+    assert manager.file_replaced()
+    assert manager.reconnect()
+    assert not manager.file_replaced()
+    assert manager.get_build_id() != build_id
+    assert manager.get_database_stats()["total_words"] == 50
+    manager.disconnect()
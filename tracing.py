@@ -0,0 +1,342 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+轻量级追踪模块（只依赖标准库）
+在热点路径（出题、例词、JSON 写入、统计更新、词典查询、迁移各阶段）上记录 span，
+按名称汇总耗时直方图和计数器；span 逐条写入 JSONL，指标在退出时写成 Prometheus 文本格式，
+并在标准错误输出打印耗时摘要。
+
+默认关闭：设置环境变量 KANA_TRACE=1，或以 --trace 启动 main.py / 迁移脚本时开启。
+关闭时 span() 返回共享的空对象，traced 装饰的函数只多一次全局变量判断。
+"""
+
+import atexit
+import bisect
+import contextvars
+import functools
+import itertools
+import json
+import math
+import os
+import sys
+import threading
+import time
+from typing import Dict, List, Optional
+
+from config import TRACE_BUFFER_SPANS, TRACE_DIR, TRACE_ENABLED, TRACE_SUMMARY_TOP
+
+SPANS_FILE = "spans.jsonl"
+METRICS_FILE = "metrics.prom"
+METRIC_PREFIX = "kana"
+# Prometheus 直方图只导出每翻一倍的桶（细分桶仍用于分位数估算）
+EXPORT_BUCKET_STEP = 4
+
+# 直方图桶的上界（毫秒）：从 0.01ms 到约 100s，每 4 个桶翻一倍，分位数的相对误差约 19%
+BUCKET_BOUNDS_MS = [0.01 * 2 ** (i / 4) for i in range(int(4 * math.log2(100000 / 0.01)) + 1)]
+
+
+class LatencyHistogram:
+    """对数刻度的延迟直方图"""
+
+    def __init__(self):
+        """初始化空直方图"""
+        self.counts = [0] * (len(BUCKET_BOUNDS_MS) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def add(self, elapsed_ms: float):
+        """记录一次耗时"""
+        self.counts[bisect.bisect_left(BUCKET_BOUNDS_MS, elapsed_ms)] += 1
+        self.count += 1
+        self.total_ms += elapsed_ms
+        self.max_ms = max(self.max_ms, elapsed_ms)
+
+    def percentile(self, pct: float) -> float:
+        """估算分位数（所在桶的上界，不超过最大值）"""
+        if not self.count:
+            return 0.0
+        rank = max(1, math.ceil(pct / 100 * self.count))
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                bound = BUCKET_BOUNDS_MS[index] if index < len(BUCKET_BOUNDS_MS) else self.max_ms
+                return min(bound, self.max_ms)
+        return self.max_ms
+
+    @property
+    def mean_ms(self) -> float:
+        """平均耗时"""
+        return self.total_ms / self.count if self.count else 0.0
+
+
+_tracer: Optional["Tracer"] = None
+_current_span: contextvars.ContextVar[Optional[int]] = contextvars.ContextVar("current_span", default=None)
+
+
+class _NoopSpan:
+    """追踪关闭时使用的空 span"""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def set(self, **attrs):
+        """忽略属性"""
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class Span:
+    """一次计时区间，嵌套的 span 通过 parent_id 关联"""
+
+    __slots__ = ("tracer", "name", "attrs", "span_id", "parent_id", "start", "wall_start", "_token")
+
+    def __init__(self, tracer: "Tracer", name: str, attrs: Optional[Dict]):
+        self.tracer = tracer
+        self.name = name
+        self.attrs = attrs
+
+    def __enter__(self):
+        self.span_id = next(self.tracer._ids)
+        self.parent_id = _current_span.get()
+        self._token = _current_span.set(self.span_id)
+        self.wall_start = time.time()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        elapsed_ms = (time.perf_counter() - self.start) * 1000
+        _current_span.reset(self._token)
+        self.tracer._finish(self, elapsed_ms, exc_type.__name__ if exc_type else None)
+        return False
+
+    def set(self, **attrs):
+        """附加属性（例如返回的行数），随 span 写入 JSONL"""
+        if self.attrs is None:
+            self.attrs = {}
+        self.attrs.update(attrs)
+
+
+class Tracer:
+    """收集 span 和计数器，并导出到 TRACE_DIR"""
+
+    def __init__(self, directory: str = TRACE_DIR):
+        """directory 为输出目录（span 的 JSONL 和 Prometheus 指标文件）"""
+        self.directory = directory
+        self.histograms: Dict[str, LatencyHistogram] = {}
+        self.errors: Dict[str, int] = {}
+        self.counters: Dict[str, float] = {}
+        self.buffer: List[str] = []
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def span(self, name: str, attrs: Optional[Dict] = None) -> Span:
+        """创建 span（用作上下文管理器）"""
+        return Span(self, name, attrs)
+
+    def count(self, name: str, value: float = 1):
+        """累加计数器"""
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def _finish(self, span: Span, elapsed_ms: float, error: Optional[str]):
+        """记录结束的 span，缓冲区满时写出"""
+        record = {
+            "name": span.name,
+            "span_id": span.span_id,
+            "parent_id": span.parent_id,
+            "pid": os.getpid(),
+            "thread": threading.get_ident(),
+            "start": round(span.wall_start, 6),
+            "duration_ms": round(elapsed_ms, 4),
+        }
+        if span.attrs:
+            record["attrs"] = span.attrs
+        if error:
+            record["error"] = error
+        line = json.dumps(record, ensure_ascii=False, default=str)
+
+        with self._lock:
+            histogram = self.histograms.get(span.name)
+            if histogram is None:
+                histogram = self.histograms[span.name] = LatencyHistogram()
+            histogram.add(elapsed_ms)
+            if error:
+                self.errors[span.name] = self.errors.get(span.name, 0) + 1
+            self.buffer.append(line)
+            full = len(self.buffer) >= TRACE_BUFFER_SPANS
+        if full:
+            self.flush()
+
+    def flush(self):
+        """把缓冲的 span 追加写入 JSONL 文件"""
+        with self._lock:
+            lines, self.buffer = self.buffer, []
+        if not lines:
+            return
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(os.path.join(self.directory, SPANS_FILE), "a", encoding="utf-8") as f:
+                f.write("\n".join(lines) + "\n")
+        except OSError:
+            # 输出目录不可写时丢弃，不影响程序本身
+            pass
+
+    def summary(self) -> List[Dict]:
+        """各 span 的耗时统计，按总耗时从大到小排列"""
+        with self._lock:
+            items = [
+                {
+                    "name": name,
+                    "calls": histogram.count,
+                    "errors": self.errors.get(name, 0),
+                    "total_ms": round(histogram.total_ms, 3),
+                    "mean_ms": round(histogram.mean_ms, 3),
+                    "p50_ms": round(histogram.percentile(50), 3),
+                    "p95_ms": round(histogram.percentile(95), 3),
+                    "max_ms": round(histogram.max_ms, 3),
+                }
+                for name, histogram in self.histograms.items()
+            ]
+        return sorted(items, key=lambda item: item["total_ms"], reverse=True)
+
+    def prometheus_text(self) -> str:
+        """Prometheus 文本格式的指标：span 耗时直方图（毫秒）、span 错误数和计数器"""
+        histogram_name = f"{METRIC_PREFIX}_span_duration_milliseconds"
+        lines = [
+            f"# HELP {histogram_name} Duration of traced spans in milliseconds.",
+            f"# TYPE {histogram_name} histogram",
+        ]
+        with self._lock:
+            for name, histogram in sorted(self.histograms.items()):
+                label = f'span="{escape_label(name)}"'
+                cumulative = 0
+                for index, bound in enumerate(BUCKET_BOUNDS_MS):
+                    cumulative += histogram.counts[index]
+                    if index % EXPORT_BUCKET_STEP == 0:
+                        lines.append(f'{histogram_name}_bucket{{{label},le="{bound:.6g}"}} {cumulative}')
+                lines.append(f'{histogram_name}_bucket{{{label},le="+Inf"}} {histogram.count}')
+                lines.append(f"{histogram_name}_sum{{{label}}} {histogram.total_ms:.6f}")
+                lines.append(f"{histogram_name}_count{{{label}}} {histogram.count}")
+
+            errors_name = f"{METRIC_PREFIX}_span_errors_total"
+            lines += [f"# HELP {errors_name} Traced spans that raised.", f"# TYPE {errors_name} counter"]
+            for name, errors in sorted(self.errors.items()):
+                lines.append(f'{errors_name}{{span="{escape_label(name)}"}} {errors}')
+
+            counter_name = f"{METRIC_PREFIX}_events_total"
+            lines += [f"# HELP {counter_name} Application counters.", f"# TYPE {counter_name} counter"]
+            for name, value in sorted(self.counters.items()):
+                lines.append(f'{counter_name}{{name="{escape_label(name)}"}} {value:g}')
+        return "\n".join(lines) + "\n"
+
+    def export(self):
+        """写出剩余的 span 和 Prometheus 指标文件"""
+        self.flush()
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(os.path.join(self.directory, METRICS_FILE), "w", encoding="utf-8") as f:
+                f.write(self.prometheus_text())
+        except OSError:
+            pass
+
+    def print_summary(self, out=sys.stderr, top: int = TRACE_SUMMARY_TOP):
+        """打印耗时最多的 span 和全部计数器"""
+        summary = self.summary()
+        if not summary and not self.counters:
+            return
+        out.write(f"\n追踪摘要（耗时最多的 {min(top, len(summary))} 个 span，毫秒）\n")
+        out.write(f"{'span':<44}{'次数':>8}{'总耗时':>12}{'平均':>10}{'p95':>10}{'最大':>10}\n")
+        for item in summary[:top]:
+            errors = f"  错误 {item['errors']}" if item["errors"] else ""
+            out.write(
+                f"{item['name']:<44}{item['calls']:>8}{item['total_ms']:>12.2f}{item['mean_ms']:>10.3f}"
+                f"{item['p95_ms']:>10.3f}{item['max_ms']:>10.3f}{errors}\n"
+            )
+        for name, value in sorted(self.counters.items()):
+            out.write(f"计数 {name}: {value:g}\n")
+        out.write(f"span 与指标已写入: {os.path.join(self.directory, SPANS_FILE)}、{METRICS_FILE}\n")
+
+
+def escape_label(value: str) -> str:
+    """转义 Prometheus 标签值"""
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def enabled() -> bool:
+    """追踪是否已开启"""
+    return _tracer is not None
+
+
+def enable(directory: str = TRACE_DIR) -> Tracer:
+    """开启追踪，程序退出时导出指标并打印摘要；已开启时返回当前的 Tracer"""
+    global _tracer
+    if _tracer is None:
+        _tracer = Tracer(directory)
+        atexit.register(shutdown)
+    return _tracer
+
+
+def shutdown():
+    """导出并打印摘要，然后关闭追踪"""
+    global _tracer
+    tracer, _tracer = _tracer, None
+    if tracer is not None:
+        tracer.export()
+        tracer.print_summary()
+
+
+def span(name: str, **attrs):
+    """在 with 语句中使用的 span，追踪关闭时返回空对象"""
+    tracer = _tracer
+    if tracer is None:
+        return NOOP_SPAN
+    return tracer.span(name, attrs or None)
+
+
+def count(name: str, value: float = 1):
+    """累加计数器，追踪关闭时不做任何事"""
+    tracer = _tracer
+    if tracer is not None:
+        tracer.count(name, value)
+
+
+def traced(name: Optional[str] = None):
+    """为函数调用记录 span 的装饰器，name 默认为 模块名.函数名"""
+
+    def decorator(func):
+        span_name = name or f"{func.__module__}.{func.__qualname__}"
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            tracer = _tracer
+            if tracer is None:
+                return func(*args, **kwargs)
+            with tracer.span(span_name):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def _reset_after_fork():
+    """fork 出的子进程（例如守护进程的工作进程）不重复写出父进程缓冲的 span"""
+    if _tracer is not None:
+        _tracer.buffer = []
+        _tracer._lock = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+if TRACE_ENABLED:
+    enable()
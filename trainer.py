@@ -6,19 +6,24 @@
 包含核心的假名练习逻辑
 """
 
-import os
-
+from rich import box
 from rich.console import Console
 from rich.panel import Panel
+from rich.table import Table
 from rich.text import Text
 
-from config import DATA_FILE, INTERVAL_MULTIPLIER, MAX_INTERVAL
-from data_manager import due_for_review, pick_kana, save_json, today_str
+from config import BULK_BLOCK_SIZE, EASY_EXAMPLE_WRONG_COUNT
 from jmdict_manager import JMdictManager
-from kana_data import kana_romaji
-from stats_manager import update_stats
+from kana_data import kana_rows
+from quiz_engine import MODE_NAMES, BulkQuizSession, QuizSession, ReadableWordSession, VocabReviewSession
+from screen import Screen
+from tracing import traced
 
 console = Console()
+# 练习画面逐行差分重绘，不再每道题清屏
+screen = Screen(console)
+
+ANSWER_PROMPT = "请输入答案 (输入 'q' 退出): "
 
 # 全局JMdict管理器实例
 jmdict_manager = None
@@ -41,156 +46,313 @@ def init_jmdict():
 
 
 def clear_screen():
-    """清屏函数"""
-    os.system("cls" if os.name == "nt" else "clear")
-
-
-def show_quiz_header(mode_name, correct_count, total_count):
-    """显示练习头部信息"""
-    clear_screen()
+    """清屏函数（输出控制序列，不启动子进程）"""
+    console.clear()
+    screen.invalidate()
 
-    # 标题
-    title_text = Text(f"🎯 {mode_name} 模式", style="bold cyan")
-    title_panel = Panel(title_text, border_style="cyan", padding=(0, 2))
-    console.print(title_panel)
 
-    # 进度信息
+def quiz_header(mode_name, correct_count, total_count):
+    """练习头部信息：标题和进度"""
+    renderables = [Panel(Text(f"🎯 {mode_name} 模式", style="bold cyan"), border_style="cyan", padding=(0, 2))]
     if total_count > 0:
         rate = correct_count / total_count * 100
         progress_text = Text(f"当前进度: {correct_count}/{total_count} ({rate:.1f}%)", style="yellow")
-        progress_panel = Panel(progress_text, border_style="yellow", padding=(0, 2))
-        console.print(progress_panel)
+        renderables.append(Panel(progress_text, border_style="yellow", padding=(0, 2)))
+    renderables.append(Text(""))
+    return renderables
 
-    console.print()
 
+def show_quiz_header(mode_name, correct_count, total_count, *renderables):
+    """显示练习头部信息，以及其后的内容（整屏作为一帧）"""
+    screen.show(*quiz_header(mode_name, correct_count, total_count), *renderables)
 
-def show_kana_example(kana):
-    """显示包含当前假名的词汇示例"""
+
+@traced("trainer.show_kana_example")
+def kana_example(kana, easy=False):
+    """包含当前假名的词汇示例面板，easy 为 True 时选择更容易的例词；没有例词时返回空列表"""
     if not jmdict_manager:
-        return
+        return []
 
     try:
         # 获取包含该假名的随机词汇
-        word_info = jmdict_manager.get_random_word_with_kana(kana)
+        word_info = jmdict_manager.get_example_word(kana, easy)
         if word_info:
-            # 创建词汇信息面板
-            example_text = Text("📚 相关词汇:", style="bold blue")
-            example_panel = Panel(example_text, border_style="blue", padding=(0, 2))
-            console.print(example_panel)
-
-            # 显示词汇详细信息
+            example_panel = Panel(Text("📚 相关词汇:", style="bold blue"), border_style="blue", padding=(0, 2))
             word_display = jmdict_manager.format_word_display(word_info)
-            word_text = Text(word_display, style="white")
-            word_panel = Panel(word_text, border_style="blue", padding=(1, 2))
-            console.print(word_panel)
-            console.print()
+            word_panel = Panel(Text(word_display, style="white"), border_style="blue", padding=(1, 2))
+            return [example_panel, word_panel, Text("")]
     except Exception:
         # 如果出错，静默处理，不影响主要练习流程
         pass
+    return []
+
 
+def answer_echo(user):
+    """回显用户在提示行输入的答案（结果画面中占据提示行的位置）"""
+    return Text(ANSWER_PROMPT + user)
 
-def quiz_mode(data, mode="free"):
-    """练习模式主函数"""
+
+def result_panel(correct, message):
+    """判题结果面板"""
+    if correct:
+        return Panel(Text(f"✅ 正确！{message}", style="bold green"), border_style="green", padding=(1, 2))
+    return Panel(Text(f"❌ 错误，正确答案是: {message}", style="bold red"), border_style="red", padding=(1, 2))
+
+
+def final_panel(summary):
+    """练习结束时的统计面板，没有作答时为提示文字"""
+    if summary["total"] == 0:
+        return Text("本次没有完成任何练习。", style="yellow")
+    final_text = Text(
+        f"练习完成！\n总题数: {summary['total']}\n正确数: {summary['correct']}\n正确率: {summary['rate']:.1f}%",
+        style="bold green",
+    )
+    return Panel(final_text, border_style="green", padding=(1, 2))
+
+
+def quiz_mode(profile, mode="free"):
+    """练习模式主函数（QuizSession 的终端前端）"""
     # 初始化JMdict管理器
     if not init_jmdict():
         console.print("[yellow]继续练习，但不显示词汇信息...[/yellow]")
         console.print()
+    screen.invalidate()
 
-    review_list = due_for_review(data) if mode == "review" else []
-    correct_count = 0
-    total_count = 0
-
-    mode_name = "每日复习" if mode == "review" else "自由练习"
+    # 每次判题后立即写回当前用户的数据库记录
+    session = QuizSession(profile.data, mode=mode, on_answer=profile.record_answer)
+    finished_text = None
 
     while True:
-        if not review_list and mode == "review":
-            show_quiz_header(mode_name, correct_count, total_count)
-            console.print("[green]今日复习题已全部完成！[/green]")
+        kana = session.next_item()
+        if kana is None:
+            finished_text = Text("今日复习题已全部完成！", style="green")
+            break
+
+        # 题目和包含该假名的词汇示例作为一帧显示
+        # 经常答错的假名使用以它开头的常用词作为例词
+        question = [
+            Panel(Text(f"请问假名 {kana} 的罗马音是：", style="bold white"), border_style="white", padding=(1, 2)),
+            *kana_example(kana, session.data.get(kana, {}).get("wrong_count", 0) >= EASY_EXAMPLE_WRONG_COUNT),
+        ]
+        show_quiz_header(session.mode_name, session.correct_count, session.total_count, *question)
+
+        user = input(ANSWER_PROMPT).strip().lower()
+
+        if user == "q":
             break
 
-        kana = pick_kana(data, review_list)
-        romaji = kana_romaji[kana]
+        result = session.submit_answer(user)
+        summary = session.summary()
+        rate_text = Text(f"当前正确率: {summary['correct']}/{summary['total']} ({summary['rate']:.1f}%)", style="cyan")
+
+        # 结果画面保留题目部分（头部进度更新），只重写变化的行
+        show_quiz_header(
+            session.mode_name,
+            session.correct_count,
+            session.total_count,
+            *question,
+            answer_echo(user),
+            result_panel(result["correct"], "" if result["correct"] else result["romaji"]),
+            Panel(rate_text, border_style="cyan", padding=(1, 2)),
+        )
+
+        # 等待用户确认继续
+        input("\n按 Enter 键继续下一题...")
+
+    # 结束会话（统计已随每次答题写入）
+    summary = session.finish()
 
-        # 显示练习界面
-        show_quiz_header(mode_name, correct_count, total_count)
+    # 显示最终结果
+    show_quiz_header(
+        session.mode_name,
+        summary["correct"],
+        summary["total"],
+        *([finished_text] if finished_text else []),
+        final_panel(summary),
+        Text("\n练习会话结束并已保存统计。", style="green"),
+    )
+
+
+def batch_results_table(results):
+    """一组答案的判题结果表格"""
+    table = Table(box=box.SIMPLE_HEAD)
+    table.add_column("#", justify="right")
+    table.add_column("假名", justify="center")
+    table.add_column("你的答案", justify="left")
+    table.add_column("正确答案", justify="left")
+    table.add_column("", justify="center")
+    for position, result in enumerate(results, 1):
+        style = "green" if result["correct"] else "red"
+        table.add_row(
+            str(position),
+            result["kana"],
+            Text(result["answer"] or "-", style=style),
+            result["romaji"],
+            "✅" if result["correct"] else "❌",
+        )
+    return table
+
+
+def bulk_mode(profile):
+    """批量练习模式：一次出一整行或随机一组假名，用一行以空格分隔的答案作答"""
+    from InquirerPy import inquirer
 
-        # 显示假名并获取用户输入
-        kana_text = Text(f"请问假名 {kana} 的罗马音是：", style="bold white")
-        kana_panel = Panel(kana_text, border_style="white", padding=(1, 2))
-        console.print(kana_panel)
+    choices = [
+        {"name": f"🎲 随机 {BULK_BLOCK_SIZE} 个（先出到期题，再按错题权重）", "value": None},
+        *({"name": f"{name}：{' '.join(row)}", "value": name} for name, row in kana_rows.items()),
+    ]
+    row = inquirer.select(message="请选择练习内容:", choices=choices, pointer=">").execute()
+    screen.invalidate()
 
-        # 显示包含该假名的词汇示例
-        show_kana_example(kana)
+    # 每组答完后在一个事务中写回这一组的全部结果
+    session = BulkQuizSession(profile.data, mode="free", on_batch=profile.record_answers)
+    title = f"批量练习 {row or ''}".strip()
 
-        user = input("请输入答案 (输入 'q' 退出): ").strip().lower()
+    while True:
+        batch = session.next_batch(row)
+        question = Panel(
+            Text("  ".join(batch), style="bold white"),
+            title="请按顺序输入罗马音，以空格分隔",
+            border_style="white",
+            padding=(1, 2),
+        )
+        show_quiz_header(title, session.correct_count, session.total_count, question)
 
+        user = input(ANSWER_PROMPT).strip().lower()
         if user == "q":
             break
 
-        total_count += 1
-
-        if user == romaji:
-            # 答对的情况
-            result_text = Text("✅ 正确！", style="bold green")
-            result_panel = Panel(result_text, border_style="green", padding=(1, 2))
-            console.print(result_panel)
-            correct_count += 1
-
-            if kana in data:
-                # 增加间隔，减少错题次数
-                current_interval = int(data[kana].get("interval", 1))
-                data[kana]["interval"] = max(1, current_interval * INTERVAL_MULTIPLIER)
-                data[kana]["last_review"] = today_str()
-                current_wrong = int(data[kana].get("wrong_count", 0))
-                data[kana]["wrong_count"] = max(0, current_wrong - 1)
-
-                # 如果错题次数为0且间隔足够长，从错题记录中删除
-                if data[kana]["wrong_count"] == 0 and data[kana]["interval"] > MAX_INTERVAL:
-                    del data[kana]
-        else:
-            # 答错的情况
-            result_text = Text(f"❌ 错误，正确答案是: {romaji}", style="bold red")
-            result_panel = Panel(result_text, border_style="red", padding=(1, 2))
-            console.print(result_panel)
+        results = session.submit_answers(user)
+        correct = sum(1 for result in results if result["correct"])
+        show_quiz_header(
+            title,
+            session.correct_count,
+            session.total_count,
+            question,
+            answer_echo(user),
+            batch_results_table(results),
+            Text(f"本组: {correct}/{len(results)}", style="cyan"),
+        )
 
-            if kana not in data:
-                data[kana] = {"wrong_count": 0, "last_review": today_str(), "interval": 1}
+        input("\n按 Enter 键继续下一组...")
 
-            current_wrong = int(data[kana].get("wrong_count", 0))
-            data[kana]["wrong_count"] = current_wrong + 1
-            data[kana]["interval"] = 1
-            data[kana]["last_review"] = today_str()
+    summary = session.finish()
+    show_quiz_header(title, summary["correct"], summary["total"], final_panel(summary))
 
-        # 保存数据
-        save_json(DATA_FILE, data)
 
-        # 如果是复习模式，从复习列表中移除已练习的假名
-        if mode == "review" and kana in review_list:
-            review_list.remove(kana)
+def readable_mode(profile):
+    """认读单词模式：只出由已掌握假名组成的词，输入整个读音的罗马音"""
+    if not init_jmdict():
+        console.print("[red]认读单词模式需要词典数据库，请先更新词典[/red]")
+        return
 
-        # 显示当前正确率
-        if total_count > 0:
-            rate = correct_count / total_count * 100
-            rate_text = Text(f"当前正确率: {correct_count}/{total_count} ({rate:.1f}%)", style="cyan")
-            rate_panel = Panel(rate_text, border_style="cyan", padding=(1, 2))
-            console.print(rate_panel)
+    from JMdict.kana_mask import ReadableWordIndex
+
+    index = ReadableWordIndex.load(jmdict_manager.sqlite_manager)
+    if index is None:
+        console.print("[yellow]词典数据库没有假名掩码，请重新更新词典并迁移到数据库[/yellow]")
+        return
+    screen.invalidate()
+
+    session = ReadableWordSession(
+        profile.data, index, jmdict_manager.sqlite_manager, on_answer=profile.record_word_answer
+    )
+
+    while True:
+        word = session.next_item()
+        if word is None:
+            show_quiz_header(
+                session.mode_name,
+                session.correct_count,
+                session.total_count,
+                Text("还没有只由已掌握假名组成的词，先去练习假名吧！", style="yellow"),
+            )
+            break
+
+        question = [
+            Text(f"可练习的词: {session.readable_count()} 个", style="dim"),
+            Panel(
+                Text(f"请读出单词 {word.kana[0]} 的罗马音：", style="bold white"), border_style="white", padding=(1, 2)
+            ),
+        ]
+        show_quiz_header(session.mode_name, session.correct_count, session.total_count, *question)
+
+        user = input(ANSWER_PROMPT).strip().lower()
+        if user == "q":
+            break
+
+        result = session.submit_answer(user)
+        show_quiz_header(
+            session.mode_name,
+            session.correct_count,
+            session.total_count,
+            *question,
+            answer_echo(user),
+            result_panel(result["correct"], "" if result["correct"] else result["romaji"]),
+            Panel(Text(jmdict_manager.format_word_display(word), style="white"), border_style="blue"),
+        )
 
-        # 等待用户确认继续
         input("\n按 Enter 键继续下一题...")
 
-    # 更新统计并结束
-    update_stats(total_count, correct_count)
+    summary = session.finish()
+    if summary["total"] > 0:
+        show_quiz_header(session.mode_name, summary["correct"], summary["total"], final_panel(summary))
 
-    # 显示最终结果
-    show_quiz_header(mode_name, correct_count, total_count)
-    if total_count > 0:
-        final_rate = correct_count / total_count * 100
-        final_text = Text(
-            f"练习完成！\n总题数: {total_count}\n正确数: {correct_count}\n正确率: {final_rate:.1f}%", style="bold green"
+
+def vocab_mode(profile):
+    """词汇卡片模式：看写法和含义输入读音，卡片在查词结果中添加"""
+    stats = profile.vocab_stats()
+    if stats["cards"] == 0:
+        console.print("[yellow]还没有词汇卡片，请先在查词功能中把查到的词加入卡片[/yellow]")
+        return
+
+    console.print(f"[cyan]词汇卡片: {stats['cards']} 张，今日到期: {stats['due']} 张[/cyan]")
+    from InquirerPy import inquirer
+
+    mode = inquirer.select(
+        message="请选择练习方式:",
+        choices=[
+            {"name": f"📅 {MODE_NAMES['review']}（只复习到期卡片）", "value": "review"},
+            {"name": f"🎯 {MODE_NAMES['free']}（到期卡片复习完后按错题权重出题）", "value": "free"},
+        ],
+        pointer=">",
+    ).execute()
+    screen.invalidate()
+
+    session = VocabReviewSession(profile, mode=mode, on_answer=profile.record_vocab_answer)
+    finished_text = None
+
+    while True:
+        card = session.next_item()
+        if card is None:
+            finished_text = Text("到期的词汇卡片已全部复习完成！", style="green")
+            break
+
+        card_text = Text(f"{card['headword']}\n{card['meaning']}\n\n请输入读音（罗马音或假名）：", style="bold white")
+        question = Panel(card_text, border_style="white", padding=(1, 2))
+        show_quiz_header(session.mode_name, session.correct_count, session.total_count, question)
+
+        user = input(ANSWER_PROMPT).strip().lower()
+        if user == "q":
+            break
+
+        result = session.submit_answer(user)
+        show_quiz_header(
+            session.mode_name,
+            session.correct_count,
+            session.total_count,
+            question,
+            answer_echo(user),
+            result_panel(result["correct"], f"{result['kana']}（{result['romaji']}）"),
         )
-        final_panel = Panel(final_text, border_style="green", padding=(1, 2))
-        console.print(final_panel)
-    else:
-        console.print("[yellow]本次没有完成任何练习。[/yellow]")
 
-    console.print("\n[green]练习会话结束并已保存统计。[/green]")
+        input("\n按 Enter 键继续下一题...")
+
+    summary = session.finish()
+    show_quiz_header(
+        session.mode_name,
+        summary["correct"],
+        summary["total"],
+        *([finished_text] if finished_text else []),
+        *([final_panel(summary)] if summary["total"] else []),
+    )